@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+竞品页面解析基准测试
+对比原来的 BeautifulSoup(html.parser) 多次 find_all 方式与 html_extract 单遍提取的耗时，
+并检查两者提取结果是否一致。
+
+用法：
+  python bench_html_extract.py page1.html page2.html ...   # 已保存的竞品页面
+  python bench_html_extract.py                             # 不传文件时使用生成的大页面
+"""
+
+import sys
+import io
+
+# 修复Windows中文编码问题
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from html_extract import etree, extract_page
+
+# 原实现里硬编码的特征检查
+LEGACY_CHECKS = [
+    ('Google AdSense', 'monetization', ['adsense', 'googlesyndication']),
+    ('Amazon Associates', 'monetization', ['amazon-adsystem', 'amzn.to']),
+    ('Mediavine', 'monetization', ['mediavine']),
+    ('Ezoic', 'monetization', ['ezoic']),
+    ('WordPress', 'tech_stack', ['wp-content', 'wordpress']),
+    ('Next.js', 'tech_stack', ['__next', '_next']),
+    ('Gatsby', 'tech_stack', ['gatsby']),
+]
+LEGACY_NAMES = {name for name, _, _ in LEGACY_CHECKS}
+
+
+def extract_with_soup(html):
+    """原实现：完整建树 + 多次 find_all + 整页转小写做子串检查"""
+    soup = BeautifulSoup(html, 'html.parser')
+    title = soup.find('title')
+    html_text = html.lower()
+    nav = soup.find('nav')
+    page = {
+        'title': title.text.strip() if title else '',
+        'h1': [h.text.strip() for h in soup.find_all('h1')],
+        'h2': [h.text.strip() for h in soup.find_all('h2')],
+        'h3': [h.text.strip() for h in soup.find_all('h3')],
+        'links': [(a['href'], a.text.strip()) for a in soup.find_all('a', href=True)],
+        'nav_links': [a.text.strip() for a in nav.find_all('a') if a.text.strip()] if nav else [],
+        'monetization': [],
+        'tech_stack': [],
+    }
+    for name, kind, markers in LEGACY_CHECKS:
+        if any(marker in html_text for marker in markers):
+            page[kind].append(name)
+    return page
+
+
+def sample_page(articles=3000):
+    """生成一个大型博客首页（没有传入已保存页面时使用）"""
+    parts = ['<html><head><title>Sample Blog</title>',
+             '<meta name="description" content="sample"><meta name="keywords" content="a, b">',
+             '<script src="https://pagead2.googlesyndication.com/pagead/js/adsbygoogle.js"></script>',
+             '<link rel="stylesheet" href="/wp-content/themes/x/style.css"></head><body>',
+             '<nav><a href="/">Home</a><a href="/recipes/">Recipes</a><a href="/reviews/">Reviews</a></nav>',
+             '<h1>Latest posts</h1>']
+    for i in range(articles):
+        parts.append(f'<article class="post"><h2><a href="/blog/post-{i}/">Post <b>{i}</b></a></h2>'
+                     f'<p>Excerpt for post {i} with <a href="/tag/t{i % 50}/">tag</a> and some text.</p>'
+                     f'<h3>Section {i}</h3></article>')
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def bench(func, html, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='竞品页面解析基准测试')
+    parser.add_argument('files', nargs='*', help='已保存的HTML页面')
+    parser.add_argument('--repeat', type=int, default=5, help='每个页面重复次数（取最快一次）')
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.files:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            pages.append((path, f.read()))
+    if not pages:
+        pages.append(('<生成的页面>', sample_page()))
+
+    parsers = ['stdlib'] + (['lxml'] if etree is not None else [])
+    keys = ['title', 'h1', 'h2', 'h3', 'links', 'nav_links', 'monetization', 'tech_stack']
+
+    print(f"{'页面':<40} {'大小':>8} {'bs4':>9} " + ' '.join(f'{p:>9}' for p in parsers) + '  结果一致')
+    totals = {name: 0.0 for name in ['bs4'] + parsers}
+    for path, html in pages:
+        expected = extract_with_soup(html)
+        timings = {'bs4': bench(extract_with_soup, html, args.repeat)}
+        same = True
+        for name in parsers:
+            timings[name] = bench(lambda h: extract_page(h, parser=name), html, args.repeat)
+            page = extract_page(html, parser=name)
+            # 特征库比原来的检查多了厂商，只比较原有的那几个
+            for kind in ('monetization', 'tech_stack'):
+                page[kind] = [name for name in page[kind] if name in LEGACY_NAMES]
+            same = same and all(page[k] == expected[k] for k in keys)
+        for name, seconds in timings.items():
+            totals[name] += seconds
+
+        print(f"{path[-40:]:<40} {len(html) // 1024:>6}KB {timings['bs4'] * 1000:>7.1f}ms "
+              + ' '.join(f'{timings[p] * 1000:>7.1f}ms' for p in parsers)
+              + f"  {'✅' if same else '⚠️'}")
+
+    print()
+    for name in parsers:
+        print(f"📊 {name}: 总耗时 {totals[name] * 1000:.1f}ms，比 bs4 快 {totals['bs4'] / totals[name]:.1f} 倍")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+竞争对手变化追踪（SQLite）
+功能：
+1. 保存带时间戳的竞品快照（标题、h1/h2、文章URL、变现方式、技术栈、分类）
+2. 每个站点只保留"当前状态"一份，新快照只和它比较，增量得出变化（新文章、删除的分类、新加的广告联盟……）
+3. 没有变化时只更新检查时间，不新增快照
+4. 按时间汇总所有站点的变化报告
+
+用法：
+  python competitor_tracker.py --urls-file competitors.txt              # 分析一次并输出变化
+  python competitor_tracker.py --urls-file competitors.txt --every 24   # 每24小时检查一次
+"""
+
+import sys
+import io
+
+# 修复Windows中文编码问题
+if sys.platform == 'win32' and __name__ == '__main__':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from script_loader import load_keyword_digger
+
+# 追踪的字段：快照字段 -> 从分析结果中取值
+TRACKED_FIELDS = {
+    'title': lambda a: [a['title']] if a.get('title') else [],
+    'h1': lambda a: a.get('content_structure', {}).get('h1_texts', []),
+    'h2': lambda a: a.get('content_structure', {}).get('h2_texts', []),
+    'articles': lambda a: a.get('article_urls', a.get('sample_articles', [])),
+    'monetization': lambda a: a.get('monetization', []),
+    'tech_stack': lambda a: a.get('tech_stack', []),
+    'categories': lambda a: a.get('categories', []),
+}
+
+FIELD_NAMES = {
+    'title': '标题',
+    'h1': 'H1',
+    'h2': 'H2',
+    'articles': '文章',
+    'monetization': '变现方式',
+    'tech_stack': '技术栈',
+    'categories': '分类',
+}
+
+
+def snapshot_of(analysis):
+    """从 analyze_competitor_site 的结果中取出追踪字段（去重，保持顺序）"""
+    return {field: list(dict.fromkeys(getter(analysis))) for field, getter in TRACKED_FIELDS.items()}
+
+
+class CompetitorTracker:
+    """线程安全的竞品快照库"""
+
+    def __init__(self, path='competitor_snapshots.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                taken_at REAL NOT NULL,
+                checked_at REAL NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_snapshots_url ON snapshots (url, taken_at);
+
+            -- 每个站点的当前状态（最新快照展开成集合），新快照只和这里比较
+            CREATE TABLE IF NOT EXISTS current_items (
+                url TEXT NOT NULL,
+                field TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (url, field, value)
+            );
+
+            CREATE TABLE IF NOT EXISTS changes (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                taken_at REAL NOT NULL,
+                field TEXT NOT NULL,
+                change TEXT NOT NULL,
+                value TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_changes_time ON changes (taken_at);
+        ''')
+        self._conn.commit()
+
+    def record(self, analysis, taken_at=None):
+        """
+        保存一次分析结果，返回和上次快照相比的变化：
+        {'url', 'taken_at', 'first_seen', 'changes': {字段: {'added': [...], 'removed': [...]}}}
+        """
+        url = analysis['url']
+        taken_at = taken_at or time.time()
+        snapshot = snapshot_of(analysis)
+
+        with self._lock:
+            previous = {}
+            for field, value in self._conn.execute(
+                    'SELECT field, value FROM current_items WHERE url=?', (url,)):
+                previous.setdefault(field, set()).add(value)
+            first_seen = self._conn.execute(
+                'SELECT 1 FROM snapshots WHERE url=? LIMIT 1', (url,)).fetchone() is None
+
+            changes = {}
+            for field, values in snapshot.items():
+                old = previous.get(field, set())
+                added = [v for v in values if v not in old]
+                removed = sorted(old - set(values))
+                if added or removed:
+                    changes[field] = {'added': added, 'removed': removed}
+
+            if first_seen or changes:
+                self._conn.execute('INSERT INTO snapshots (url, taken_at, checked_at, data) VALUES (?, ?, ?, ?)',
+                                   (url, taken_at, taken_at, json.dumps(snapshot, ensure_ascii=False)))
+            else:
+                # 没有变化：只更新最新快照的检查时间
+                self._conn.execute('''
+                    UPDATE snapshots SET checked_at=?
+                    WHERE id = (SELECT id FROM snapshots WHERE url=? ORDER BY taken_at DESC LIMIT 1)
+                ''', (taken_at, url))
+
+            rows = []
+            for field, diff in changes.items():
+                rows += [(url, field, value) for value in diff['added']]
+                self._conn.executemany('DELETE FROM current_items WHERE url=? AND field=? AND value=?',
+                                       [(url, field, value) for value in diff['removed']])
+            self._conn.executemany('INSERT OR IGNORE INTO current_items VALUES (?, ?, ?)', rows)
+
+            # 第一次出现的站点只建立基线，不算作变化
+            if not first_seen:
+                self._conn.executemany(
+                    'INSERT INTO changes (url, taken_at, field, change, value) VALUES (?, ?, ?, ?, ?)',
+                    [(url, taken_at, field, kind, value)
+                     for field, diff in changes.items() for kind in ('added', 'removed') for value in diff[kind]]
+                )
+            self._conn.commit()
+
+        return {
+            'url': url,
+            'taken_at': taken_at,
+            'first_seen': first_seen,
+            'changes': {} if first_seen else changes
+        }
+
+    def history(self, url, limit=20):
+        """某个站点最近的快照 [{'taken_at', 'checked_at', 'data'}, ...]（新的在前）"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT taken_at, checked_at, data FROM snapshots WHERE url=? ORDER BY taken_at DESC LIMIT ?',
+                (url, limit)
+            ).fetchall()
+        return [{'taken_at': r[0], 'checked_at': r[1], 'data': json.loads(r[2])} for r in rows]
+
+    def changes_since(self, since=0):
+        """所有站点在 since 之后的变化，按 {url: {字段: {'added': [...], 'removed': [...]}}} 汇总"""
+        report = {}
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT url, field, change, value FROM changes WHERE taken_at > ? ORDER BY id', (since,)
+            ).fetchall()
+        for url, field, change, value in rows:
+            diff = report.setdefault(url, {}).setdefault(field, {'added': [], 'removed': []})
+            diff[change].append(value)
+        return report
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def format_changes(url, changes):
+    """把一个站点的变化格式化为文本"""
+    lines = [f"🔔 {url}"]
+    for field, diff in changes.items():
+        name = FIELD_NAMES.get(field, field)
+        for value in diff['added']:
+            lines.append(f"   + {name}: {value}")
+        for value in diff['removed']:
+            lines.append(f"   - {name}: {value}")
+    return '\n'.join(lines)
+
+
+def check_once(digger, tracker, urls, crawl_pages=1):
+    """分析一轮竞争对手并记录快照，返回有变化的站点数"""
+    changed = 0
+    for analysis in digger.analyze_competitors(urls, crawl_pages=crawl_pages):
+        if 'error' in analysis:
+            continue  # 分析失败，不记录（否则会被当成所有内容都被删除）
+        result = tracker.record(analysis)
+        if result['first_seen']:
+            print(f"🆕 {analysis['url']}: 建立基线快照")
+        elif result['changes']:
+            changed += 1
+            print(format_changes(analysis['url'], result['changes']))
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='竞争对手变化追踪')
+    parser.add_argument('--urls-file', required=True, help='竞争对手URL文件，每行一个')
+    parser.add_argument('--db', default='competitor_snapshots.db', help='快照库路径')
+    parser.add_argument('--crawl-pages', type=int, default=1, help='每个站点最多抓取的页数')
+    parser.add_argument('--every', type=float, help='每隔多少小时检查一次（不设置时只检查一次）')
+    parser.add_argument('--no-proxy', action='store_true', help='不使用代理')
+    parser.add_argument('--proxy-port', type=int, default=7890, help='代理端口，默认 7890')
+    args = parser.parse_args()
+
+    with open(args.urls_file, encoding='utf-8') as f:
+        urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    KeywordDigger = load_keyword_digger()
+    digger = KeywordDigger(use_proxy=not args.no_proxy, proxy_port=args.proxy_port, cache_path=None)
+    tracker = CompetitorTracker(args.db)
+
+    try:
+        while True:
+            started = datetime.now().strftime('%Y-%m-%d %H:%M')
+            changed = check_once(digger, tracker, urls, crawl_pages=args.crawl_pages)
+            print(f"\n📊 {started} 检查 {len(urls)} 个站点，{changed} 个有变化")
+            if not args.every:
+                break
+            time.sleep(args.every * 3600)
+    finally:
+        tracker.close()
+        digger.transport.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""pytest 设置：测试在 tests/ 下，直接 import scripts 目录中的模块"""
+
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+# test_quick.py / test_keywords.py 是需要代理的联网演示脚本，不是单元测试
+collect_ignore = ['test_quick.py', 'test_keywords.py']
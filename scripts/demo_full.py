@@ -10,7 +10,10 @@ if sys.platform == 'win32':
 import requests
 import json
 import time
-from collections import Counter
+
+from keyword_scoring import load_rulebook
+from tokenizer import word_count
+from topic_clusters import cluster_keywords
 
 print("=" * 60)
 print("🎯 完整演示：关键词挖掘 - air fryer recipes")
@@ -74,43 +77,16 @@ print(f"   ✅ 总共 {len(all_keywords)} 个关键词")
 # 策略3: 评分排序
 print("\n[3/3] 评分关键词...")
 
-def score_keyword(keyword):
-    score = 0
-    kw_lower = keyword.lower()
-
-    # 长度评分
-    word_count = len(keyword.split())
-    if word_count >= 4:
-        score += 25
-    elif word_count == 3:
-        score += 20
-    elif word_count == 2:
-        score += 10
-
-    # 商业意图
-    high_intent = ['buy', 'best', 'review', 'easy', 'simple', 'quick']
-    for word in high_intent:
-        if word in kw_lower:
-            score += 20
-            break
-
-    # 问题词
-    if kw_lower.startswith(('how', 'what', 'why')):
-        score += 15
-
-    # 健康/流行词
-    if any(w in kw_lower for w in ['healthy', 'crispy', 'chicken', 'potato']):
-        score += 10
-
-    return score
+# 评分规则见 scoring_rules.json 的 demo 配置
+scorer = load_rulebook().scorer('demo')
 
+all_keywords = list(all_keywords)
 scored_keywords = []
-for kw in all_keywords:
-    score = score_keyword(kw)
+for kw, score in zip(all_keywords, scorer.score_many(all_keywords)):
     scored_keywords.append({
         'keyword': kw,
         'score': score,
-        'words': len(kw.split())
+        'words': word_count(kw)
     })
 
 scored_keywords.sort(key=lambda x: x['score'], reverse=True)
@@ -128,17 +104,13 @@ print("\n🏆 Top 20 高价值关键词:\n")
 for i, kw in enumerate(scored_keywords[:20], 1):
     print(f"   {i:2d}. [{kw['score']:2d}分] {kw['keyword']}")
 
-# 提取热门主题
+# 主题聚类（全部关键词）
 print("\n📈 热门主题分析:\n")
-all_words = []
-for kw in scored_keywords[:50]:
-    words = kw['keyword'].lower().replace('air fryer recipes', '').split()
-    all_words.extend([w for w in words if len(w) > 3])
-
-word_freq = Counter(all_words)
-print("   高频词汇:")
-for word, count in word_freq.most_common(10):
-    print(f"   • {word}: {count}次")
+topics = cluster_keywords([kw['keyword'] for kw in scored_keywords], [kw['score'] for kw in scored_keywords])
+
+print(f"   共同词: {' '.join(topics['common_terms'])}")
+for cluster in topics['clusters'][:10]:
+    print(f"   • {cluster['label']}: {cluster['size']}个关键词，支柱词「{cluster['pillar']}」")
 
 # 建站建议
 print("\n" + "=" * 60)
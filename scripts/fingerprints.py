@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+变现方式 / 技术栈特征库
+功能：
+1. 特征统一放在 fingerprints.json，新增厂商只改配置文件
+2. 每类特征（页面源码、脚本地址、meta generator、响应头、Cookie）编译成一个合并正则
+3. 每个页面每类数据只扫描一次，厂商再多也不会增加全文扫描次数
+4. 报告命中的是哪一条特征（来源、特征、命中的文本）
+
+特征字段（见 fingerprints.json）：
+  html     页面源码中的特征串（不区分大小写，按字面匹配）
+  script   <script src> 地址的正则
+  meta     <meta name=generator> 内容的正则
+  headers  {响应头名称: 响应头值的正则}
+  cookies  Cookie 名称的正则（从名称开头匹配）
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+
+DEFAULT_FINGERPRINTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fingerprints.json')
+
+SOURCES = ('html', 'script', 'meta', 'headers', 'cookies')
+
+
+class _MultiMatcher:
+    """把多条特征合并成一个正则，用命名分组区分命中的是哪一条"""
+
+    def __init__(self, entries):
+        """entries: [(特征序号, 原始特征, 正则), ...]"""
+        self.owners = {}
+        parts = []
+        for n, (index, pattern, regex) in enumerate(entries):
+            group = f'g{n}'
+            self.owners[group] = (index, pattern)
+            parts.append(f'(?P<{group}>{regex})')
+        self.regex = re.compile('|'.join(parts), re.IGNORECASE | re.MULTILINE) if parts else None
+        self.total = len({index for index, _, _ in entries})
+
+    def scan(self, text, source, hits):
+        """扫描一次 text，每条特征记录第一次命中：hits[(序号, 来源)] = (特征, 命中文本)"""
+        if self.regex is None or not text:
+            return
+        found = set()
+        for m in self.regex.finditer(text):
+            index, pattern = self.owners[m.lastgroup]
+            if index in found:
+                continue
+            found.add(index)
+            hits[(index, source)] = (pattern, m.group()[:80])
+            if len(found) == self.total:
+                break  # 这一类的特征都已命中，不用再往下扫
+
+
+class _LiteralMatcher:
+    """
+    页面源码的特征串：用不带分组的合并正则匹配小写文本，按命中文本找回特征
+    （带命名分组或 IGNORECASE 的正则会失去首字符快速跳过，大页面慢10倍以上）
+    页面按块转小写，不复制整个页面；相邻块重叠（最长特征串长度 - 1）个字符，跨块的特征串也能找到
+    """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, entries):
+        owners = {}
+        for index, marker in entries:
+            owners.setdefault(marker.lower(), []).append((index, marker))
+        literals = sorted(owners, key=len, reverse=True)
+        # 合并正则在同一位置只返回最长的特征串：命中时它包含的较短特征串也算命中
+        self.owners = {literal: [(index, marker, other) for other in literals if other in literal
+                                 for index, marker in owners[other]]
+                       for literal in literals}
+        self.overlap = max(map(len, literals), default=1) - 1
+        self.regex = re.compile('|'.join(re.escape(m) for m in literals)) if literals else None
+        self.total = len({index for index, _ in entries})
+
+    def _matches(self, text):
+        """逐块扫描；每次从上一个命中的下一个字符继续，首尾相接的特征串（如 adsense / sensei）都能找到"""
+        for start in range(0, len(text), self.CHUNK_SIZE):
+            chunk = text[start:start + self.CHUNK_SIZE + self.overlap].lower()
+            m = self.regex.search(chunk)
+            while m is not None:
+                yield m.group()
+                m = self.regex.search(chunk, m.start() + 1)
+
+    def scan(self, text, source, hits):
+        if self.regex is None or not text:
+            return
+        found = set()
+        for literal in self._matches(text):
+            for index, marker, evidence in self.owners[literal]:
+                if index not in found:
+                    found.add(index)
+                    hits[(index, source)] = (marker, evidence)
+            if len(found) == self.total:
+                break
+
+
+class FingerprintDB:
+    """编译好的特征库"""
+
+    def __init__(self, config):
+        self.signatures = config['signatures']
+        # 特征库内容的哈希：缓存的检测结果只在特征库没变时可以复用
+        self.digest = hashlib.sha1(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        self.categories = ['monetization', 'tech_stack']
+        for signature in self.signatures:
+            if signature['category'] not in self.categories:
+                self.categories.append(signature['category'])
+
+        entries = {source: [] for source in SOURCES}
+        for index, signature in enumerate(self.signatures):
+            for marker in signature.get('html', []):
+                entries['html'].append((index, marker))
+            for pattern in signature.get('script', []):
+                entries['script'].append((index, pattern, pattern))
+            for pattern in signature.get('meta', []):
+                entries['meta'].append((index, pattern, pattern))
+            for name, pattern in signature.get('headers', {}).items():
+                # 响应头按 "名称: 值" 逐行拼接；值的正则以 ^ 开头时表示从值的开头匹配
+                prefix = f'^{re.escape(name.lower())}:[ \\t]*'
+                regex = prefix + pattern[1:] if pattern.startswith('^') else prefix + '[^\\n]*?' + pattern
+                entries['headers'].append((index, f'{name}: {pattern}', regex))
+            for pattern in signature.get('cookies', []):
+                entries['cookies'].append((index, pattern, f'^(?:{pattern})'))
+
+        self.matchers = {source: _MultiMatcher(items) for source, items in entries.items() if source != 'html'}
+        self.matchers['html'] = _LiteralMatcher(entries['html'])
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_FINGERPRINTS_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def detect(self, html='', scripts=(), meta=None, headers=None, cookies=()):
+        """
+        检测变现方式和技术栈
+        scripts: <script src> 列表；meta: {名称: 内容}；headers: 响应头；cookies: Cookie 名称
+        返回 {'monetization': [...], 'tech_stack': [...], 'fingerprints': [命中详情, ...]}
+        """
+        texts = {
+            'html': html,
+            'script': '\n'.join(scripts),
+            'meta': (meta or {}).get('generator', ''),
+            'headers': '\n'.join(f'{name.lower()}: {value}' for name, value in (headers or {}).items()),
+            'cookies': '\n'.join(cookies),
+        }
+
+        hits = {}
+        for source, text in texts.items():
+            self.matchers[source].scan(text, source, hits)
+
+        result = {category: [] for category in self.categories}
+        result['fingerprints'] = []
+        order = sorted(hits, key=lambda key: (key[0], SOURCES.index(key[1])))
+        for index, source in order:
+            pattern, evidence = hits[(index, source)]
+            signature = self.signatures[index]
+            if signature['name'] not in result[signature['category']]:
+                result[signature['category']].append(signature['name'])
+            result['fingerprints'].append({
+                'name': signature['name'],
+                'category': signature['category'],
+                'source': source,
+                'pattern': pattern,
+                'evidence': evidence
+            })
+        return result
+
+
+_databases = {}
+_lock = threading.Lock()
+
+
+def load_fingerprints(path=None):
+    """按路径共享特征库，文件修改后自动重新编译"""
+    path = os.path.abspath(path or DEFAULT_FINGERPRINTS_PATH)
+    mtime = os.path.getmtime(path)
+    with _lock:
+        cached = _databases.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, FingerprintDB.from_file(path))
+            _databases[path] = cached
+        return cached[1]
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+竞品页面单遍提取器
+功能：
+1. 一次遍历收集 title、meta、h1/h2/h3、链接、导航、脚本地址
+2. 优先使用 lxml 的流式解析（HTMLPullParser），已处理的节点及时释放
+3. 没有 lxml 时退回标准库 html.parser（同样是单遍流式解析）
+4. 变现方式/技术栈按特征库检测（fingerprints.py），每类数据只扫描一次
+5. analysis_version()：提取器版本 + 特征库哈希，缓存的分析结果据此判断是否过期
+"""
+
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+from fingerprints import FingerprintDB, load_fingerprints
+
+HEADINGS = ('h1', 'h2', 'h3')
+CHUNK_SIZE = 64 * 1024
+
+# 提取结果（或 keyword-digger 的 _analyze_page）的格式、规则改变时加一，让 PageCache 中旧的分析结果失效
+EXTRACTOR_VERSION = 1
+
+
+def _new_page():
+    return {
+        'title': '',
+        'meta': {},
+        'h1': [],
+        'h2': [],
+        'h3': [],
+        'links': [],       # [(href, 文本), ...]
+        'nav_links': [],   # 第一个 <nav> 里的链接文本
+        'scripts': [],     # <script src>
+    }
+
+
+def _extract_lxml(html):
+    page = _new_page()
+    parser = etree.HTMLPullParser(events=('start', 'end'))
+
+    nav_depth = 0      # 当前是否在第一个 <nav> 里
+    nav_done = False
+    capture_depth = 0  # 在 title/h1-h3/a 内部时不释放节点，保证能取到完整文本
+    title_seen = False
+
+    def handle(events):
+        nonlocal nav_depth, nav_done, capture_depth, title_seen
+        for event, el in events:
+            tag = el.tag if isinstance(el.tag, str) else ''
+            tag = tag.lower()
+
+            if event == 'start':
+                if tag == 'nav' and not nav_done:
+                    nav_depth += 1
+                elif tag == 'nav' and nav_depth:
+                    nav_depth += 1
+                if tag in HEADINGS or tag in ('a', 'title'):
+                    capture_depth += 1
+                elif tag == 'meta':
+                    name = (el.get('name') or el.get('property') or '').lower()
+                    if name and el.get('content') is not None:
+                        page['meta'].setdefault(name, el.get('content'))
+                elif tag == 'script' and el.get('src'):
+                    page['scripts'].append(el.get('src'))
+                continue
+
+            # event == 'end'
+            if tag in HEADINGS or tag in ('a', 'title'):
+                text = ''.join(el.itertext()).strip()
+                if tag == 'title':
+                    if not title_seen:
+                        page['title'] = text
+                        title_seen = True
+                elif tag == 'a':
+                    href = el.get('href')
+                    if href is not None:
+                        page['links'].append((href, text))
+                    if nav_depth and text:
+                        page['nav_links'].append(text)
+                else:
+                    page[tag].append(text)
+                capture_depth -= 1
+            elif tag == 'nav' and nav_depth:
+                nav_depth -= 1
+                if nav_depth == 0:
+                    nav_done = True
+
+            if capture_depth == 0:
+                # 已处理完的节点释放掉（连同前面的兄弟节点），保持内存平稳
+                el.clear(keep_tail=True)
+                parent = el.getparent()
+                if parent is not None:
+                    while el.getprevious() is not None:
+                        del parent[0]
+
+    for start in range(0, len(html), CHUNK_SIZE):
+        parser.feed(html[start:start + CHUNK_SIZE])
+        handle(parser.read_events())
+    parser.close()
+    handle(parser.read_events())
+    return page
+
+
+class _StdlibExtractor(HTMLParser):
+    """标准库 html.parser 版本（没有 lxml 时使用）"""
+
+    VOID = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.page = _new_page()
+        self.captures = []  # 正在收集文本的元素: [标签, 属性, 文本片段]
+        self.nav_depth = 0
+        self.nav_done = False
+        self.title_seen = False
+        self.raw_tag = None  # <script>/<style> 内的文本不计入标题和链接文本
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'nav' and (not self.nav_done or self.nav_depth):
+            self.nav_depth += 1
+        if tag in HEADINGS or tag in ('a', 'title'):
+            self.captures.append([tag, attrs, []])
+        elif tag == 'meta':
+            name = (attrs.get('name') or attrs.get('property') or '').lower()
+            if name and attrs.get('content') is not None:
+                self.page['meta'].setdefault(name, attrs['content'])
+        elif tag == 'script' and attrs.get('src'):
+            self.page['scripts'].append(attrs['src'])
+        if tag in ('script', 'style'):
+            self.raw_tag = tag
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in self.VOID:
+            self.handle_endtag(tag)
+
+    def handle_data(self, data):
+        if self.raw_tag:
+            return
+        for capture in self.captures:
+            capture[2].append(data)
+
+    def handle_endtag(self, tag):
+        if tag == self.raw_tag:
+            self.raw_tag = None
+        if tag == 'nav' and self.nav_depth:
+            self.nav_depth -= 1
+            if self.nav_depth == 0:
+                self.nav_done = True
+            return
+
+        # 找到最近的同名元素（容错：未闭合的子元素一起结束）
+        for i in range(len(self.captures) - 1, -1, -1):
+            if self.captures[i][0] == tag:
+                break
+        else:
+            return
+
+        for name, attrs, parts in reversed(self.captures[i:]):
+            self._finish(name, attrs, ''.join(parts).strip())
+        del self.captures[i:]
+
+    def _finish(self, tag, attrs, text):
+        if tag == 'title':
+            if not self.title_seen:
+                self.page['title'] = text
+                self.title_seen = True
+        elif tag == 'a':
+            if attrs.get('href') is not None:
+                self.page['links'].append((attrs['href'], text))
+            if self.nav_depth and text:
+                self.page['nav_links'].append(text)
+        else:
+            self.page[tag].append(text)
+
+    def close(self):
+        super().close()
+        for name, attrs, parts in reversed(self.captures):
+            self._finish(name, attrs, ''.join(parts).strip())
+        self.captures = []
+
+
+def extract_page(html, parser=None, fingerprints=True, headers=None, cookies=()):
+    """
+    单遍提取页面信息
+    parser: 'lxml' / 'stdlib'，默认有 lxml 时用 lxml
+    fingerprints: 是否检测变现方式/技术栈（只需要链接时可关闭），也可以传入 FingerprintDB 实例
+    headers / cookies: 响应头和 Cookie 名称，用于特征检测
+    """
+    if parser is None:
+        parser = 'lxml' if etree is not None else 'stdlib'
+
+    if parser == 'lxml' and html.strip():
+        page = _extract_lxml(html)
+    else:
+        extractor = _StdlibExtractor()
+        for start in range(0, len(html), CHUNK_SIZE):
+            extractor.feed(html[start:start + CHUNK_SIZE])
+        extractor.close()
+        page = extractor.page
+
+    if fingerprints:
+        db = fingerprints if isinstance(fingerprints, FingerprintDB) else load_fingerprints()
+        page.update(db.detect(html, scripts=page['scripts'], meta=page['meta'], headers=headers, cookies=cookies))
+    return page
+
+
+def analysis_version(fingerprints=None):
+    """当前提取器和特征库的版本标识（fingerprints.json 修改后会变）"""
+    db = fingerprints if isinstance(fingerprints, FingerprintDB) else load_fingerprints()
+    return f'{EXTRACTOR_VERSION}:{db.digest}'
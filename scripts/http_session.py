@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+共享HTTP传输层
+功能：
+1. Keep-Alive 连接池（避免每次请求都重新建立 TCP+TLS 连接）
+2. 按主机调整连接池大小
+3. 安装了 httpx + h2 时自动使用 HTTP/2（连接池大小同样生效，异常统一转换成 requests 的异常类型）
+4. 统一管理请求头、代理和超时
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+except ImportError:
+    httpx = None
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+
+class HttpTransport:
+    """可在多个工具之间共享的HTTP传输对象"""
+
+    def __init__(self, use_proxy=True, proxy_port=7890, headers=None, timeout=10,
+                 pool_connections=10, pool_maxsize=16, host_pool_sizes=None, http2=True):
+        """
+        host_pool_sizes: 按主机设置连接池大小，例如 {'suggestqueries.google.com': 32}
+        http2: 是否尝试使用 HTTP/2（需要 pip install httpx[http2]）
+        """
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.timeout = timeout
+
+        # 设置代理（用于访问Google）
+        if use_proxy:
+            self.proxies = {
+                'http': f'http://127.0.0.1:{proxy_port}',
+                'https': f'http://127.0.0.1:{proxy_port}'
+            }
+            print(f"✅ 已启用代理: 127.0.0.1:{proxy_port}")
+        else:
+            self.proxies = None
+            print("⚠️  未使用代理")
+
+        self.http2 = bool(http2 and httpx is not None)
+
+        if self.http2:
+            # httpx 的代理在客户端级别设置，所以分别维护直连和代理两个客户端
+            # httpx 只有一个总连接池：按 requests 的语义，最多 pool_connections 个主机 x 每个主机 pool_maxsize
+            limits = httpx.Limits(max_connections=pool_connections * pool_maxsize,
+                                  max_keepalive_connections=pool_maxsize)
+            host_pool_sizes = host_pool_sizes or {}
+            self._clients = {False: self._make_httpx_client(None, limits, host_pool_sizes)}
+            if self.proxies:
+                self._clients[True] = self._make_httpx_client(self.proxies['https'], limits, host_pool_sizes)
+            else:
+                self._clients[True] = self._clients[False]
+        else:
+            self.session = requests.Session()
+            self.session.headers.update(self.headers)
+
+            adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+
+            for host, size in (host_pool_sizes or {}).items():
+                host_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+                self.session.mount(f'http://{host}', host_adapter)
+                self.session.mount(f'https://{host}', host_adapter)
+
+    def _make_httpx_client(self, proxy, limits, host_pool_sizes):
+        kwargs = {'http2': True, 'headers': self.headers, 'limits': limits,
+                  'timeout': self.timeout, 'follow_redirects': True}
+        # 按主机的连接池：给这些主机单独挂一个 transport（代理也要在 transport 上设置）
+        if host_pool_sizes:
+            kwargs['mounts'] = {
+                f'all://{host}': httpx.HTTPTransport(
+                    http2=True, limits=httpx.Limits(max_connections=size, max_keepalive_connections=size),
+                    proxy=httpx.Proxy(proxy) if proxy else None)
+                for host, size in host_pool_sizes.items()
+            }
+        if proxy is None:
+            return httpx.Client(**kwargs)
+        try:
+            return httpx.Client(proxy=proxy, **kwargs)
+        except TypeError:
+            # 旧版 httpx 使用 proxies 参数
+            return httpx.Client(proxies=proxy, **kwargs)
+
+    def get(self, url, params=None, headers=None, timeout=None, use_proxy=True):
+        """
+        发送GET请求
+        use_proxy: 为 False 时直连（例如百度、知乎等国内站点）
+        请求失败时抛出 requests.RequestException（及其子类），与是否使用 httpx 无关
+        """
+        timeout = timeout or self.timeout
+
+        if self.http2:
+            client = self._clients[bool(use_proxy)]
+            try:
+                return client.get(url, params=params, headers=headers, timeout=timeout)
+            except httpx.HTTPError as e:
+                raise _requests_error(e) from e
+
+        proxies = self.proxies if use_proxy else None
+        return self.session.get(url, params=params, headers=headers,
+                                proxies=proxies, timeout=timeout)
+
+    def close(self):
+        """关闭所有连接"""
+        if self.http2:
+            for client in set(self._clients.values()):
+                client.close()
+        else:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _requests_error(error):
+    """把 httpx 的异常转换成对应的 requests 异常，调用方只需要捕获 requests.RequestException"""
+    if isinstance(error, httpx.TimeoutException):
+        cls = requests.Timeout
+    elif isinstance(error, httpx.ProxyError):
+        cls = requests.exceptions.ProxyError
+    elif isinstance(error, httpx.TransportError):
+        cls = requests.ConnectionError
+    elif isinstance(error, httpx.TooManyRedirects):
+        cls = requests.TooManyRedirects
+    else:
+        cls = requests.RequestException
+    return cls(str(error) or type(error).__name__)
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+多进程关键词挖掘任务调度
+功能：
+1. SQLite 任务表：每个种子词一条任务，工作进程按租约领取
+2. 工作进程崩溃后，租约到期的任务会被其他进程重新领取；最后一次尝试也崩溃的任务标记为 failed
+3. 处理中定时续约（心跳）；租约被接管后，原进程的结果会被丢弃
+4. 全局关键词去重表（所有种子词共享；同一关键词保留分数最高的一条）
+5. 全部完成后合并导出为一个CSV
+
+用法：
+  python job_runner.py --seeds-file seeds.txt --workers 4 --output merged.csv
+  （中断后用同一个 --job-db 重新运行即可继续）
+"""
+
+import sys
+import io
+
+# 修复Windows中文编码问题
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+
+from result_sinks import open_sink
+from script_loader import SCRIPT_DIR, load_keyword_digger
+
+
+class JobQueue:
+    """基于SQLite的任务表（多进程安全）"""
+
+    def __init__(self, path='keyword_jobs.db', lease_seconds=600, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        # isolation_level=None: 手动控制事务，领取任务时使用 BEGIN IMMEDIATE 加写锁
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                seed TEXT NOT NULL,
+                language TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL DEFAULT 0,
+                attempts INTEGER DEFAULT 0,
+                error TEXT,
+                UNIQUE (seed, language)
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS keywords (
+                normalized TEXT PRIMARY KEY,
+                keyword TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                word_count INTEGER NOT NULL,
+                seed TEXT NOT NULL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_keywords_score ON keywords (score DESC)')
+
+    def add_seeds(self, seeds, language='en'):
+        """添加种子词（重复的种子词会被忽略，方便断点续跑）"""
+        rows = [(seed.strip(), language) for seed in seeds if seed.strip()]
+        with self._transaction():
+            self.conn.executemany('INSERT OR IGNORE INTO jobs (seed, language) VALUES (?, ?)', rows)
+        return len(rows)
+
+    def _expire_exhausted(self, now):
+        """租约已到期、尝试次数也用完的任务（最后一次尝试时进程崩溃）标记为 failed"""
+        self.conn.execute('''
+            UPDATE jobs SET status = 'failed', error = COALESCE(error, '工作进程崩溃，租约到期')
+            WHERE status = 'leased' AND lease_until < ? AND attempts >= ?
+        ''', (now, self.max_attempts))
+
+    def lease(self, worker_id):
+        """领取一个任务，返回 (job_id, seed, language)；没有可领取的任务时返回 None"""
+        now = time.time()
+        with self._transaction():
+            self._expire_exhausted(now)
+            row = self.conn.execute('''
+                SELECT id, seed, language FROM jobs
+                WHERE attempts < ? AND (status = 'pending' OR (status = 'leased' AND lease_until < ?))
+                ORDER BY id LIMIT 1
+            ''', (self.max_attempts, now)).fetchone()
+
+            if row is None:
+                return None
+
+            self.conn.execute('''
+                UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1
+                WHERE id = ?
+            ''', (worker_id, now + self.lease_seconds, row[0]))
+            return row
+
+    def renew(self, job_id, worker_id):
+        """续约（心跳）；租约已被其他进程接管或任务已结束时返回 False"""
+        with self._transaction():
+            cursor = self.conn.execute('''
+                UPDATE jobs SET lease_until = ?
+                WHERE id = ? AND worker = ? AND status = 'leased'
+            ''', (time.time() + self.lease_seconds, job_id, worker_id))
+            return cursor.rowcount == 1
+
+    @contextlib.contextmanager
+    def heartbeat(self, job_id, worker_id, interval=None):
+        """
+        处理任务期间在后台线程中定时续约（默认每 1/3 租约时长一次）
+        后台线程使用自己的数据库连接；续约失败（租约已被接管）时停止
+        """
+        interval = interval or self.lease_seconds / 3
+        stop = threading.Event()
+
+        def beat():
+            queue = JobQueue(self.path, lease_seconds=self.lease_seconds, max_attempts=self.max_attempts)
+            try:
+                while not stop.wait(interval):
+                    if not queue.renew(job_id, worker_id):
+                        print(f"[{worker_id}] ⚠️  任务 {job_id} 的租约已被接管，续约停止", file=sys.stderr)
+                        break
+            finally:
+                queue.close()
+
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(self, job_id, worker_id, seed, keyword_data):
+        """
+        保存结果（全局去重）并标记任务完成
+        只有仍持有租约的 worker_id 才能提交；租约已被接管时丢弃结果并返回 False
+        同一关键词（规范化后）保留分数最高的一条；分数相同时取种子词、关键词字典序较小的一条，
+        因此合并结果与各种子词的完成顺序无关
+        """
+        rows = [(' '.join(kw['keyword'].lower().split()), kw['keyword'], kw['score'], kw['word_count'], seed)
+                for kw in keyword_data]
+        with self._transaction():
+            cursor = self.conn.execute('''
+                UPDATE jobs SET status = 'done', error = NULL
+                WHERE id = ? AND worker = ? AND status = 'leased'
+            ''', (job_id, worker_id))
+            if cursor.rowcount == 0:
+                return False
+            self.conn.executemany('''
+                INSERT INTO keywords VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (normalized) DO UPDATE SET
+                    keyword = excluded.keyword, score = excluded.score,
+                    word_count = excluded.word_count, seed = excluded.seed
+                WHERE excluded.score > keywords.score
+                   OR (excluded.score = keywords.score
+                       AND (excluded.seed, excluded.keyword) < (keywords.seed, keywords.keyword))
+            ''', rows)
+            return True
+
+    def fail(self, job_id, worker_id, error):
+        """
+        任务失败：放回队列，超过最大次数后标记为 failed
+        租约已被接管时不修改任务并返回 False
+        """
+        with self._transaction():
+            cursor = self.conn.execute('''
+                UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                                error = ?, lease_until = 0
+                WHERE id = ? AND worker = ? AND status = 'leased'
+            ''', (self.max_attempts, str(error), job_id, worker_id))
+            return cursor.rowcount == 1
+
+    def unfinished(self):
+        """还未完成（待领取或正在处理）的任务数"""
+        with self._transaction():
+            self._expire_exhausted(time.time())
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN ('pending', 'leased')"
+            ).fetchone()[0]
+
+    def progress(self):
+        """各状态的任务数"""
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+
+    def export(self, filename):
+        """
+        把去重后的全部关键词按分数导出（逐行写出，不占用大量内存）
+        格式和压缩按扩展名：.csv / .jsonl，可再加 .gz / .zst
+        """
+        fields = ['keyword', 'score', 'word_count', 'seed']
+        with open_sink(filename, fields=fields) as sink:
+            rows = self.conn.execute('SELECT keyword, score, word_count, seed FROM keywords ORDER BY score DESC')
+            return sink.write_many(dict(zip(fields, row)) for row in rows)
+
+    def close(self):
+        self.conn.close()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        else:
+            self.conn.execute('COMMIT')
+
+
+def worker_main(db_path, worker_id, options):
+    """工作进程：循环领取任务直到队列清空"""
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+
+    queue = JobQueue(db_path, lease_seconds=options['lease_seconds'], max_attempts=options['max_attempts'])
+    log = open(os.devnull, 'w') if options['quiet'] else sys.stdout
+
+    with contextlib.redirect_stdout(log):
+        KeywordDigger = load_keyword_digger()
+        digger = KeywordDigger(use_proxy=options['use_proxy'], proxy_port=options['proxy_port'],
+                               max_workers=options['max_workers'], rate_limit=options['rate_limit'],
+                               journal_dir=options['journal_dir'])
+
+    while True:
+        job = queue.lease(worker_id)
+        if job is None:
+            if queue.unfinished() == 0:
+                break
+            # 其他进程还在处理（或崩溃后租约未到期），稍后再试
+            time.sleep(min(5, queue.lease_seconds))
+            continue
+
+        job_id, seed, language = job
+        print(f"[{worker_id}] ▶ {seed}", file=sys.stderr)
+        try:
+            with queue.heartbeat(job_id, worker_id), contextlib.redirect_stdout(log):
+                result = digger.run_complete_workflow(
+                    seed, language=language, analyze_competitors=False,
+                    expand_depth=options['expand_depth'], interactive=False, export_csv=False
+                )
+            if queue.complete(job_id, worker_id, seed, result['keywords']):
+                print(f"[{worker_id}] ✅ {seed}: {len(result['keywords'])} 个关键词", file=sys.stderr)
+            else:
+                print(f"[{worker_id}] ⚠️  {seed}: 租约已被其他进程接管，结果已丢弃", file=sys.stderr)
+        except Exception as e:
+            if queue.fail(job_id, worker_id, e):
+                print(f"[{worker_id}] ❌ {seed}: {e}", file=sys.stderr)
+            else:
+                print(f"[{worker_id}] ⚠️  {seed}: {e}（租约已被其他进程接管，失败未记录）", file=sys.stderr)
+
+    digger.transport.close()
+    queue.close()
+
+
+def run_jobs(seeds, workers=4, db_path='keyword_jobs.db', language='en', output='merged_keywords.csv',
+             use_proxy=True, proxy_port=7890, max_workers=8, rate_limit=5.0, expand_depth=1,
+             lease_seconds=600, max_attempts=3, journal_dir=None, quiet=True, max_restarts=3,
+             restart_backoff=2.0):
+    """
+    把种子词分发到多个工作进程，完成后合并导出
+    max_restarts: 每个工作进程位置最多重启几次（启动即失败的错误不会无限重启）
+    restart_backoff: 第一次重启前等待的秒数，之后每次翻倍（最多 60 秒）
+    """
+    queue = JobQueue(db_path, lease_seconds=lease_seconds, max_attempts=max_attempts)
+    added = queue.add_seeds(seeds, language)
+    print(f"📋 任务表: {db_path}（本次提交 {added} 个种子词，状态 {queue.progress()}）")
+
+    options = {
+        'use_proxy': use_proxy, 'proxy_port': proxy_port, 'max_workers': max_workers,
+        'rate_limit': rate_limit, 'expand_depth': expand_depth, 'lease_seconds': lease_seconds,
+        'max_attempts': max_attempts, 'journal_dir': journal_dir, 'quiet': quiet
+    }
+
+    def spawn(n):
+        process = multiprocessing.Process(target=worker_main, args=(db_path, f'worker-{n}', options))
+        process.start()
+        return process
+
+    processes = {n: spawn(n) for n in range(workers)}
+    restarts = dict.fromkeys(processes, 0)
+    restart_at = {}
+
+    # 监控工作进程：异常退出且仍有未完成任务时，退避后在同一个位置补一个新进程
+    while processes or restart_at:
+        for n, process in list(processes.items()):
+            process.join(timeout=1)
+            if process.is_alive():
+                continue
+            del processes[n]
+            if process.exitcode == 0 or queue.unfinished() == 0:
+                continue
+            if restarts[n] >= max_restarts:
+                print(f"❌ worker-{n} 已重启 {restarts[n]} 次仍异常退出 (exitcode={process.exitcode})，不再重启")
+                continue
+            delay = min(60.0, restart_backoff * 2 ** restarts[n])
+            restarts[n] += 1
+            print(f"⚠️  worker-{n} 异常退出 (exitcode={process.exitcode})，"
+                  f"{delay:.0f} 秒后重新启动（第 {restarts[n]}/{max_restarts} 次）")
+            restart_at[n] = time.monotonic() + delay
+
+        for n, at in list(restart_at.items()):
+            if time.monotonic() < at:
+                continue
+            del restart_at[n]
+            if queue.unfinished() > 0:
+                processes[n] = spawn(n)
+        if restart_at and not processes:
+            time.sleep(0.5)
+
+    if queue.unfinished() > 0:
+        print("⚠️  工作进程都已停止，仍有未完成的任务；修复问题后用同一个 --job-db 重新运行即可继续")
+    print(f"📊 任务状态: {queue.progress()}")
+    count = queue.export(output)
+    print(f"💾 合并导出 {count} 个去重关键词到: {output}")
+    queue.close()
+    return count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='多进程关键词挖掘任务')
+    parser.add_argument('--seeds-file', required=True, help='种子词文件，每行一个；"-" 表示从标准输入读取')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 4, help='工作进程数')
+    parser.add_argument('--job-db', default='keyword_jobs.db', help='任务表路径（用于断点续跑）')
+    parser.add_argument('--lang', default='en', help='语言 (en/zh)，默认 en')
+    parser.add_argument('--output', default='merged_keywords.csv', help='合并后的CSV文件')
+    parser.add_argument('--expand-depth', type=int, default=1, help='多层扩展深度，默认 1（单层）')
+    parser.add_argument('--no-proxy', action='store_true', help='不使用代理')
+    parser.add_argument('--proxy-port', type=int, default=7890, help='代理端口，默认 7890')
+    parser.add_argument('--concurrency', type=int, default=8, help='每个进程的并发请求数')
+    parser.add_argument('--rate-limit', type=float, default=5.0, help='每个进程每个主机每秒请求数')
+    parser.add_argument('--lease-seconds', type=int, default=600, help='任务租约时长（秒）')
+    parser.add_argument('--checkpoint-dir', help='断点日志目录，崩溃的种子词重新领取后从断点继续')
+    parser.add_argument('--max-restarts', type=int, default=3, help='每个工作进程异常退出后最多重启几次')
+    parser.add_argument('--verbose', action='store_true', help='显示工作进程的详细输出')
+    args = parser.parse_args()
+
+    if args.seeds_file == '-':
+        seeds = sys.stdin.read().splitlines()
+    else:
+        with open(args.seeds_file, encoding='utf-8') as f:
+            seeds = f.read().splitlines()
+
+    run_jobs(seeds, workers=args.workers, db_path=args.job_db, language=args.lang, output=args.output,
+             use_proxy=not args.no_proxy, proxy_port=args.proxy_port, max_workers=args.concurrency,
+             rate_limit=args.rate_limit, expand_depth=args.expand_depth,
+             lease_seconds=args.lease_seconds, journal_dir=args.checkpoint_dir, quiet=not args.verbose,
+             max_restarts=args.max_restarts)
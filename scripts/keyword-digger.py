@@ -5,86 +5,219 @@
 2. 分析竞争对手网站
 3. 评估关键词价值
 4. 生成站点建议
+
+用法：
+  python keyword-digger.py                                          # 交互模式
+  python keyword-digger.py --seed "coffee maker" --competitor URL   # 单个种子词
+  python keyword-digger.py --seeds-file seeds.txt --output out.jsonl
+  cat seeds.txt | python keyword-digger.py --seeds-file - --output -
+  python keyword-digger.py --seeds-file seeds.txt --expand-depth 4 --expand-to expanded.jsonl.gz
 """
 
 # -*- coding: utf-8 -*-
 import sys
 import io
+import argparse
+import contextlib
 
 # 修复Windows中文编码问题
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-import requests
 import json
-from urllib.parse import quote, urlparse
-import time
-from bs4 import BeautifulSoup
+from urllib.parse import urlparse
 import re
-from collections import Counter
-import csv
-from datetime import datetime
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+from competitor_tracker import FIELD_NAMES, CompetitorTracker
+from fetch_engine import ConcurrentFetcher
+from html_extract import analysis_version, extract_page
+from keyword_dedup import collapse_keywords
+from http_session import HttpTransport
+from keyword_scoring import load_rulebook, np, top_n
+from page_cache import PageCache
+from probe_journal import ProbeJournal
+from result_sinks import open_sink
+from serp_provider import make_serp_provider, pick_competitors
+from site_crawler import SiteCrawler
+from suggestion_cache import SuggestionCache
+from tokenizer import word_count
+from topic_clusters import OTHER_LABEL, cluster_keywords
+
+GOOGLE_SUGGEST_URL = "http://suggestqueries.google.com/complete/search"
+BAIDU_SUGGEST_URL = "https://www.baidu.com/sugrec"
+QUESTION_WORDS = ['how to', 'what is', 'why', 'when', 'where', 'best', 'top']
 
 class KeywordDigger:
     """免费关键词挖掘器"""
 
-    def __init__(self, use_proxy=True, proxy_port=7890):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    def __init__(self, use_proxy=True, proxy_port=7890, max_workers=8, rate_limit=5.0, transport=None,
+                 cache=None, cache_path='suggestion_cache.db', journal_dir=None, retries=3,
+                 rules_path=None, page_cache=None, page_cache_path='page_cache.db', tracker=None,
+                 serp_provider='google'):
+        # 共享的HTTP传输层（连接池、代理、请求头）；可由多个工具共用同一个实例
+        if transport is None:
+            transport = HttpTransport(use_proxy=use_proxy, proxy_port=proxy_port,
+                                      pool_maxsize=max(max_workers, 10))
+        self.transport = transport
+        self.headers = transport.headers
+        self.proxies = transport.proxies
+
+        # 并发抓取：max_workers 控制并发数，rate_limit 为每个主机每秒请求数
+        # 失败的请求按指数退避重试 retries 次
+        self.fetcher = ConcurrentFetcher(max_workers=max_workers, rate_per_host=rate_limit, retries=retries)
+
+        # 建议词持久化缓存；cache_path=None 时不使用缓存
+        if cache is None and cache_path:
+            cache = SuggestionCache(cache_path)
+        self.cache = cache
+
+        # 竞品页面缓存（条件请求 + 内容哈希）；page_cache_path=None 时不使用缓存
+        if page_cache is None and page_cache_path:
+            page_cache = PageCache(page_cache_path)
+        self.page_cache = page_cache
+
+        # 搜索结果提供者（自动发现竞争对手）：'google' / 'saved:目录' / 搜索页面URL模板 / SerpProvider 实例
+        self.serp = make_serp_provider(serp_provider, self.transport, self.cache) if serp_provider else None
+
+        # 竞品快照库（CompetitorTracker）；设置后每次分析都和上次快照比较，结果放在 analysis['changes']
+        self.tracker = tracker
+
+        # 评分规则（scoring_rules.json，修改后自动重新加载）
+        self.rules = load_rulebook(rules_path)
+
+        # 断点日志目录；设置后中断的任务可以从上次停下的探测词继续
+        self.journal_dir = journal_dir
+
+    def _fetch_google(self, query, language='en'):
+        """请求单个Google建议词探测"""
+        params = {
+            'client': 'firefox',
+            'q': query,
+            'hl': language
+        }
+        response = self.transport.get(GOOGLE_SUGGEST_URL, params=params, timeout=5)
+        data = json.loads(response.text)
+        return data[1] if len(data) > 1 else []
+
+    def _fetch_baidu(self, query, language=''):
+        """请求单个百度建议词探测"""
+        params = {
+            'prod': 'pc',
+            'wd': query,
+            'cb': 'jQuery'
         }
+        response = self.transport.get(BAIDU_SUGGEST_URL, params=params, timeout=5)
+        # 解析返回的JSONP
+        text = response.text
+        if 'jQuery' not in text:
+            return []
+        json_str = text[text.find('(')+1:text.rfind(')')]
+        data = json.loads(json_str)
+        return [item['q'] for item in data.get('g', [])]
 
-        # 设置代理（用于访问Google）
-        if use_proxy:
-            self.proxies = {
-                'http': f'http://127.0.0.1:{proxy_port}',
-                'https': f'http://127.0.0.1:{proxy_port}'
-            }
-            print(f"✅ 已启用代理: 127.0.0.1:{proxy_port}")
+    def _probe_queries(self, source, seed_keyword):
+        """生成一个种子词的全部探测词"""
+        if source == 'baidu':
+            return [f'{seed_keyword} {char}' for char in 'abcdefghijklmnopqrstuvwxyz0123456789']
+
+        # 策略1: 在关键词后加a-z
+        queries = [f'{seed_keyword} {char}' for char in 'abcdefghijklmnopqrstuvwxyz']
+        # 策略2: 问题词前缀
+        queries += [f'{qw} {seed_keyword}' for qw in QUESTION_WORDS]
+        return queries
+
+    def _open_journal(self, source, seed_keyword, language=''):
+        """打开断点日志；未设置 journal_dir 时返回 None"""
+        if not self.journal_dir:
+            return None
+        journal = ProbeJournal.for_run(self.journal_dir, source, seed_keyword, language)
+        if journal.done:
+            print(f"   ♻️  从断点继续: 已完成 {len(journal.done)} 个探测词")
+        return journal
+
+    def _close_journal(self, journal):
+        if journal is None:
+            return
+        if journal.failed:
+            print(f"   ⚠️  {len(journal.failed)} 个探测词重试后仍失败，已记录，下次运行会重新请求")
+        journal.finish()
+
+    @contextlib.contextmanager
+    def _journal(self, source, seed_keyword, language=''):
+        """
+        断点日志上下文：正常结束时 finish（没有失败的探测词就删除日志）；
+        出错、中断（KeyboardInterrupt / 生成器提前关闭）时只关闭文件，保留日志以便续跑
+        """
+        journal = self._open_journal(source, seed_keyword, language)
+        try:
+            yield journal
+        except BaseException:
+            if journal is not None:
+                journal.close()
+            raise
+        self._close_journal(journal)
+
+    def _probe(self, source, queries, language='', journal=None):
+        """
+        先查断点日志和缓存，剩下的探测词再并发请求（失败会按指数退避重试）
+        返回 [(query, result, error), ...]，顺序与 queries 一致
+        """
+        if source == 'baidu':
+            url, fetch, language = BAIDU_SUGGEST_URL, self._fetch_baidu, ''
         else:
-            self.proxies = None
-            print("⚠️  未使用代理")
+            url, fetch = GOOGLE_SUGGEST_URL, self._fetch_google
+
+        results = {}
+        pending = []
+        hits = 0
+        for query in queries:
+            if journal is not None and query in journal.done:
+                results[query] = (journal.done[query], None)
+                continue
+
+            cached = self.cache.get(source, query, language) if self.cache else None
+            if cached is None:
+                pending.append(query)
+            else:
+                results[query] = (cached, None)
+                hits += 1
+                if journal is not None:
+                    journal.record(query, cached)
+
+        if hits:
+            print(f"   💾 缓存命中 {hits}/{len(queries)}")
+
+        def on_result(query, result, error):
+            # 每个探测词完成时立即写入缓存和断点日志
+            if error is None:
+                if self.cache:
+                    self.cache.set(source, query, language, result)
+                if journal is not None:
+                    journal.record(query, result)
+            elif journal is not None:
+                journal.record_failure(query, error)
+
+        # 未命中的探测词并发请求，由令牌桶控制频率
+        for query, result, error in self.fetcher.map(lambda q: fetch(q, language), pending, url, on_result):
+            results[query] = (result, error)
+
+        return [(query,) + results[query] for query in queries]
 
     def get_google_suggestions(self, seed_keyword, language='en'):
         """获取Google搜索建议"""
         print(f"🔍 正在从Google获取建议词...")
         suggestions = set()
 
-        url = "http://suggestqueries.google.com/complete/search"
-
-        # 策略1: 在关键词后加a-z
-        for char in 'abcdefghijklmnopqrstuvwxyz':
-            params = {
-                'client': 'firefox',
-                'q': f'{seed_keyword} {char}',
-                'hl': language
-            }
-            try:
-                response = requests.get(url, params=params, proxies=self.proxies, timeout=5)
-                data = json.loads(response.text)
-                if len(data) > 1:
-                    suggestions.update(data[1])
-                time.sleep(0.3)
-            except Exception as e:
-                print(f"   ⚠️  请求失败: {char}")
-                continue
-
-        # 策略2: 问题词前缀
-        question_words = ['how to', 'what is', 'why', 'when', 'where', 'best', 'top']
-        for qw in question_words:
-            params = {
-                'client': 'firefox',
-                'q': f'{qw} {seed_keyword}',
-                'hl': language
-            }
-            try:
-                response = requests.get(url, params=params, proxies=self.proxies, timeout=5)
-                data = json.loads(response.text)
-                if len(data) > 1:
-                    suggestions.update(data[1])
-                time.sleep(0.3)
-            except:
-                continue
+        queries = self._probe_queries('google', seed_keyword)
+        with self._journal('google', seed_keyword, language) as journal:
+            for query, result, error in self._probe('google', queries, language, journal):
+                if error:
+                    print(f"   ⚠️  请求失败: {query}")
+                    continue
+                suggestions.update(result)
 
         print(f"   ✅ 找到 {len(suggestions)} 个Google建议词")
         return list(suggestions)
@@ -94,68 +227,184 @@ class KeywordDigger:
         print(f"🔍 正在从百度获取建议词...")
         suggestions = set()
 
-        url = "https://www.baidu.com/sugrec"
-
-        for char in 'abcdefghijklmnopqrstuvwxyz0123456789':
-            params = {
-                'prod': 'pc',
-                'wd': f'{seed_keyword} {char}',
-                'cb': 'jQuery'
-            }
-            try:
-                response = requests.get(url, params=params, proxies=self.proxies, timeout=5)
-                # 解析返回的JSONP
-                text = response.text
-                if 'jQuery' in text:
-                    json_str = text[text.find('(')+1:text.rfind(')')]
-                    data = json.loads(json_str)
-                    if 'g' in data:
-                        for item in data['g']:
-                            suggestions.add(item['q'])
-                time.sleep(0.3)
-            except:
-                continue
+        queries = self._probe_queries('baidu', seed_keyword)
+        with self._journal('baidu', seed_keyword) as journal:
+            for query, result, error in self._probe('baidu', queries, journal=journal):
+                if error:
+                    continue
+                suggestions.update(result)
 
         print(f"   ✅ 找到 {len(suggestions)} 个百度建议词")
         return list(suggestions)
 
+    def _normalize(self, keyword):
+        """规范化关键词（小写、合并空白），用于去重"""
+        return ' '.join(keyword.lower().split())
+
+    def expand_keywords(self, seed_keyword, language='en', source='google', max_depth=3, **options):
+        """多层关键词扩展，返回全部关键词列表（参数见 iter_expand_keywords）"""
+        return list(self.iter_expand_keywords(seed_keyword, language, source, max_depth, **options))
+
+    def iter_expand_keywords(self, seed_keyword, language='en', source='google', max_depth=3,
+                             max_queries=2000, max_keywords=100000, max_frontier=5000,
+                             min_new_terms=2, full_probes=False):
+        """
+        多层关键词扩展：把返回的建议词作为新种子继续挖掘，每批查询完成后逐个产出新发现的关键词
+        - 前沿队列按 score_keyword 从高到低出队，同分时浅层优先
+        - 按规范化形式去重，同一短语只查询一次
+        - 某个分支新增词少于 min_new_terms 时不再向下扩展
+        - max_queries / max_keywords / max_frontier 限制请求量和内存
+        full_probes: 为 True 时每个节点都使用完整探测词（a-z + 问题词），否则只有种子词使用
+        """
+        print(f"🌳 多层扩展: {seed_keyword} (最大深度 {max_depth}, 查询预算 {max_queries})")
+        seed = self._normalize(seed_keyword)
+        seen = {seed}
+        found = 0
+
+        # 前沿队列元素: (负评分, 深度, 入队序号, 短语)
+        frontier = [(-self.score_keyword(seed), 0, 0, seed)]
+        order = 1
+        queries_used = 0
+        batch_size = max(1, self.fetcher.max_workers * 2)
+
+        with self._journal(f'{source}-expand', seed_keyword, language) as journal:
+            while frontier and queries_used < max_queries and found < max_keywords:
+                # 一批节点的探测词合并后并发请求；批次大小受剩余查询预算限制，
+                # 放不下的节点留在前沿队列里（不会出队后被丢掉）
+                remaining = max_queries - queries_used
+                nodes = []
+                query_nodes = {}
+                while frontier and len(nodes) < batch_size:
+                    _, depth, _, phrase = frontier[0]
+                    probes = self._probe_queries(source, phrase) if depth == 0 or full_probes else [phrase]
+                    new_queries = {query for query in probes if query not in query_nodes}
+                    if nodes and len(query_nodes) + len(new_queries) > remaining:
+                        break
+
+                    # 单个节点的探测词就超过剩余预算时（只可能是批次的第一个节点），只查询预算内的部分
+                    index = len(nodes)
+                    nodes.append(heapq.heappop(frontier))
+                    for query in probes:
+                        if query in query_nodes:
+                            query_nodes[query].append(index)
+                        elif len(query_nodes) < remaining:
+                            query_nodes[query] = [index]
+
+                queries = list(query_nodes)
+                queries_used += len(queries)
+
+                new_terms = [[] for _ in nodes]
+                batch_keywords = []
+                for query, result, error in self._probe(source, queries, language, journal):
+                    if error:
+                        continue
+                    for suggestion in result:
+                        normalized = self._normalize(suggestion)
+                        if normalized in seen or found >= max_keywords:
+                            continue
+                        seen.add(normalized)
+                        found += 1
+                        batch_keywords.append(suggestion)
+                        new_terms[query_nodes[query][0]].append(normalized)
+                yield from batch_keywords
+
+                for (_, depth, _, _), terms in zip(nodes, new_terms):
+                    # 分支不再产生新词时提前截止
+                    if depth + 1 >= max_depth or len(terms) < min_new_terms:
+                        continue
+                    for term in terms:
+                        heapq.heappush(frontier, (-self.score_keyword(term), depth + 1, order, term))
+                        order += 1
+
+                if len(frontier) > max_frontier:
+                    # 只保留评分最高的节点（有序列表本身就是合法的堆）
+                    frontier = heapq.nsmallest(max_frontier, frontier)
+
+                print(f"   - 已查询 {queries_used} 次, 发现 {found} 个关键词, 待扩展 {len(frontier)}")
+
+        print(f"   ✅ 多层扩展共找到 {found} 个关键词")
+
     def search_google_for_competitors(self, keyword, num_results=10):
-        """搜索Google找到排名靠前的竞争对手"""
+        """搜索Google找到排名靠前的竞争对手（通过 SERP 提供者，结果会缓存）"""
         print(f"🔎 搜索Google找竞争对手: {keyword}")
 
-        # 注意：直接爬Google可能被封，建议使用代理或者手动输入
-        # 这里提供一个简化版本
-
-        url = f"https://www.google.com/search?q={quote(keyword)}&num={num_results}"
+        if self.serp is None:
+            print(f"   💡 未配置SERP提供者：手动搜索 '{keyword}' 并提供竞争对手URL")
+            return []
 
-        try:
-            response = requests.get(url, headers=self.headers, proxies=self.proxies, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # 提取搜索结果URL
-            competitors = []
-            for g in soup.find_all('div', class_='g'):
-                link = g.find('a')
-                if link and 'href' in link.attrs:
-                    href = link['href']
-                    if href.startswith('http'):
-                        domain = urlparse(href).netloc
-                        competitors.append({
-                            'url': href,
-                            'domain': domain,
-                            'title': g.find('h3').text if g.find('h3') else ''
-                        })
-
-            print(f"   ✅ 找到 {len(competitors)} 个竞争网站")
-            return competitors
+        competitors = self.serp.search(keyword, num=num_results)
+        print(f"   ✅ 找到 {len(competitors)} 个竞争网站")
+        return competitors
 
-        except Exception as e:
-            print(f"   ⚠️  Google搜索失败: {e}")
-            print(f"   💡 建议：手动搜索 '{keyword}' 并提供竞争对手URL")
+    def discover_competitors(self, queries, language='en', limit=3, num_results=10):
+        """批量搜索多个关键词，挑出最常出现在前排的竞争对手站点（返回首页URL列表）"""
+        if self.serp is None:
             return []
 
-    def analyze_competitor_site(self, url):
-        """深度分析竞争对手网站"""
+        queries = list(dict.fromkeys(queries))
+        print(f"\n🔎 通过搜索结果发现竞争对手（{len(queries)} 个关键词）...")
+        results = self.serp.search_many(queries, language=language.split('-')[0], num=num_results)
+        urls = pick_competitors(results, limit=limit)
+        for url in urls:
+            print(f"   - {url}")
+        if not urls:
+            print("   ⚠️  没有找到竞争对手")
+        return urls
+
+    def _analyze_page(self, response):
+        """解析单个页面（标题、Meta、内容结构、变现方式、技术栈、文章链接、导航分类）"""
+        # 错误页（404、被拦截、限流）不是站点内容：当作分析失败，不写入变化追踪
+        if response.status_code >= 400:
+            raise RuntimeError(f'HTTP {response.status_code}')
+
+        analysis = {}
+        page = extract_page(response.text, headers=response.headers, cookies=response.cookies.keys())
+
+        # 1. 基本信息
+        analysis['title'] = page['title']
+
+        # 2. Meta信息
+        if 'description' in page['meta']:
+            analysis['meta_description'] = page['meta']['description']
+
+        if 'keywords' in page['meta']:
+            analysis['keywords'] = [k.strip() for k in page['meta']['keywords'].split(',')]
+
+        # 3. 内容结构分析
+        analysis['content_structure'] = {
+            'h1_count': len(page['h1']),
+            'h2_count': len(page['h2']),
+            'h3_count': len(page['h3']),
+            'h1_texts': page['h1'][:5],
+            'h2_texts': page['h2'][:10]
+        }
+
+        # 4. 检测变现方式 / 5. 技术栈检测（特征库，记录命中的特征）
+        analysis['monetization'] = page['monetization']
+        analysis['tech_stack'] = page['tech_stack']
+        analysis['fingerprints'] = page['fingerprints']
+
+        # 6. 文章/内容页面链接
+        article_links = []
+        for href, _ in page['links']:
+            # 识别文章URL模式
+            if any(pattern in href for pattern in ['/blog/', '/post/', '/article/', '/review/']):
+                article_links.append(href)
+
+        analysis['article_count'] = len(set(article_links))
+        analysis['sample_articles'] = list(set(article_links))[:10]
+        analysis['article_urls'] = sorted(set(article_links))
+
+        # 7. 分类/导航
+        analysis['categories'] = page['nav_links'][:15]
+
+        return analysis
+
+    def analyze_competitor_site(self, url, crawl_pages=1):
+        """
+        深度分析竞争对手网站
+        crawl_pages: 大于1时沿站内链接继续抓取（最多 crawl_pages 页），统计真实的文章数和分类目录
+        """
         print(f"\n📊 分析网站: {url}")
 
         analysis = {
@@ -166,142 +415,104 @@ class KeywordDigger:
             'content_structure': {},
             'monetization': [],
             'tech_stack': [],
+            'fingerprints': [],
             'article_count': 0,
             'internal_links': [],
             'categories': []
         }
 
         try:
-            response = requests.get(url, headers=self.headers, proxies=self.proxies, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # 1. 基本信息
-            title = soup.find('title')
-            analysis['title'] = title.text.strip() if title else ''
-
-            # 2. Meta信息
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            if meta_desc and 'content' in meta_desc.attrs:
-                analysis['meta_description'] = meta_desc['content']
-
-            meta_keywords = soup.find('meta', attrs={'name': 'keywords'})
-            if meta_keywords and 'content' in meta_keywords.attrs:
-                analysis['keywords'] = [k.strip() for k in meta_keywords['content'].split(',')]
-
-            # 3. 内容结构分析
-            h1_tags = soup.find_all('h1')
-            h2_tags = soup.find_all('h2')
-            h3_tags = soup.find_all('h3')
-
-            analysis['content_structure'] = {
-                'h1_count': len(h1_tags),
-                'h2_count': len(h2_tags),
-                'h3_count': len(h3_tags),
-                'h1_texts': [h.text.strip() for h in h1_tags[:5]],
-                'h2_texts': [h.text.strip() for h in h2_tags[:10]]
-            }
-
-            # 4. 检测变现方式
-            html_text = response.text.lower()
-
-            if 'adsense' in html_text or 'googlesyndication' in html_text:
-                analysis['monetization'].append('Google AdSense')
-
-            if 'amazon-adsystem' in html_text or 'amzn.to' in html_text:
-                analysis['monetization'].append('Amazon Associates')
-
-            if 'mediavine' in html_text:
-                analysis['monetization'].append('Mediavine')
-
-            if 'ezoic' in html_text:
-                analysis['monetization'].append('Ezoic')
-
-            # 5. 技术栈检测
-            if 'wp-content' in html_text or 'wordpress' in html_text:
-                analysis['tech_stack'].append('WordPress')
-
-            if '__next' in html_text or '_next' in html_text:
-                analysis['tech_stack'].append('Next.js')
-
-            if 'gatsby' in html_text:
-                analysis['tech_stack'].append('Gatsby')
-
-            # 6. 文章/内容页面链接
-            article_links = []
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                # 识别文章URL模式
-                if any(pattern in href for pattern in ['/blog/', '/post/', '/article/', '/review/']):
-                    article_links.append(href)
-
-            analysis['article_count'] = len(set(article_links))
-            analysis['sample_articles'] = list(set(article_links))[:10]
-
-            # 7. 分类/导航
-            nav = soup.find('nav')
-            if nav:
-                categories = [a.text.strip() for a in nav.find_all('a') if a.text.strip()]
-                analysis['categories'] = categories[:15]
+            # 有页面缓存时发送条件请求；页面没变化就直接使用上次的分析结果
+            if self.page_cache:
+                page_analysis, response, status = self.page_cache.fetch(self.transport, url, self._analyze_page,
+                                                                        version=analysis_version())
+                if status != 'miss':
+                    print(f"   ♻️  页面未变化（{'304' if status == 'not_modified' else '内容哈希相同'}），使用缓存的分析结果")
+            else:
+                response = self.transport.get(url, timeout=10)
+                page_analysis = self._analyze_page(response)
+            analysis.update(page_analysis)
+
+            # 8. 站内抓取（统计全站文章数和分类目录树）
+            if crawl_pages > 1:
+                crawler = SiteCrawler(self.transport, max_pages=crawl_pages)
+                # 304 时没有页面内容，由爬虫重新下载首页
+                crawl = crawler.crawl(url, start_html=response.text if response.status_code == 200 else None)
+                analysis['crawled_pages'] = len(crawl['pages'])
+                analysis['article_count'] = len(crawl['article_urls'])
+                analysis['sample_articles'] = crawl['article_urls'][:10]
+                analysis['article_urls'] = crawl['article_urls']
+                analysis['category_tree'] = crawl['category_tree']
+                print(f"   - 抓取页数: {len(crawl['pages'])} (robots.txt 禁止 {crawl['blocked']} 个)")
+
+            # 9. 变化追踪（只和上次快照比较）
+            if self.tracker:
+                analysis['changes'] = self.tracker.record(analysis)['changes']
 
             print(f"   ✅ 分析完成")
             print(f"   - 标题: {analysis['title'][:50]}...")
             print(f"   - 变现方式: {', '.join(analysis['monetization']) if analysis['monetization'] else '未检测到'}")
             print(f"   - 技术栈: {', '.join(analysis['tech_stack']) if analysis['tech_stack'] else '未检测到'}")
             print(f"   - 文章数量: {analysis['article_count']}")
+            if analysis.get('changes'):
+                print(f"   - 与上次相比: {', '.join(FIELD_NAMES.get(f, f) for f in analysis['changes'])} 有变化")
 
             return analysis
 
         except Exception as e:
             print(f"   ❌ 分析失败: {e}")
+            analysis['error'] = str(e)
             return analysis
 
-    def score_keyword(self, keyword):
-        """关键词评分（0-100）"""
-        score = 0
-        kw_lower = keyword.lower()
-
-        # 1. 长度评分（长尾词更好）
-        word_count = len(keyword.split())
-        if word_count >= 4:
-            score += 25  # 长尾词最佳
-        elif word_count == 3:
-            score += 20
-        elif word_count == 2:
-            score += 10
-        else:
-            score += 5
-
-        # 2. 商业意图评分
-        high_intent = ['buy', 'price', 'cost', 'cheap', 'affordable', 'discount', 'deal']
-        medium_intent = ['best', 'top', 'review', 'vs', 'compare', 'alternative']
-
-        for word in high_intent:
-            if word in kw_lower:
-                score += 30
-                break
-        else:
-            for word in medium_intent:
-                if word in kw_lower:
-                    score += 20
-                    break
-
-        # 3. 内容类型评分
-        question_words = ['how', 'what', 'why', 'when', 'where', 'who', 'which']
-        for qw in question_words:
-            if kw_lower.startswith(qw):
-                score += 15
-                break
-
-        # 4. 具体性评分
-        if any(char.isdigit() for char in keyword):
-            score += 10  # 包含数字（如"top 10"）
+    def analyze_competitors(self, urls, crawl_pages=1, max_workers=4):
+        """并行分析多个竞争对手网站，结果顺序与 urls 一致"""
+        urls = list(urls)
+        if not urls:
+            return []
 
-        # 5. 年份评分（时效性）
-        current_year = datetime.now().year
-        if str(current_year) in keyword or str(current_year-1) in keyword:
-            score += 10
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+            return list(pool.map(lambda u: self.analyze_competitor_site(u, crawl_pages), urls))
 
-        return min(score, 100)
+    def score_keyword(self, keyword):
+        """
+        关键词评分（0-100）
+        长度（长尾词更好）+ 商业意图 + 问题词 + 数字 + 年份，规则见 scoring_rules.json 的 keyword 配置
+        """
+        return self.rules.scorer('keyword').score(keyword)
+
+    def score_batch(self, keywords, top=None):
+        """
+        批量评分，返回按分数从高到低排序的 [{'keyword', 'score', 'word_count'}, ...]
+        top: 只返回前 top 个（安装了 numpy 时用 partition 选取，不做全量排序）
+        """
+        keywords = list(keywords)
+        scorer = self.rules.scorer('keyword')
+
+        if np is None:
+            # 没有 numpy 时退回逐条评分 + 排序
+            keyword_data = [{'keyword': kw, 'score': score, 'word_count': word_count(kw)}
+                            for kw, score in zip(keywords, scorer.score_many(keywords))]
+            keyword_data.sort(key=lambda x: x['score'], reverse=True)
+            return keyword_data[:top] if top is not None else keyword_data
+
+        columns = scorer.score_batch(keywords)
+        scores = columns['score']
+        order = top_n(scores, len(keywords) if top is None else top)
+        word_counts = columns['word_count']
+        return [{'keyword': keywords[i], 'score': int(scores[i]), 'word_count': int(word_counts[i])}
+                for i in order.tolist()]
+
+    def collapse_duplicates(self, keyword_data, threshold=0.8):
+        """
+        合并重复和近似重复的关键词（词序不同、单复数、多一两个词）
+        keyword_data: score_batch 的结果（按分数排序），每组保留分数最高的写法，其余放到 aliases
+        """
+        by_keyword = {kw['keyword']: kw for kw in keyword_data}
+        groups = collapse_keywords([kw['keyword'] for kw in keyword_data], threshold=threshold)
+
+        collapsed = [{**by_keyword[group['keyword']], 'aliases': group['aliases']} for group in groups]
+        print(f"   🧹 合并近似重复: {len(keyword_data)} -> {len(collapsed)} 个关键词")
+        return collapsed
 
     def generate_site_plan(self, keyword_data, competitor_analysis):
         """根据关键词和竞品分析生成站点方案"""
@@ -315,21 +526,16 @@ class KeywordDigger:
             'content_strategy': {},
             'monetization_plan': [],
             'tech_stack': '',
-            'initial_articles': []
+            'initial_articles': [],
+            'clusters': []
         }
 
-        # 分析最佳利基市场
-        top_keywords = sorted(keyword_data, key=lambda x: x['score'], reverse=True)[:20]
-
-        # 提取共同主题
-        all_words = []
-        for kw in top_keywords:
-            all_words.extend(kw['keyword'].lower().split())
-
-        word_freq = Counter(all_words)
-        common_words = [w for w, c in word_freq.most_common(10)
-                       if w not in ['the', 'a', 'an', 'of', 'to', 'in', 'for', 'and', 'or']]
+        # 分析最佳利基市场：全部关键词按主题聚类，所有关键词共有的词就是利基市场
+        top_keywords = heapq.nlargest(20, keyword_data, key=lambda x: x['score'])
+        topics = cluster_keywords([kw['keyword'] for kw in keyword_data], [kw['score'] for kw in keyword_data])
+        plan['clusters'] = topics['clusters']
 
+        common_words = topics['common_terms'] or [w for c in topics['clusters'][:1] for w in c['label'].split()]
         plan['niche'] = ' '.join(common_words[:3])
 
         # 域名建议
@@ -371,8 +577,9 @@ class KeywordDigger:
         else:
             plan['tech_stack'] = 'Next.js (推荐，适合自动化)'
 
-        # 初始文章建议
-        plan['initial_articles'] = [kw['keyword'] for kw in top_keywords[:10]]
+        # 初始文章建议：先写各主题的支柱文章，不足10篇时用高分关键词补足
+        pillars = [c['pillar'] for c in plan['clusters'] if c['label'] != OTHER_LABEL]
+        plan['initial_articles'] = list(dict.fromkeys(pillars + [kw['keyword'] for kw in top_keywords]))[:10]
 
         # 打印方案
         print(f"\n📌 利基市场: {plan['niche']}")
@@ -384,6 +591,10 @@ class KeywordDigger:
         for article_type, count in plan['content_strategy']['article_types'].items():
             print(f"     • {article_type}: {count}篇")
 
+        print(f"\n🗂️  主题集群（{len(plan['clusters'])}个）:")
+        for cluster in plan['clusters'][:8]:
+            print(f"   • {cluster['label']}: 支柱文章「{cluster['pillar']}」+ {len(cluster['supporting'])}篇支撑文章")
+
         print(f"\n💰 变现方式: {', '.join(plan['monetization_plan'])}")
         print(f"⚙️  技术栈: {plan['tech_stack']}")
 
@@ -394,16 +605,44 @@ class KeywordDigger:
         return plan
 
     def export_to_csv(self, keyword_data, filename='keywords.csv'):
-        """导出关键词到CSV"""
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=['keyword', 'score', 'word_count'])
-            writer.writeheader()
-            writer.writerows(keyword_data)
-
-        print(f"\n💾 关键词已导出到: {filename}")
-
-    def run_complete_workflow(self, seed_keyword, language='en', analyze_competitors=True):
-        """完整工作流"""
+        """
+        导出关键词（逐行写出，keyword_data 可以是生成器）
+        格式和压缩按扩展名：.csv / .jsonl，可再加 .gz / .zst
+        """
+        with open_sink(filename, fields=['keyword', 'score', 'word_count', 'aliases']) as sink:
+            count = sink.write_many(keyword_data)
+
+        print(f"\n💾 {count} 个关键词已导出到: {filename}")
+
+    def stream_expansion(self, seeds, sink, language='en', source='google', max_depth=3, **options):
+        """
+        只做多层扩展，发现的关键词边评分边写入 sink（不汇总、不排序，内存只有去重集合和前沿队列）
+        返回写出的行数
+        """
+        scorer = self.rules.scorer('keyword')
+        for seed in seeds:
+            seed = seed.strip()
+            if not seed:
+                continue
+            for keyword in self.iter_expand_keywords(seed, language, source, max_depth, **options):
+                sink.write({'seed': seed, 'keyword': keyword, 'score': scorer.score(keyword),
+                            'word_count': word_count(keyword)})
+        return sink.count
+
+    def run_complete_workflow(self, seed_keyword, language='en', analyze_competitors=True, expand_depth=1,
+                              competitor_urls=None, interactive=True, export_csv=True, crawl_pages=1,
+                              discover_queries=5, dedup_threshold=0.8, export_ext='.csv'):
+        """
+        完整工作流
+        expand_depth: 大于1时使用多层扩展（expand_keywords）代替单层建议词
+        competitor_urls: 竞争对手URL列表；为 None 时用种子词和得分最高的关键词搜索，自动发现竞争对手
+                         （没有SERP提供者或没找到，且 interactive=True 时提示用户输入）
+        discover_queries: 自动发现时一次批量搜索的关键词数
+        interactive: 为 False 时不调用 input()，适合 cron / 批量任务
+        crawl_pages: 每个竞争对手站点最多抓取的页数（1 表示只分析首页）
+        dedup_threshold: 近似重复合并的相似度阈值（1.0 只合并词序/单复数不同的词，None 不合并）
+        export_ext: 导出文件的扩展名（.csv / .jsonl，可再加 .gz / .zst）
+        """
         print("\n" + "="*60)
         print(f"🚀 开始完整关键词挖掘流程")
         print(f"🎯 种子关键词: {seed_keyword}")
@@ -413,7 +652,13 @@ class KeywordDigger:
         # 步骤1: 挖掘关键词
         all_keywords = set()
 
-        if language == 'zh' or language == 'zh-CN':
+        if expand_depth > 1:
+            if language == 'zh' or language == 'zh-CN':
+                all_keywords.update(self.expand_keywords(seed_keyword, 'zh-CN', max_depth=expand_depth))
+                all_keywords.update(self.expand_keywords(seed_keyword, source='baidu', max_depth=expand_depth))
+            else:
+                all_keywords.update(self.expand_keywords(seed_keyword, language, max_depth=expand_depth))
+        elif language == 'zh' or language == 'zh-CN':
             # 中文市场
             google_kws = self.get_google_suggestions(seed_keyword, 'zh-CN')
             baidu_kws = self.get_baidu_suggestions(seed_keyword)
@@ -426,16 +671,9 @@ class KeywordDigger:
 
         # 步骤2: 评分
         print(f"\n⭐ 评分 {len(all_keywords)} 个关键词...")
-        keyword_data = []
-        for kw in all_keywords:
-            score = self.score_keyword(kw)
-            keyword_data.append({
-                'keyword': kw,
-                'score': score,
-                'word_count': len(kw.split())
-            })
-
-        keyword_data.sort(key=lambda x: x['score'], reverse=True)
+        keyword_data = self.score_batch(list(all_keywords))
+        if dedup_threshold is not None:
+            keyword_data = self.collapse_duplicates(keyword_data, dedup_threshold)
 
         # 步骤3: 显示top关键词
         print(f"\n🏆 Top 20 关键词:\n")
@@ -449,26 +687,30 @@ class KeywordDigger:
             print("🔍 分析竞争对手网站")
             print(f"{'='*60}")
 
-            # 让用户输入竞争对手URL（因为自动搜索Google可能被封）
-            print("\n💡 请手动搜索Google找到排名前3的网站，然后输入URL")
-            print("   (如果不想分析，直接按Enter跳过)\n")
+            if competitor_urls is None and self.serp is not None:
+                queries = [seed_keyword] + [kw['keyword'] for kw in keyword_data[:max(discover_queries - 1, 0)]]
+                competitor_urls = self.discover_competitors(queries, language) or None
 
-            competitor_urls = []
-            for i in range(3):
-                url = input(f"   竞争对手{i+1} URL: ").strip()
-                if url:
-                    competitor_urls.append(url)
+            if competitor_urls is None and interactive:
+                # 自动发现失败时让用户输入竞争对手URL
+                print("\n💡 请手动搜索Google找到排名前3的网站，然后输入URL")
+                print("   (如果不想分析，直接按Enter跳过)\n")
 
-            for url in competitor_urls:
-                analysis = self.analyze_competitor_site(url)
-                competitor_analysis.append(analysis)
+                competitor_urls = []
+                for i in range(3):
+                    url = input(f"   竞争对手{i+1} URL: ").strip()
+                    if url:
+                        competitor_urls.append(url)
+
+            competitor_analysis = self.analyze_competitors(competitor_urls or [], crawl_pages=crawl_pages)
 
         # 步骤5: 生成站点方案
         if competitor_analysis:
             plan = self.generate_site_plan(keyword_data, competitor_analysis)
 
         # 步骤6: 导出
-        self.export_to_csv(keyword_data, f'{seed_keyword.replace(" ", "_")}_keywords.csv')
+        if export_csv:
+            self.export_to_csv(keyword_data, f'{seed_keyword.replace(" ", "_")}_keywords{export_ext}')
 
         print(f"\n{'='*60}")
         print("✅ 完整流程完成！")
@@ -480,9 +722,119 @@ class KeywordDigger:
             'plan': plan if competitor_analysis else None
         }
 
+    def run_batch(self, seeds, language='en', competitor_urls=None, expand_depth=1, export_csv=True,
+                  crawl_pages=1, discover_competitors=False, dedup_threshold=0.8, export_ext='.csv'):
+        """
+        批量运行多个种子词（非交互），逐个产出结果
+        同一进程内复用连接池和缓存
+        discover_competitors: 没有给出 competitor_urls 时，通过搜索结果为每个种子词自动发现竞争对手
+        """
+        for seed in seeds:
+            seed = seed.strip()
+            if not seed:
+                continue
 
-# 使用示例
-if __name__ == '__main__':
+            try:
+                result = self.run_complete_workflow(
+                    seed, language=language,
+                    analyze_competitors=bool(competitor_urls) or discover_competitors,
+                    expand_depth=expand_depth,
+                    competitor_urls=competitor_urls,
+                    interactive=False,
+                    export_csv=export_csv,
+                    crawl_pages=crawl_pages,
+                    dedup_threshold=dedup_threshold,
+                    export_ext=export_ext
+                )
+            except Exception as e:
+                print(f"❌ 种子词处理失败: {seed} ({e})")
+                yield {'seed': seed, 'error': str(e)}
+                continue
+
+            yield {'seed': seed, **result}
+
+
+def parse_args(argv=None):
+    """命令行参数（不带参数运行时进入交互模式）"""
+    parser = argparse.ArgumentParser(description='免费关键词挖掘 + 竞品分析工具')
+    parser.add_argument('--seed', action='append', default=[], help='种子关键词（可重复）')
+    parser.add_argument('--seeds-file', help='种子词文件，每行一个；"-" 表示从标准输入读取')
+    parser.add_argument('--lang', default='en', help='语言 (en/zh)，默认 en')
+    parser.add_argument('--competitor', action='append', default=[], help='竞争对手URL（可重复）')
+    parser.add_argument('--expand-depth', type=int, default=1, help='多层扩展深度，默认 1（单层）')
+    parser.add_argument('--no-proxy', action='store_true', help='不使用代理')
+    parser.add_argument('--proxy-port', type=int, default=7890, help='代理端口，默认 7890')
+    parser.add_argument('--workers', type=int, default=8, help='并发请求数，默认 8')
+    parser.add_argument('--rate-limit', type=float, default=5.0, help='每个主机每秒请求数，默认 5')
+    parser.add_argument('--output', help='结果输出为JSONL文件，"-" 表示标准输出')
+    parser.add_argument('--no-csv', action='store_true', help='不为每个种子词单独导出CSV')
+    parser.add_argument('--export-ext', default='.csv',
+                        help='每个种子词导出文件的扩展名：.csv / .jsonl，可再加 .gz / .zst，默认 .csv')
+    parser.add_argument('--expand-to', metavar='PATH',
+                        help='只做多层扩展（深度见 --expand-depth，至少 2），发现的关键词边评分边写入该文件，适合超大扩展')
+    parser.add_argument('--crawl-pages', type=int, default=1, help='每个竞争对手站点最多抓取的页数，默认 1（只分析首页）')
+    parser.add_argument('--dedup-threshold', type=float, default=0.8,
+                        help='近似重复关键词的合并阈值（0-1），默认 0.8；1 只合并词序/单复数不同的词')
+    parser.add_argument('--checkpoint-dir', help='断点日志目录，中断后重新运行会从断点继续')
+    parser.add_argument('--track-db', help='竞品快照库路径，设置后输出与上次分析相比的变化')
+    parser.add_argument('--discover', action='store_true', help='没有 --competitor 时通过搜索结果自动发现竞争对手')
+    parser.add_argument('--serp', default='google',
+                        help='搜索结果来源: google / saved:目录 / 搜索页面URL模板（可用 {query} {num} {language}）')
+    return parser.parse_args(argv)
+
+
+def iter_seeds(args):
+    """依次产出命令行、文件或标准输入中的种子词"""
+    yield from args.seed
+
+    if args.seeds_file == '-':
+        yield from sys.stdin
+    elif args.seeds_file:
+        with open(args.seeds_file, encoding='utf-8') as f:
+            yield from f
+
+
+def run_cli(args):
+    """非交互批量模式：结果逐行写入JSONL"""
+    out = sys.stdout
+    # 输出到标准输出时，把进度信息改到标准错误，避免混入结果
+    log = sys.stderr if args.output == '-' else sys.stdout
+
+    with contextlib.redirect_stdout(log):
+        digger = KeywordDigger(use_proxy=not args.no_proxy, proxy_port=args.proxy_port,
+                               max_workers=args.workers, rate_limit=args.rate_limit,
+                               journal_dir=args.checkpoint_dir,
+                               tracker=CompetitorTracker(args.track_db) if args.track_db else None,
+                               serp_provider=args.serp)
+        # 每个种子词的结果写一行 JSON 并立即刷新（--output 以 .gz / .zst 结尾时压缩）
+        sink = open_sink(args.output, format='jsonl', append=True, stdout=out, flush_every=1) if args.output else None
+
+        try:
+            if args.expand_to:
+                with open_sink(args.expand_to) as expansion:
+                    count = digger.stream_expansion(iter_seeds(args), expansion, language=args.lang,
+                                                    max_depth=max(args.expand_depth, 2))
+                print(f"\n💾 {count} 个关键词已写入: {args.expand_to}")
+                return
+
+            for result in digger.run_batch(iter_seeds(args), language=args.lang,
+                                           competitor_urls=args.competitor or None,
+                                           expand_depth=args.expand_depth,
+                                           export_csv=not args.no_csv,
+                                           crawl_pages=args.crawl_pages,
+                                           discover_competitors=args.discover,
+                                           dedup_threshold=args.dedup_threshold,
+                                           export_ext=args.export_ext):
+                if sink:
+                    sink.write(result)
+        finally:
+            if sink:
+                sink.close()
+            digger.transport.close()
+
+
+def run_interactive():
+    """交互模式（原有使用方式）"""
     print("🎯 免费关键词挖掘 + 竞品分析工具")
     print("="*60)
 
@@ -511,3 +863,11 @@ if __name__ == '__main__':
     print("   2. 根据方案注册域名")
     print("   3. 开始创建网站和内容")
     print("   4. 申请广告联盟账号")
+
+
+# 使用示例
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run_cli(parse_args())
+    else:
+        run_interactive()
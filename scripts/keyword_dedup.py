@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+关键词近似去重
+功能：
+1. 规范形式：小写、去标点、去掉复数 s、词集合排序，"easy air fryer recipes" 和 "air fryer recipe easy" 相同
+   （没有任何词的关键词，例如纯标点，没有规范形式，不和其他词合并）
+2. 规范形式相同的直接合并（哈希，O(n)）
+3. 其余用 MinHash + LSH 分桶找近似重复，只比较同一个桶里的词，不做两两比较
+4. 每组保留第一个出现的词作为规范关键词，其余作为别名（传入按分数排好序的列表即可保留最高分的写法）
+
+安装了 numpy 时 MinHash 签名和分桶都是向量化计算，百万级关键词也只需线性时间
+"""
+
+import random
+import re
+from collections import defaultdict
+
+from tokenizer import singular
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 默认 64 个哈希 = 16 个桶 x 每桶 4 行：Jaccard 0.8 的词几乎一定进同一个桶，0.3 以下很少
+NUM_PERM = 64
+BANDS = 16
+
+# 同一个桶里每个词最多和多少个代表词比较（桶很大时保证线性时间）
+MAX_REPRESENTATIVES = 8
+
+_TOKEN = re.compile(r'\w+')
+_CJK = re.compile(r'[一-鿿]')
+_MASK64 = (1 << 64) - 1
+
+
+def canonical_form(keyword):
+    """规范形式：词集合（去复数、去重、排序）"""
+    return ' '.join(sorted({singular(t) for t in _TOKEN.findall(keyword.lower())}))
+
+
+def shingles(canonical):
+    """MinHash 的特征集合：多个词时用词集合；单个中文词组用字的二元组"""
+    tokens = canonical.split()
+    if len(tokens) == 1 and _CJK.search(canonical) and len(canonical) > 2:
+        return frozenset(canonical[i:i + 2] for i in range(len(canonical) - 1))
+    return frozenset(tokens)
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _permutations(num_perm, seed=1):
+    """multiply-shift 哈希参数（奇数乘数）"""
+    rng = random.Random(seed)
+    return [(rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(num_perm)]
+
+
+def minhash_signatures(feature_sets, num_perm=NUM_PERM, seed=1):
+    """
+    计算每个特征集合的 MinHash 签名（特征集合不能为空）
+    有 numpy 时返回 (n, num_perm) 的 uint32 数组，否则返回元组列表
+    """
+    perms = _permutations(num_perm, seed)
+    # 同一进程内 hash() 稳定，足够用于分桶
+    hashed = [[hash(f) & 0xFFFFFFFF for f in features] for features in feature_sets]
+
+    if np is None:
+        return [tuple(min((((a * x + b) & _MASK64) >> 32) for x in xs) for a, b in perms) for xs in hashed]
+
+    lengths = np.fromiter(map(len, hashed), dtype=np.int64, count=len(hashed))
+    offsets = np.zeros(len(hashed), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=offsets[1:])
+    values = np.fromiter((x for xs in hashed for x in xs), dtype=np.uint64, count=int(lengths.sum()))
+
+    signatures = np.empty((len(hashed), num_perm), dtype=np.uint32)
+    with np.errstate(over='ignore'):
+        for i, (a, b) in enumerate(perms):
+            h = (values * np.uint64(a) + np.uint64(b)) >> np.uint64(32)
+            signatures[:, i] = np.minimum.reduceat(h, offsets)
+    return signatures
+
+
+def lsh_buckets(signatures, bands=BANDS):
+    """按桶分组，逐个产出同一个桶里的下标列表（只产出至少两个元素的桶）"""
+    if np is None:
+        rows = len(signatures[0]) // bands if signatures else 0
+        for band in range(bands):
+            buckets = defaultdict(list)
+            for index, signature in enumerate(signatures):
+                buckets[signature[band * rows:(band + 1) * rows]].append(index)
+            for members in buckets.values():
+                if len(members) > 1:
+                    yield members
+        return
+
+    rows = signatures.shape[1] // bands
+    for band in range(bands):
+        # 每个桶的几行签名合成一个 64 位键，排序后相邻的相同键就是同一个桶
+        block = signatures[:, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = np.zeros(len(block), dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for column in range(rows):
+                keys = keys * np.uint64(0x100000001B3) + block[:, column]
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.concatenate(([0], np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1))
+        ends = np.append(starts[1:], len(order))
+        # 只取出有两个以上元素的桶（绝大多数桶只有一个词）
+        for start, end in zip(starts[ends - starts > 1].tolist(), ends[ends - starts > 1].tolist()):
+            yield order[start:end].tolist()
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        """合并两个集合，保留下标小的作为根（即更早出现的词）"""
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            if j < i:
+                i, j = j, i
+            self.parent[j] = i
+
+
+def collapse_keywords(keywords, threshold=0.8, num_perm=NUM_PERM, bands=BANDS):
+    """
+    合并重复和近似重复的关键词
+    keywords: 关键词列表（顺序决定规范关键词：每组保留最先出现的）
+    threshold: 特征集合 Jaccard 相似度达到该值才合并，1.0 表示只合并规范形式相同的词
+    返回 [{'keyword': 规范关键词, 'aliases': [别名, ...]}, ...]，保持原来的顺序
+    """
+    # 1. 规范形式完全相同的直接合并
+    groups = {}
+    for keyword in keywords:
+        # 规范形式为空时各自成组（只合并完全相同的写法），不能都归到同一个空形式下
+        form = canonical_form(keyword) or (None, keyword)
+        if form in groups:
+            if keyword != groups[form][0]:
+                groups[form].append(keyword)
+        else:
+            groups[form] = [keyword]
+
+    forms = list(groups)
+    union = _UnionFind(len(forms))
+
+    # 2. MinHash + LSH 找近似重复（只比较同一个桶里的词）
+    fuzzy = [i for i, form in enumerate(forms) if isinstance(form, str)] if threshold < 1.0 else []
+    if len(fuzzy) > 1:
+        features = [shingles(forms[i]) for i in fuzzy]
+        signatures = minhash_signatures(features, num_perm)
+        for members in lsh_buckets(signatures, bands):
+            representatives = []
+            for member in members:
+                for rep in representatives:
+                    if jaccard(features[member], features[rep]) >= threshold:
+                        union.union(fuzzy[member], fuzzy[rep])
+                        break
+                else:
+                    if len(representatives) < MAX_REPRESENTATIVES:
+                        representatives.append(member)
+
+    # 3. 按根汇总，规范关键词是组里最早出现的词
+    clusters = {}
+    for i, form in enumerate(forms):
+        clusters.setdefault(union.find(i), []).extend(groups[form])
+
+    return [{'keyword': members[0], 'aliases': members[1:]} for members in clusters.values()]
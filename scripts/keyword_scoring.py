@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+"""
+关键词评分引擎
+功能：
+1. 评分规则统一放在 scoring_rules.json（也支持 YAML），编译一次后复用
+2. 每组词预编译成一个正则，不再逐词 in 循环
+3. 批量评分：一批关键词拼成一个文本，每条规则只扫描一次
+4. 列式批量评分 score_batch + partition 取 Top N（需要 numpy）
+5. 规则文件修改后自动重新加载，长时间运行的批量任务无需重启
+
+规则类型（见 scoring_rules.json）：
+  word_count  按词数分档（中文按 tokenizer 分词计数）tiers: [[最少词数, 分数], ...]，取第一个满足的档
+  contains    包含任一词 words，加 points；match: substring（默认）/ word（单词边界）/ prefix（开头）
+              同一 group 内只有第一个命中的规则计分
+              内置配置都用 substring，与原来的 in 判断得分一致（laptop 也算命中 top）；
+              需要按单词边界匹配时在规则里写 "match": "word"
+  digit       包含数字（与 str.isdigit 一致，² ① 之类的数字符号也算）
+  year        包含今年或去年的年份
+  traffic     流量字符串中的数值（支持 200,000+ / 1.2M / 3万）tiers: [[大于该值, 分数], ...]
+  burst       热词的 EWMA z-score（需要轮询历史，见 trend_momentum）tiers: [[大于该值, 分数], ...]
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime
+
+import tokenizer
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_rules.json')
+
+# 单位必须是完整的词：k/m 后面不能紧跟字母，"3 months" 是 3，"10 kids" 是 10
+_TRAFFIC_NUMBER = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*((?:[km]|thousand|million|billion)(?![A-Za-z])|[万亿]|)',
+                             re.IGNORECASE)
+_TRAFFIC_UNITS = {'': 1, 'k': 1e3, 'm': 1e6, 'thousand': 1e3, 'million': 1e6, 'billion': 1e9,
+                  '万': 1e4, '亿': 1e8}
+
+
+def traffic_value(traffic):
+    """把流量文本转成数值：'200,000+' -> 200000, '1.2万热度' -> 12000, 'N/A' -> None"""
+    match = _TRAFFIC_NUMBER.search(str(traffic or ''))
+    if not match:
+        return None
+    return float(match.group(1).replace(',', '')) * _TRAFFIC_UNITS[match.group(2).lower()]
+
+
+class PatternMatcher:
+    """把一组词编译成一个正则"""
+
+    def __init__(self, words, word_boundary=False, anchored=False):
+        # 长词优先，避免短词抢先匹配
+        alternation = '|'.join(re.escape(w) for w in sorted(set(words), key=len, reverse=True))
+        pattern = f'(?:{alternation})' if words else r'(?!)'
+        if word_boundary:
+            pattern = rf'(?<!\w){pattern}(?!\w)'
+        if anchored:
+            pattern = '^' + pattern
+        self.anchored = anchored
+        self.regex = re.compile(pattern, re.MULTILINE)
+
+    def search(self, text):
+        """text 中是否包含任意一个词（anchored 时只看开头）"""
+        if self.anchored:
+            return self.regex.match(text) is not None
+        return self.regex.search(text) is not None
+
+    def search_lines(self, text, line_starts):
+        """
+        在多行文本中一次扫描，返回包含匹配的行号集合
+        line_starts: 每行起始位置（升序）
+        """
+        return _matching_lines(self.regex, text, line_starts)
+
+
+def _matching_lines(regex, text, line_starts):
+    """从前往后扫描一次；某行命中后直接跳到下一行"""
+    lines = set()
+    last = len(line_starts) - 1
+    pos = 0
+    while True:
+        match = regex.search(text, pos)
+        if match is None:
+            return lines
+        line = bisect_right(line_starts, match.start()) - 1
+        lines.add(line)
+        if line == last:
+            return lines
+        pos = line_starts[line + 1]
+
+
+def _as_list(column):
+    """把 numpy / pandas / pyarrow 的字符串列转换为 Python 字符串列表"""
+    if hasattr(column, 'to_pylist'):  # pyarrow
+        return column.to_pylist()
+    if hasattr(column, 'tolist'):  # numpy / pandas
+        return column.tolist()
+    return list(column)
+
+
+def top_n(scores, n):
+    """
+    返回分数最高的 n 个下标（按分数从高到低，同分保持原顺序）
+    先用 partition 找到第 n 大的分数，只对入选的 n 个排序，不做全量排序
+    """
+    scores = np.asarray(scores)
+    if n <= 0:
+        return np.empty(0, dtype=np.int64)
+    if n >= len(scores):
+        return np.argsort(-scores, kind='stable')
+
+    # 第 n 大的分数；高于它的全部入选，等于它的按下标顺序补足
+    kth = -np.partition(-scores, n - 1)[n - 1]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:n - len(above)]
+    index = np.concatenate([above, ties])
+    return index[np.lexsort((index, -scores[index]))]
+
+
+def _join_lines(texts):
+    """把一批文本拼成多行文本，返回 (文本, 每行起始位置)"""
+    texts = [t.replace('\n', ' ') for t in texts]
+    starts = []
+    pos = 0
+    for t in texts:
+        starts.append(pos)
+        pos += len(t) + 1
+    return '\n'.join(texts), starts
+
+
+class _YearPattern:
+    """今年或去年的年份（跨年时自动更新）"""
+
+    def __init__(self):
+        self._year = None
+        self._regex = None
+
+    @property
+    def regex(self):
+        year = datetime.now().year
+        if year != self._year:
+            self._year = year
+            self._regex = re.compile(f'{year}|{year - 1}', re.MULTILINE)
+        return self._regex
+
+    def search(self, text):
+        return self.regex.search(text) is not None
+
+    def search_lines(self, text, line_starts):
+        return _matching_lines(self.regex, text, line_starts)
+
+
+class _DigitPattern:
+    """包含数字：与原来的 any(c.isdigit() for c in text) 一致"""
+
+    # \d 只匹配十进制数字，isdigit 还包括上标、下标、带圈数字等（按 Unicode 14.0 列出）
+    regex = re.compile('[\\d'
+                       '\u00b2\u00b3\u00b9\u1369-\u1371\u19da\u2070\u2074-\u2079\u2080-\u2089'
+                       '\u2460-\u2468\u2474-\u247c\u2488-\u2490\u24ea\u24f5-\u24fd\u24ff'
+                       '\u2776-\u277e\u2780-\u2788\u278a-\u2792'
+                       '\U00010a40-\U00010a43\U00010e60-\U00010e68\U00011052-\U0001105a'
+                       '\U0001f100-\U0001f10a]')
+
+    def search(self, text):
+        return self.regex.search(text) is not None
+
+    def search_lines(self, text, line_starts):
+        return _matching_lines(self.regex, text, line_starts)
+
+
+class RuleScorer:
+    """由一组规则（scoring_rules.json 中的一个配置）编译出的评分器"""
+
+    def __init__(self, config):
+        self.min = config.get('min')
+        self.max = config.get('max')
+        self.length_tiers = []
+        self.traffic_tiers = []
+        self.burst_tiers = []
+        # 文本规则: (名称, 匹配器, 分数, 互斥组)
+        self.text_rules = []
+
+        for rule in config['rules']:
+            kind = rule['type']
+            if kind == 'word_count':
+                self.length_tiers = [tuple(t) for t in rule['tiers']]
+            elif kind == 'traffic':
+                self.traffic_tiers = [tuple(t) for t in rule['tiers']]
+            elif kind == 'burst':
+                self.burst_tiers = [tuple(t) for t in rule['tiers']]
+            else:
+                if kind == 'contains':
+                    match = rule.get('match', 'substring')
+                    matcher = PatternMatcher(rule['words'], word_boundary=(match == 'word'),
+                                             anchored=(match == 'prefix'))
+                elif kind == 'digit':
+                    matcher = _DigitPattern()
+                elif kind == 'year':
+                    matcher = _YearPattern()
+                else:
+                    raise ValueError(f'未知的规则类型: {kind}')
+                self.text_rules.append((rule['name'], matcher, rule['points'], rule.get('group')))
+
+    def _length_score(self, word_count):
+        for min_words, points in self.length_tiers:
+            if word_count >= min_words:
+                return points
+        return 0
+
+    def _traffic_score(self, traffic):
+        if not self.traffic_tiers or not traffic or traffic == 'N/A':
+            return 0
+        value = traffic_value(traffic)
+        if value is None:
+            return 0
+        for threshold, points in self.traffic_tiers:
+            if value > threshold:
+                return points
+        return 0
+
+    def _burst_score(self, zscore):
+        if not self.burst_tiers or zscore is None:
+            return 0
+        for threshold, points in self.burst_tiers:
+            if zscore > threshold:
+                return points
+        return 0
+
+    def _clamp(self, score):
+        if self.max is not None:
+            score = min(score, self.max)
+        if self.min is not None:
+            score = max(score, self.min)
+        return score
+
+    def _rule_points(self, hits):
+        """hits: 每条文本规则是否命中；同一互斥组只计第一个命中的规则"""
+        score = 0
+        taken = set()
+        for (_, _, points, group), hit in zip(self.text_rules, hits):
+            if not hit or (group and group in taken):
+                continue
+            if group:
+                taken.add(group)
+            score += points
+        return score
+
+    def score(self, text, traffic=None, burst=None):
+        """单条评分（burst: 热词的 z-score，没有历史时为 None）"""
+        lower = text.lower()
+        score = self._length_score(tokenizer.word_count(text))
+        score += self._rule_points([matcher.search(lower) for _, matcher, _, _ in self.text_rules])
+        score += self._traffic_score(traffic)
+        score += self._burst_score(burst)
+        return self._clamp(score)
+
+    def _rule_lines(self, texts):
+        """每条文本规则扫描一次整批文本，返回每条规则命中的行号集合"""
+        lower, starts = _join_lines([t.lower() for t in texts])
+        return [matcher.search_lines(lower, starts) for _, matcher, _, _ in self.text_rules]
+
+    def score_many(self, texts, traffics=None, bursts=None):
+        """批量评分：每条规则只扫描一次整批文本"""
+        texts = list(texts)
+        if not texts:
+            return []
+        if np is not None:
+            return self.score_batch(texts, traffics, bursts)['score'].tolist()
+
+        rule_lines = self._rule_lines(texts)
+        scores = []
+        for i, text in enumerate(texts):
+            score = self._length_score(tokenizer.word_count(text))
+            score += self._rule_points([i in lines for lines in rule_lines])
+            if traffics is not None:
+                score += self._traffic_score(traffics[i])
+            if bursts is not None:
+                score += self._burst_score(bursts[i])
+            scores.append(self._clamp(score))
+        return scores
+
+    def score_batch(self, texts, traffics=None, bursts=None):
+        """
+        列式批量评分（需要 numpy）
+        texts: list / numpy 数组 / pandas Series / pyarrow 字符串数组
+        返回 {列名: 数组}: keyword, score, word_count, 以及每条文本规则是否命中的布尔列
+        （分数与 score 完全一致）
+        """
+        if np is None:
+            raise ImportError('score_batch 需要 numpy: pip install numpy')
+
+        texts = _as_list(texts)
+        n = len(texts)
+        columns = {'keyword': texts}
+
+        word_count = np.fromiter(map(tokenizer.word_count, texts), dtype=np.int32, count=n)
+        score = np.zeros(n, dtype=np.int32)
+
+        # 词数分档：从后往前覆盖，保证取第一个满足的档
+        length = np.zeros(n, dtype=np.int32)
+        for min_words, points in reversed(self.length_tiers):
+            length[word_count >= min_words] = points
+        score += length
+
+        taken = {}
+        for (name, _, points, group), lines in zip(self.text_rules, self._rule_lines(texts)):
+            mask = np.zeros(n, dtype=bool)
+            if lines:
+                mask[np.fromiter(lines, dtype=np.int64, count=len(lines))] = True
+            columns[name] = mask
+
+            effective = mask
+            if group:
+                group_taken = taken.get(group, np.zeros(n, dtype=bool))
+                effective = mask & ~group_taken
+                taken[group] = group_taken | mask
+            score += points * effective
+
+        if traffics is not None:
+            traffics = _as_list(traffics)
+            score += np.fromiter(map(self._traffic_score, traffics), dtype=np.int32, count=n)
+        if bursts is not None:
+            score += np.fromiter(map(self._burst_score, _as_list(bursts)), dtype=np.int32, count=n)
+
+        if self.max is not None:
+            np.minimum(score, self.max, out=score)
+        if self.min is not None:
+            np.maximum(score, self.min, out=score)
+
+        columns['word_count'] = word_count
+        columns['score'] = score
+        return columns
+
+
+# 编译缓存：规则内容的哈希 -> RuleScorer；内容不变时重新加载不会重复编译
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def compile_rules(config):
+    """编译一组规则（按内容哈希缓存）"""
+    key = hashlib.sha1(json.dumps(config, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+    with _compiled_lock:
+        scorer = _compiled.get(key)
+        if scorer is None:
+            scorer = RuleScorer(config)
+            _compiled[key] = scorer
+        return scorer
+
+
+class RuleBook:
+    """
+    评分规则文件（JSON/YAML）
+    每次取评分器时按 check_interval 检查文件修改时间，改动后自动重新加载
+    """
+
+    def __init__(self, path=DEFAULT_RULES_PATH, check_interval=5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked = 0.0
+        self._config = {}
+        self._load()
+
+    def _load(self):
+        mtime = os.path.getmtime(self.path)
+        with open(self.path, encoding='utf-8') as f:
+            if self.path.endswith(('.yaml', '.yml')):
+                if yaml is None:
+                    raise ImportError('读取YAML规则需要 PyYAML: pip install pyyaml')
+                config = yaml.safe_load(f)
+            else:
+                config = json.load(f)
+        # 先把每个配置都编译一遍：规则写错时抛出异常，继续使用旧规则
+        for profile in config.values():
+            compile_rules(profile)
+        self._config = config
+        self._mtime = mtime
+
+    def reload_if_changed(self):
+        """文件有改动时重新加载；加载失败时继续使用旧规则"""
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return False
+
+        with self._lock:
+            self._checked = now
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError as e:
+                print(f"   ⚠️  评分规则文件不可读，继续使用旧规则: {e}")
+                return False
+
+            if mtime == self._mtime:
+                return False
+
+            try:
+                self._load()
+            except Exception as e:
+                # 记下这次的修改时间，文件再次修改前不重复报错
+                self._mtime = mtime
+                print(f"   ⚠️  评分规则重新加载失败，继续使用旧规则: {e}")
+                return False
+
+        print(f"   🔄 已重新加载评分规则: {self.path}")
+        return True
+
+    def scorer(self, profile):
+        """取某个配置（keyword / trend / demo）的评分器，按需编译"""
+        self.reload_if_changed()
+        return compile_rules(self._config[profile])
+
+
+_rulebooks = {}
+_rulebooks_lock = threading.Lock()
+
+
+def load_rulebook(path=None):
+    """按路径共享 RuleBook 实例"""
+    path = os.path.abspath(path or DEFAULT_RULES_PATH)
+    with _rulebooks_lock:
+        rulebook = _rulebooks.get(path)
+        if rulebook is None:
+            rulebook = RuleBook(path)
+            _rulebooks[path] = rulebook
+        return rulebook
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+竞品页面缓存（SQLite）
+功能：
+1. 按URL保存 ETag / Last-Modified、页面内容哈希和分析结果
+2. 再次分析时发送条件请求（If-None-Match / If-Modified-Since）
+3. 服务器返回 304 或内容哈希未变时，直接使用缓存的分析结果，不再解析页面
+4. 分析结果带版本（提取器版本 + 特征库哈希），版本不同时当作未缓存，重新下载并分析
+5. 命中统计（304 / 哈希命中 / 未命中）
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def content_hash(content):
+    """页面内容哈希（bytes）"""
+    return hashlib.sha256(content).hexdigest()
+
+
+class PageCache:
+    """线程安全的竞品页面缓存"""
+
+    def __init__(self, path='page_cache.db'):
+        self.path = path
+        self.counts = {'not_modified': 0, 'unchanged': 0, 'miss': 0}
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                analysis TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                checked_at REAL NOT NULL,
+                version TEXT NOT NULL DEFAULT ''
+            )
+        ''')
+        # 旧版本的缓存文件没有 version 列：补上后旧条目的版本为空，下次使用时重新分析
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(pages)')}
+        if 'version' not in columns:
+            self._conn.execute("ALTER TABLE pages ADD COLUMN version TEXT NOT NULL DEFAULT ''")
+        self._conn.commit()
+
+    def get(self, url, version=''):
+        """
+        读取缓存，返回 {'etag', 'last_modified', 'content_hash', 'analysis', 'fetched_at'}
+        没有缓存或分析结果的版本不是 version 时返回 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT etag, last_modified, content_hash, analysis, fetched_at FROM pages WHERE url=? AND version=?',
+                (url, version)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return {
+            'etag': row[0],
+            'last_modified': row[1],
+            'content_hash': row[2],
+            'analysis': json.loads(row[3]),
+            'fetched_at': row[4]
+        }
+
+    @staticmethod
+    def conditional_headers(entry):
+        """根据缓存条目生成条件请求头"""
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def set(self, url, response, digest, analysis, version=''):
+        """保存页面的校验信息和分析结果"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, response.headers.get('ETag'), response.headers.get('Last-Modified'), digest,
+                 json.dumps(analysis, ensure_ascii=False), now, now, version)
+            )
+            self._conn.commit()
+
+    def touch(self, url, response):
+        """304 时更新检查时间（服务器返回了新的校验信息时一并更新）"""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE pages SET checked_at=?, etag=COALESCE(?, etag), '
+                'last_modified=COALESCE(?, last_modified) WHERE url=?',
+                (time.time(), response.headers.get('ETag'), response.headers.get('Last-Modified'), url)
+            )
+            self._conn.commit()
+
+    def fetch(self, transport, url, analyze, timeout=10, version=''):
+        """
+        条件请求 url：页面未修改（304）或内容哈希未变时返回缓存的分析结果，
+        否则调用 analyze(response) 重新分析并保存
+        version: 分析方式的版本（见 html_extract.analysis_version），和缓存的不同时不发条件请求，重新分析
+        返回 (分析结果, response, 状态)，状态为 'not_modified' / 'unchanged' / 'miss'
+        """
+        entry = self.get(url, version)
+        response = transport.get(url, headers=self.conditional_headers(entry) or None, timeout=timeout)
+
+        if entry and response.status_code == 304:
+            self.touch(url, response)
+            status, analysis = 'not_modified', entry['analysis']
+        else:
+            digest = content_hash(response.content)
+            if entry and digest == entry['content_hash']:
+                status, analysis = 'unchanged', entry['analysis']
+            else:
+                status, analysis = 'miss', analyze(response)
+            if response.status_code == 200:
+                self.set(url, response, digest, analysis, version)
+
+        with self._lock:
+            self.counts[status] += 1
+        return analysis, response, status
+
+    def stats(self):
+        """返回命中统计"""
+        total = sum(self.counts.values())
+        hits = total - self.counts['miss']
+        return {**self.counts, 'hit_rate': hits / total if total else 0.0}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
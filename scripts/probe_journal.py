@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+探测词断点日志
+功能：
+1. 每完成一个探测词就追加一行 JSONL（查询词 + 结果或错误）
+2. 中断后重新运行时，已完成的探测词直接从日志读取，不再请求
+3. 失败的探测词会被记录下来，下次运行重新请求
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+
+class ProbeJournal:
+    """单次挖掘任务（数据源 + 种子词 + 语言）的探测日志"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = {}
+        self.failed = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            self._load()
+
+        self._file = open(path, 'a', encoding='utf-8')
+
+    @classmethod
+    def for_run(cls, directory, source, seed_keyword, language=''):
+        """按 (数据源, 种子词, 语言) 定位日志文件"""
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha1(seed_keyword.encode('utf-8')).hexdigest()[:12]
+        return cls(os.path.join(directory, f'{source}_{language or "default"}_{digest}.jsonl'))
+
+    def _load(self):
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 进程被杀时最后一行可能只写了一半
+                    continue
+
+                query = entry['q']
+                if entry.get('ok'):
+                    self.done[query] = entry['result']
+                    self.failed.pop(query, None)
+                else:
+                    self.failed[query] = entry.get('error', '')
+
+    def _append(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._file.flush()
+
+    def record(self, query, result):
+        """记录一个成功的探测词"""
+        self.done[query] = result
+        self.failed.pop(query, None)
+        self._append({'q': query, 'ok': True, 'result': result})
+
+    def record_failure(self, query, error):
+        """记录一个失败的探测词（下次运行会重试）"""
+        self.failed[query] = str(error)
+        self._append({'q': query, 'ok': False, 'error': str(error)})
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def finish(self):
+        """任务结束：没有失败的探测词时删除日志，否则保留以便下次续跑"""
+        self.close()
+        if not self.failed and os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+流式结果输出（CSV / JSONL）
+功能：
+1. 逐行写出，不需要先把全部结果放在内存里
+2. 按扩展名选择格式和压缩：.csv / .jsonl（.ndjson），再加 .gz（gzip）或 .zst（zstd，需要 zstandard）
+3. 定时刷新：每 flush_every 行或每 flush_interval 秒写到磁盘，进程中途退出时已刷新的内容不会丢
+   （gzip / zstd 刷新时结束当前压缩块，已写出的部分可以正常解压）
+4. 列表字段（例如 aliases）在 CSV 中用 " | " 连接，JSONL 中保留为数组
+
+用法：
+  with open_sink('keywords.csv.gz', fields=['keyword', 'score']) as sink:
+      for row in rows:
+          sink.write(row)
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FORMATS = ('csv', 'jsonl')
+COMPRESSIONS = {'.gz': 'gzip', '.zst': 'zstd'}
+
+# CSV 中列表字段的分隔符
+LIST_SEPARATOR = ' | '
+
+
+def detect_format(path):
+    """根据文件名判断 (格式, 压缩方式)：'a.jsonl.gz' -> ('jsonl', 'gzip')"""
+    base, ext = os.path.splitext(path.lower())
+    compression = COMPRESSIONS.get(ext)
+    if compression:
+        base, ext = os.path.splitext(base)
+    return ('jsonl' if ext in ('.jsonl', '.ndjson') else 'csv'), compression
+
+
+def _open_text(path, compression, encoding, append):
+    """打开文本文件（可压缩）；追加模式下压缩文件会追加一个新的压缩帧，仍然可以整体解压"""
+    mode = 'a' if append else 'w'
+    if compression == 'gzip':
+        return gzip.open(path, mode + 't', encoding=encoding, newline='')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError('写出 .zst 文件需要 zstandard: pip install zstandard')
+        raw = open(path, mode + 'b')
+        writer = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(writer, encoding=encoding, newline='')
+    return open(path, mode, encoding=encoding, newline='')
+
+
+class ResultSink(ABC):
+    """流式输出基类：子类实现 _write_row"""
+
+    def __init__(self, stream, fields=None, flush_every=1000, flush_interval=5.0, close_stream=True):
+        self.stream = stream
+        self.fields = list(fields) if fields else None
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.close_stream = close_stream
+        self.count = 0
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+
+    def write(self, row):
+        self._write_row(row)
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self.flush_every or time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+        return self.count
+
+    def flush(self):
+        self.stream.flush()
+        self._pending = 0
+        self._flushed_at = time.monotonic()
+
+    def close(self):
+        if self.stream is None:
+            return
+        self.flush()
+        if self.close_stream:
+            self.stream.close()
+        self.stream = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @abstractmethod
+    def _write_row(self, row):
+        """把一行写到 stream（不计数、不刷新）"""
+
+
+class CsvSink(ResultSink):
+    """CSV：只写 fields 中的列（没有给出时用第一行的键），列表字段用 LIST_SEPARATOR 连接"""
+
+    def __init__(self, stream, fields=None, write_header=True, **kwargs):
+        super().__init__(stream, fields, **kwargs)
+        self.write_header = write_header
+        self._writer = None
+
+    def _write_row(self, row):
+        if self._writer is None:
+            self.fields = self.fields or list(row)
+            self._writer = csv.DictWriter(self.stream, fieldnames=self.fields, extrasaction='ignore')
+            if self.write_header:
+                self._writer.writeheader()
+        self._writer.writerow({key: LIST_SEPARATOR.join(map(str, value)) if isinstance(value, (list, tuple))
+                               else value for key, value in row.items()})
+
+
+class JsonlSink(ResultSink):
+    """JSONL：每行一个 JSON 对象（给出 fields 时只保留这些键）"""
+
+    def _write_row(self, row):
+        if self.fields:
+            row = {key: row.get(key) for key in self.fields}
+        self.stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+def open_sink(path, fields=None, format=None, compression=None, encoding='utf-8', append=False, stdout=None,
+              **kwargs):
+    """
+    打开输出：格式和压缩默认按扩展名判断；path 为 "-" 时写到 stdout（默认 sys.stdout，JSONL）
+    append: 追加到已有文件（CSV 追加时不重复写表头）
+    其余参数（flush_every / flush_interval）见 ResultSink
+    """
+    if path == '-':
+        return JsonlSink(stdout or sys.stdout, fields, close_stream=False, **kwargs)
+
+    detected_format, detected_compression = detect_format(path)
+    format = format or detected_format
+    compression = compression or detected_compression
+    if format not in FORMATS:
+        raise ValueError(f'不支持的输出格式: {format}')
+
+    has_content = append and os.path.exists(path) and os.path.getsize(path) > 0
+    if compression and encoding == 'utf-8-sig':
+        encoding = 'utf-8'  # BOM 只对直接用 Excel 打开的未压缩 CSV 有意义
+    stream = _open_text(path, compression, encoding, append)
+
+    if format == 'jsonl':
+        return JsonlSink(stream, fields, **kwargs)
+    return CsvSink(stream, fields, write_header=not has_content, **kwargs)
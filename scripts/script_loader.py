@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+加载文件名带连字符的脚本（keyword-digger.py、trending-finder.py 不能直接 import）
+同一个脚本只加载一次
+"""
+
+import importlib.util
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(filename, module_name=None):
+    """按文件名加载 scripts 目录下的脚本，返回模块对象"""
+    module_name = module_name or os.path.splitext(filename)[0].replace('-', '_')
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPT_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
+
+def load_keyword_digger():
+    """KeywordDigger 类"""
+    return load_script('keyword-digger.py').KeywordDigger
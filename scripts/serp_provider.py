@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+搜索结果（SERP）提供者
+功能：
+1. 统一接口 SerpProvider.search / search_many，可替换不同的数据来源
+2. HtmlSerpProvider：请求搜索页面并解析（默认 Google，也可以指向本地测试服务器）
+3. SavedSerpProvider：解析手动保存的搜索结果页面（query 对应 目录/query.html）
+4. 结果缓存（复用 SuggestionCache），多个关键词批量并发查询（按主机限速）
+5. 从多个关键词的结果中挑出最常出现的竞争对手站点
+
+provider 写法（--serp）：
+  google                               Google 搜索页面
+  saved:目录                           已保存的搜索结果页面
+  http://127.0.0.1:8000/search?q={query}   自定义搜索页面地址（可用 {query} {num} {language}）
+"""
+
+import os
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from urllib.parse import parse_qs, quote_plus, urlparse
+
+from bs4 import BeautifulSoup
+
+from fetch_engine import ConcurrentFetcher
+
+GOOGLE_SEARCH_TEMPLATE = 'https://www.google.com/search?q={query}&num={num}&hl={language}'
+
+# 搜索引擎自身的链接（不是搜索结果）
+ENGINE_DOMAINS = ('google.', 'googleusercontent.com', 'gstatic.com', 'bing.com', 'duckduckgo.com')
+
+# 大平台站点：排名再高也不算可模仿的竞争对手
+EXCLUDED_DOMAINS = {'youtube.com', 'wikipedia.org', 'amazon.com', 'reddit.com', 'quora.com',
+                    'pinterest.com', 'facebook.com', 'instagram.com', 'twitter.com', 'x.com', 'tiktok.com'}
+
+# 结果链接外面的跳转参数（/url?q=、DuckDuckGo 的 uddg=）
+REDIRECT_PARAMS = ('q', 'url', 'uddg')
+
+
+def _result_url(href):
+    """取出结果的真实URL（去掉搜索引擎跳转），不是 http(s) 链接返回 None"""
+    parsed = urlparse(href)
+    if parsed.path in ('/url', '/l/') or parsed.path.endswith('/url'):
+        params = parse_qs(parsed.query)
+        for name in REDIRECT_PARAMS:
+            if params.get(name):
+                href = params[name][0]
+                break
+    if not href.startswith(('http://', 'https://')):
+        return None
+    return href
+
+
+def _bare_domain(domain):
+    domain = domain.lower().split(':')[0]
+    return domain[4:] if domain.startswith('www.') else domain
+
+
+def parse_serp_html(html, num=10):
+    """
+    解析搜索结果页面，返回 [{'position', 'url', 'domain', 'title'}, ...]
+    自然结果的标题都是链接里（或包着链接）的 h3/h2，广告和导航链接没有标题，会被跳过
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    results = []
+    seen = set()
+
+    for a in soup.find_all('a', href=True):
+        heading = a.find(['h3', 'h2']) or a.find_parent(['h3', 'h2'])
+        if heading is None:
+            continue
+
+        url = _result_url(a['href'])
+        if not url or url in seen:
+            continue
+        domain = urlparse(url).netloc.lower()
+        if any(engine in domain for engine in ENGINE_DOMAINS):
+            continue
+
+        seen.add(url)
+        results.append({
+            'position': len(results) + 1,
+            'url': url,
+            'domain': domain,
+            'title': heading.get_text(' ', strip=True)
+        })
+        if len(results) >= num:
+            break
+
+    return results
+
+
+class SerpProvider(ABC):
+    """SERP 提供者基类：子类实现 fetch(query, language, num)"""
+
+    name = 'serp'
+    rate_key = 'serp'  # 限速用的主机名
+
+    def __init__(self, cache=None, max_workers=2, rate_limit=0.5):
+        """
+        cache: SuggestionCache 实例（可选）
+        rate_limit: 每秒查询数（搜索引擎限制很严，默认每2秒一次）
+        """
+        self.cache = cache
+        self.fetcher = ConcurrentFetcher(max_workers=max_workers, rate_per_host=rate_limit, retries=2, backoff=2.0)
+
+    @abstractmethod
+    def fetch(self, query, language='en', num=10):
+        """查询一个关键词，返回 parse_serp_html 格式的结果列表"""
+
+    def search(self, query, language='en', num=10):
+        """查询单个关键词"""
+        return self.search_many([query], language, num)[query]
+
+    def search_many(self, queries, language='en', num=10):
+        """批量查询，返回 {query: [结果, ...]}；已缓存的不再请求，其余并发查询"""
+        endpoint = f'serp:{self.name}'
+        results = {}
+        missing = []
+        for query in dict.fromkeys(queries):
+            cached = self.cache.get(endpoint, f'{query}|{num}', language) if self.cache else None
+            if cached is None:
+                missing.append(query)
+            else:
+                results[query] = cached
+
+        for query, items, error in self.fetcher.map(lambda q: self.fetch(q, language, num), missing,
+                                                     self.rate_key):
+            if error:
+                print(f"   ⚠️  搜索结果获取失败 ({query}): {error}")
+                items = []
+            elif items and self.cache:
+                # 空结果多半是被拦截，不缓存
+                self.cache.set(endpoint, f'{query}|{num}', language, items)
+            results[query] = items
+
+        return {query: results[query] for query in queries}
+
+
+class HtmlSerpProvider(SerpProvider):
+    """请求搜索页面并解析HTML"""
+
+    def __init__(self, transport, url_template=GOOGLE_SEARCH_TEMPLATE, use_proxy=True, **kwargs):
+        super().__init__(**kwargs)
+        self.transport = transport
+        self.url_template = url_template
+        self.use_proxy = use_proxy
+        self.rate_key = url_template
+        host = urlparse(url_template).netloc
+        self.name = 'google' if url_template == GOOGLE_SEARCH_TEMPLATE else host
+
+    def fetch(self, query, language='en', num=10):
+        url = self.url_template.format(query=quote_plus(query), num=num, language=language)
+        response = self.transport.get(url, timeout=10, use_proxy=self.use_proxy)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RuntimeError(f'HTTP {response.status_code}')  # 限流或服务器错误，退避后重试
+        if response.status_code >= 400:
+            return []
+        if 'unusual traffic' in response.text or '/sorry/' in str(getattr(response, 'url', '')):
+            raise RuntimeError('触发了人机验证，请降低频率或更换代理')
+        return parse_serp_html(response.text, num)
+
+
+class SavedSerpProvider(SerpProvider):
+    """解析已保存的搜索结果页面：目录/<查询词>.html（空格等字符替换为下划线）"""
+
+    name = 'saved'
+
+    def __init__(self, directory, **kwargs):
+        kwargs.setdefault('rate_limit', 1000.0)
+        super().__init__(**kwargs)
+        self.directory = directory
+
+    @staticmethod
+    def filename(query):
+        return re.sub(r'\W+', '_', query.lower()).strip('_') + '.html'
+
+    def fetch(self, query, language='en', num=10):
+        path = os.path.join(self.directory, self.filename(query))
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return parse_serp_html(f.read(), num)
+
+
+def make_serp_provider(spec, transport=None, cache=None):
+    """
+    根据名称创建 SERP 提供者：'google' / 'saved:目录' / 搜索页面URL模板
+    已经是 SerpProvider 实例时原样返回
+    """
+    if isinstance(spec, SerpProvider):
+        return spec
+    if spec == 'google':
+        return HtmlSerpProvider(transport, cache=cache)
+    if spec.startswith('saved:'):
+        return SavedSerpProvider(spec[len('saved:'):], cache=cache)
+    if spec.startswith(('http://', 'https://')):
+        return HtmlSerpProvider(transport, spec, cache=cache)
+    raise ValueError(f'未知的SERP提供者: {spec}')
+
+
+def pick_competitors(results_by_query, limit=3, exclude=EXCLUDED_DOMAINS):
+    """
+    从多个关键词的搜索结果中挑选竞争对手站点
+    出现在越多关键词结果中、排名越靠前的站点越优先；返回站点首页URL列表
+    """
+    appearances = Counter()
+    best_position = {}
+    roots = {}
+
+    for results in results_by_query.values():
+        for domain in {_bare_domain(r['domain']) for r in results}:
+            appearances[domain] += 1
+        for result in results:
+            domain = _bare_domain(result['domain'])
+            best_position[domain] = min(best_position.get(domain, result['position']), result['position'])
+            parsed = urlparse(result['url'])
+            roots.setdefault(domain, f'{parsed.scheme}://{parsed.netloc}/')
+
+    candidates = [d for d in appearances if not any(d == e or d.endswith('.' + e) for e in exclude)]
+    candidates.sort(key=lambda d: (-appearances[d], best_position[d]))
+    return [roots[d] for d in candidates[:limit]]
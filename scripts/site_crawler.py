@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+竞争对手站点爬虫
+功能：
+1. 从首页出发，按广度优先跟随站内链接，直到页数预算用完
+2. 遵守 robots.txt（Disallow 和 Crawl-delay）
+3. URL 规范化后去重（去掉锚点、跟踪参数、默认端口、末尾斜杠）
+4. 有界并发抓取，按主机限速
+5. 统计文章URL和分类目录树
+"""
+
+from collections import Counter
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+from urllib.robotparser import RobotFileParser
+
+from fetch_engine import ConcurrentFetcher
+from html_extract import extract_page
+
+# 识别文章URL的路径模式
+ARTICLE_PATTERNS = ['/blog/', '/post/', '/article/', '/review/']
+
+# 规范化时去掉的跟踪参数
+TRACKING_PARAMS = {'fbclid', 'gclid', 'ref'}
+
+# 不抓取的静态资源
+SKIP_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.pdf', '.zip',
+                   '.mp4', '.mp3', '.css', '.js', '.xml', '.ico')
+
+
+def normalize_url(url, base=None):
+    """规范化URL，非 http(s) 链接返回 None"""
+    if base:
+        url = urljoin(base, url)
+
+    parsed = urlparse(url.strip())
+    if parsed.scheme not in ('http', 'https'):
+        return None
+
+    host = (parsed.hostname or '').lower()
+    if not host:
+        return None
+    port = parsed.port
+    if port and not ((parsed.scheme == 'http' and port == 80) or (parsed.scheme == 'https' and port == 443)):
+        host = f'{host}:{port}'
+
+    path = parsed.path or '/'
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/')
+
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+                             if not (k.lower().startswith('utm_') or k.lower() in TRACKING_PARAMS)))
+
+    return urlunparse((parsed.scheme, host, path, '', query, ''))
+
+
+def site_key(url):
+    """站点标识（忽略 www. 前缀），用于判断是否站内链接"""
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def is_article_url(url):
+    """是否文章页URL"""
+    path = urlparse(url).path.lower()
+    return any(pattern in path + '/' for pattern in ARTICLE_PATTERNS)
+
+
+class SiteCrawler:
+    """有界并发的站内爬虫"""
+
+    def __init__(self, transport, max_pages=50, max_workers=4, default_delay=0.5, respect_robots=True):
+        """
+        transport: 共享的 HttpTransport
+        max_pages: 每个站点最多抓取的页数
+        default_delay: robots.txt 没有 Crawl-delay 时，两次请求之间的最小间隔（秒）
+        """
+        self.transport = transport
+        self.max_pages = max_pages
+        self.default_delay = default_delay
+        self.respect_robots = respect_robots
+        self.fetcher = ConcurrentFetcher(max_workers=max_workers, rate_per_host=1 / default_delay, retries=1)
+
+    def _load_robots(self, start_url):
+        """读取 robots.txt，并按 Crawl-delay 设置该主机的限速"""
+        parsed = urlparse(start_url)
+        robots_url = f'{parsed.scheme}://{parsed.netloc}/robots.txt'
+        robots = RobotFileParser(robots_url)
+
+        try:
+            response = self.transport.get(robots_url, timeout=10)
+            if response.status_code >= 400:
+                robots.parse([])  # 没有 robots.txt，全部允许
+            else:
+                robots.parse(response.text.splitlines())
+        except Exception:
+            robots.parse([])
+
+        user_agent = self.transport.headers.get('User-Agent', '*')
+        delay = robots.crawl_delay(user_agent) or self.default_delay
+        self.fetcher.set_rate(start_url, 1 / max(float(delay), 0.01), burst=1)
+        return robots, user_agent
+
+    def _fetch(self, url):
+        response = self.transport.get(url, timeout=10)
+        content_type = response.headers.get('Content-Type', '')
+        if response.status_code >= 400 or 'html' not in content_type.lower():
+            return None
+        return response.text
+
+    def extract_links(self, html, page_url):
+        """提取页面中的全部链接（规范化后）"""
+        links = []
+        for href, _ in extract_page(html, fingerprints=False)['links']:
+            url = normalize_url(href, page_url)
+            if url:
+                links.append(url)
+        return links
+
+    def crawl(self, start_url, start_html=None):
+        """
+        从 start_url 开始广度优先抓取站内页面
+        start_html: 已经下载好的首页HTML（避免重复请求）
+        返回 {'pages': [...], 'article_urls': [...], 'category_tree': {...}, 'blocked': n}
+        """
+        start_url = normalize_url(start_url)
+        site = site_key(start_url)
+
+        if self.respect_robots:
+            robots, user_agent = self._load_robots(start_url)
+        else:
+            robots, user_agent = None, None
+
+        seen = {start_url}
+        discovered = set()
+        pages = []
+        blocked = 0
+        frontier = [start_url]
+        html_cache = {start_url: start_html} if start_html else {}
+
+        while frontier and len(pages) < self.max_pages:
+            batch = frontier[:self.max_pages - len(pages)]
+            frontier = frontier[len(batch):]
+
+            allowed = []
+            for url in batch:
+                if robots is not None and not robots.can_fetch(user_agent, url):
+                    blocked += 1
+                else:
+                    allowed.append(url)
+
+            results = []
+            to_fetch = []
+            for url in allowed:
+                if url in html_cache:
+                    results.append((url, html_cache.pop(url), None))
+                else:
+                    to_fetch.append(url)
+            results += self.fetcher.map(self._fetch, to_fetch, start_url)
+
+            for url, html, error in results:
+                if error or not html:
+                    continue
+                pages.append(url)
+
+                for link in self.extract_links(html, url):
+                    if site_key(link) != site:
+                        continue
+                    discovered.add(link)
+                    if link not in seen and not urlparse(link).path.lower().endswith(SKIP_EXTENSIONS):
+                        seen.add(link)
+                        frontier.append(link)
+
+        article_urls = sorted(url for url in discovered if is_article_url(url))
+
+        return {
+            'pages': pages,
+            'article_urls': article_urls,
+            'category_tree': self.category_tree(discovered),
+            'blocked': blocked
+        }
+
+    def category_tree(self, urls, max_children=10):
+        """按URL前两级路径统计分类目录树: {一级目录: {'count': n, 'children': {二级目录: n}}}"""
+        top = Counter()
+        children = {}
+        for url in urls:
+            segments = [s for s in urlparse(url).path.split('/') if s]
+            if len(segments) < 2:
+                continue  # 只有一级的多半是单独页面，不算分类
+            top[segments[0]] += 1
+            children.setdefault(segments[0], Counter())[segments[1]] += 1
+
+        return {
+            name: {'count': count, 'children': dict(children[name].most_common(max_children))}
+            for name, count in top.most_common()
+        }
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+搜索建议持久化缓存（SQLite）
+功能：
+1. 按 (数据源, 查询词, 语言) 缓存建议词结果
+2. 每个数据源独立的过期时间（TTL）
+3. 超过容量时按最近访问时间淘汰（LRU）；条目数每次从数据库读取，多个进程共用一个缓存文件时同样有效
+4. 命中/未命中计数
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+# 各数据源的默认过期时间（秒）
+DEFAULT_TTL = {
+    'google': 7 * 24 * 3600,
+    'baidu': 3 * 24 * 3600,
+}
+
+
+class SuggestionCache:
+    """线程安全的SQLite建议词缓存"""
+
+    def __init__(self, path='suggestion_cache.db', max_entries=200000, ttl=None, default_ttl=24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS suggestions (
+                endpoint TEXT NOT NULL,
+                query TEXT NOT NULL,
+                language TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (endpoint, query, language)
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_suggestions_accessed ON suggestions (accessed_at)')
+        self._conn.commit()
+
+    def get(self, endpoint, query, language=''):
+        """读取缓存；未命中或已过期返回 None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result, created_at FROM suggestions WHERE endpoint=? AND query=? AND language=?',
+                (endpoint, query, language)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl.get(endpoint, self.default_ttl):
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                'UPDATE suggestions SET accessed_at=? WHERE endpoint=? AND query=? AND language=?',
+                (now, endpoint, query, language)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, endpoint, query, language, result):
+        """写入缓存，必要时淘汰最久未访问的条目"""
+        now = time.time()
+        with self._lock:
+            value = json.dumps(result, ensure_ascii=False)
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO suggestions VALUES (?, ?, ?, ?, ?, ?)',
+                (endpoint, query, language, value, now, now)
+            )
+            if cursor.rowcount:
+                self._evict()
+            else:
+                self._conn.execute(
+                    'UPDATE suggestions SET result=?, created_at=?, accessed_at=? '
+                    'WHERE endpoint=? AND query=? AND language=?',
+                    (value, now, now, endpoint, query, language)
+                )
+            self._conn.commit()
+
+    def _size(self):
+        return self._conn.execute('SELECT COUNT(*) FROM suggestions').fetchone()[0]
+
+    def _evict(self):
+        """新增条目后检查容量（和写入在同一个事务里，其他进程的写入也计算在内）"""
+        size = self._size()
+        if size <= self.max_entries:
+            return
+
+        # 一次多淘汰10%，避免每次写入都触发淘汰
+        excess = size - self.max_entries + max(1, self.max_entries // 10)
+        self._conn.execute('''
+            DELETE FROM suggestions WHERE rowid IN (
+                SELECT rowid FROM suggestions ORDER BY accessed_at LIMIT ?
+            )
+        ''', (excess,))
+
+    def stats(self):
+        """返回命中统计"""
+        with self._lock:
+            size = self._size()
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': size
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""competitor_tracker：基线快照、增量变化、变化报告；错误页不写入快照"""
+
+import pytest
+
+from competitor_tracker import CompetitorTracker, format_changes
+from page_cache import PageCache
+from script_loader import load_keyword_digger
+
+URL = 'https://example.com/'
+
+
+def analysis(articles=(), categories=('Recipes', 'Reviews'), monetization=('Google AdSense',), title='Air Fryer Hub'):
+    return {
+        'url': URL,
+        'title': title,
+        'content_structure': {'h1_texts': ['Air Fryer Recipes'], 'h2_texts': []},
+        'article_urls': list(articles),
+        'monetization': list(monetization),
+        'tech_stack': ['WordPress'],
+        'categories': list(categories),
+    }
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = CompetitorTracker(str(tmp_path / 'snapshots.db'))
+    yield tracker
+    tracker.close()
+
+
+def test_first_snapshot_is_baseline(tracker):
+    result = tracker.record(analysis(['/blog/a']), taken_at=100)
+    assert (result['first_seen'], result['changes']) == (True, {})
+    assert tracker.changes_since(0) == {}
+
+
+def test_unchanged_snapshot_only_updates_check_time(tracker):
+    tracker.record(analysis(['/blog/a', '/blog/a']), taken_at=100)
+    result = tracker.record(analysis(['/blog/a']), taken_at=200)
+
+    assert (result['first_seen'], result['changes']) == (False, {})
+    history = tracker.history(URL)
+    assert [(h['taken_at'], h['checked_at']) for h in history] == [(100, 200)]
+    assert history[0]['data']['articles'] == ['/blog/a']
+
+
+def test_changes_are_computed_against_previous_snapshot(tracker):
+    tracker.record(analysis(['/blog/a']), taken_at=100)
+    result = tracker.record(analysis(['/blog/a', '/blog/b'], categories=['Recipes'],
+                                     monetization=['Google AdSense', 'Mediavine']), taken_at=200)
+    assert result['changes'] == {
+        'articles': {'added': ['/blog/b'], 'removed': []},
+        'monetization': {'added': ['Mediavine'], 'removed': []},
+        'categories': {'added': [], 'removed': ['Reviews']},
+    }
+
+    # 下一次只和最新状态比较
+    result = tracker.record(analysis(['/blog/b', '/blog/c'], categories=['Recipes'],
+                                     monetization=['Google AdSense', 'Mediavine']), taken_at=300)
+    assert result['changes'] == {'articles': {'added': ['/blog/c'], 'removed': ['/blog/a']}}
+    assert [h['taken_at'] for h in tracker.history(URL)] == [300, 200, 100]
+
+
+def test_changes_since_aggregates_by_site(tracker):
+    tracker.record(analysis(['/blog/a']), taken_at=100)
+    tracker.record(analysis(['/blog/a', '/blog/b']), taken_at=200)
+    tracker.record(analysis(['/blog/b'], title='Air Fryer Hub 2025'), taken_at=300)
+
+    assert tracker.changes_since(0) == {URL: {
+        'articles': {'added': ['/blog/b'], 'removed': ['/blog/a']},
+        'title': {'added': ['Air Fryer Hub 2025'], 'removed': ['Air Fryer Hub']},
+    }}
+    assert tracker.changes_since(200) == {URL: {
+        'title': {'added': ['Air Fryer Hub 2025'], 'removed': ['Air Fryer Hub']},
+        'articles': {'added': [], 'removed': ['/blog/a']},
+    }}
+    assert tracker.changes_since(300) == {}
+
+
+def test_format_changes():
+    text = format_changes(URL, {'articles': {'added': ['/blog/b'], 'removed': ['/blog/a']}})
+    assert text.splitlines() == [f'🔔 {URL}', '   + 文章: /blog/b', '   - 文章: /blog/a']
+
+
+class FakeResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.headers = {'Content-Type': 'text/html'}
+        self.cookies = {}
+
+
+class FakeTransport:
+    headers = {}
+    proxies = None
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+PAGE = '<html><head><title>Air Fryer Hub</title></head><body><a href="/blog/a">a</a></body></html>'
+
+
+@pytest.mark.parametrize('use_page_cache', [False, True])
+@pytest.mark.parametrize('status', [404, 429, 503])
+def test_error_pages_are_not_recorded(tracker, tmp_path, use_page_cache, status):
+    KeywordDigger = load_keyword_digger()
+    transport = FakeTransport(FakeResponse(200, PAGE), FakeResponse(status, '<html><title>Blocked</title></html>'),
+                              FakeResponse(200, PAGE))
+    page_cache = PageCache(str(tmp_path / 'pages.db')) if use_page_cache else None
+    digger = KeywordDigger(transport=transport, cache_path=None, page_cache=page_cache, page_cache_path=None,
+                           serp_provider=None, tracker=tracker)
+
+    assert digger.analyze_competitor_site(URL)['article_urls'] == ['/blog/a']
+    failed = digger.analyze_competitor_site(URL)
+    assert failed['error'] == f'HTTP {status}'
+    assert 'changes' not in failed
+
+    # 错误页没有写入快照：恢复后和第一次相比没有变化
+    assert digger.analyze_competitor_site(URL)['changes'] == {}
+    assert len(tracker.history(URL)) == 1
+    if page_cache:
+        page_cache.close()
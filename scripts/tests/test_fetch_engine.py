@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""fetch_engine：令牌桶限速、失败重试"""
+
+import time
+
+from fetch_engine import ConcurrentFetcher, TokenBucket
+
+
+def test_token_bucket_allows_burst_then_limits_rate():
+    bucket = TokenBucket(rate=20, capacity=5)
+    started = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.05
+
+    for _ in range(4):
+        bucket.acquire()
+    # 桶空后每个令牌需要 1/20 秒
+    assert time.monotonic() - started >= 0.15
+
+
+def test_buckets_are_per_host():
+    fetcher = ConcurrentFetcher(rate_per_host=1.0)
+    assert fetcher.bucket_for('https://a.example/x') is fetcher.bucket_for('https://a.example/y')
+    assert fetcher.bucket_for('https://a.example/x') is not fetcher.bucket_for('https://b.example/x')
+
+    fetcher.set_rate('https://a.example/', 0.2)
+    assert fetcher.bucket_for('https://a.example/x').rate == 0.2
+
+
+def test_map_retries_failures_then_succeeds():
+    calls = {}
+
+    def flaky(item):
+        calls[item] = calls.get(item, 0) + 1
+        if calls[item] < 3:
+            raise ConnectionError('temporary')
+        return item.upper()
+
+    fetcher = ConcurrentFetcher(max_workers=4, rate_per_host=1000, retries=3, backoff=0.01)
+    results = fetcher.map(flaky, ['a', 'b'], 'https://a.example/')
+
+    assert results == [('a', 'A', None), ('b', 'B', None)]
+    assert calls == {'a': 3, 'b': 3}
+
+
+def test_map_reports_error_after_retries_exhausted():
+    reported = []
+
+    def broken(item):
+        raise ValueError(item)
+
+    fetcher = ConcurrentFetcher(rate_per_host=1000, retries=2, backoff=0.01)
+    [(item, result, error)] = fetcher.map(broken, ['x'], 'https://a.example/',
+                                          on_result=lambda *outcome: reported.append(outcome))
+
+    assert (item, result) == ('x', None)
+    assert isinstance(error, ValueError)
+    assert reported == [(item, result, error)]
+
+
+def test_map_preserves_input_order():
+    fetcher = ConcurrentFetcher(max_workers=8, rate_per_host=1000)
+    items = list(range(20))
+    results = fetcher.map(lambda i: (time.sleep(0.001 * (20 - i)), i * i)[1], items, 'https://a.example/')
+    assert [result for _, result, _ in results] == [i * i for i in items]
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""fingerprints：页面源码特征串不区分大小写、互相重叠的特征串、跨块匹配"""
+
+import random
+
+import pytest
+
+import fingerprints
+from fingerprints import FingerprintDB, load_fingerprints
+
+
+def signature(name, *markers):
+    return {'name': name, 'category': 'monetization', 'html': list(markers)}
+
+
+def names(db, html):
+    return db.detect(html)['monetization']
+
+
+def test_mixed_case_page_matches_lowercase_markers():
+    result = load_fingerprints().detect('<link href="/WP-Content/themes/x.css"><ins class="AdsByGoogle">')
+    assert 'WordPress' in result['tech_stack']
+    hit = next(f for f in result['fingerprints'] if f['name'] == 'WordPress')
+    assert (hit['source'], hit['pattern'], hit['evidence']) == ('html', 'wp-content', 'wp-content')
+
+
+def test_mixed_case_markers_match_any_case():
+    db = FingerprintDB({'signatures': [signature('Ezoic', 'EzOic')]})
+    assert names(db, 'window.EZOIC = 1') == ['Ezoic']
+    assert db.detect('ezoic')['fingerprints'][0]['pattern'] == 'EzOic'
+
+
+def test_overlapping_markers_are_all_reported():
+    db = FingerprintDB({'signatures': [
+        signature('Syndication', 'googlesyndication'),
+        signature('Google', 'google'),            # 较长特征串的开头
+        signature('Suffix', 'syndication'),       # 较长特征串的结尾
+        signature('AdSense', 'adsense'),
+        signature('Sensei', 'sensei'),            # 与 adsense 首尾相接
+        signature('Other', 'not-on-page'),
+    ]})
+    assert names(db, 'pagead2.GoogleSyndication.com adsensei') == ['Syndication', 'Google', 'Suffix', 'AdSense',
+                                                                   'Sensei']
+    evidence = {f['name']: f['evidence'] for f in db.detect('googlesyndication')['fingerprints']}
+    assert evidence == {'Syndication': 'googlesyndication', 'Google': 'google', 'Suffix': 'syndication'}
+
+
+def test_markers_across_chunk_boundaries(monkeypatch):
+    monkeypatch.setattr(fingerprints._LiteralMatcher, 'CHUNK_SIZE', 7)
+    markers = ['adsense', 'sensei', 'wp-content', 'amzn.to', 'ezoic', 'zoi']
+    db = FingerprintDB({'signatures': [signature(m, m) for m in markers]})
+
+    rng = random.Random(5)
+    alphabet = 'adsenizocADSENIZOC-wp.tmn '
+    for _ in range(300):
+        pieces = [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))]
+        for marker in rng.sample(markers, rng.randint(0, 3)):
+            pieces += [marker.upper() if rng.random() < 0.5 else marker,
+                       ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))]
+        html = ''.join(pieces)
+        assert names(db, html) == [m for m in markers if m in html.lower()]
+
+
+@pytest.mark.parametrize('html', ['', 'nothing to see here'])
+def test_no_markers(html):
+    result = load_fingerprints().detect(html)
+    assert result['monetization'] == result['tech_stack'] == result['fingerprints'] == []
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""http_session：连接池参数和异常类型在 requests / httpx 两种实现下一致"""
+
+import socket
+
+import pytest
+import requests
+
+import http_session
+from http_session import HttpTransport
+
+
+def closed_port_url():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    return f'http://127.0.0.1:{port}/'
+
+
+@pytest.mark.parametrize('http2', [False, True])
+def test_connection_errors_are_requests_exceptions(http2):
+    if http2 and http_session.httpx is None:
+        pytest.skip('需要 httpx[http2]')
+    with HttpTransport(use_proxy=False, http2=http2) as transport:
+        assert transport.http2 is http2
+        with pytest.raises(requests.ConnectionError):
+            transport.get(closed_port_url(), timeout=2)
+
+
+def test_httpx_pool_sizes_are_applied():
+    httpx = pytest.importorskip('httpx')
+    if http_session.httpx is None:
+        pytest.skip('需要 httpx[http2]')
+
+    transport = HttpTransport(use_proxy=False, pool_connections=4, pool_maxsize=8,
+                              host_pool_sizes={'suggestqueries.google.com': 64})
+    client = transport._clients[False]
+
+    pool = client._transport._pool
+    assert pool._max_connections == 32
+    assert pool._max_keepalive_connections == 8
+
+    host_transport = client._transport_for_url(httpx.URL('https://suggestqueries.google.com/complete'))
+    assert host_transport._pool._max_connections == 64
+    assert client._transport_for_url(httpx.URL('https://www.google.com/')) is client._transport
+    transport.close()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""job_runner：任务租约、续约与接管、失败重排、崩溃任务的最终状态、关键词合并规则、工作进程重启上限"""
+
+import time
+
+import pytest
+
+import job_runner
+from job_runner import JobQueue
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(job_runner.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = JobQueue(str(tmp_path / 'jobs.db'), lease_seconds=60, max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def test_lease_hands_out_each_job_once(queue):
+    assert queue.add_seeds(['air fryer', ' coffee maker ', '', 'air fryer']) == 3
+    first = queue.lease('w1')
+    second = queue.lease('w2')
+    assert {first[1], second[1]} == {'air fryer', 'coffee maker'}
+    assert queue.lease('w3') is None
+    assert queue.unfinished() == 2
+
+
+def test_complete_dedupes_keywords_across_seeds(queue, tmp_path):
+    queue.add_seeds(['air fryer', 'coffee maker'])
+    job_id, seed, _ = queue.lease('w1')
+    assert queue.complete(job_id, 'w1', seed, [{'keyword': 'Best  Air Fryer', 'score': 70, 'word_count': 3}])
+    job_id, seed, _ = queue.lease('w1')
+    assert queue.complete(job_id, 'w1', seed, [{'keyword': 'best air fryer', 'score': 90, 'word_count': 3},
+                                               {'keyword': 'coffee maker reviews', 'score': 80, 'word_count': 3}])
+
+    assert queue.unfinished() == 0
+    assert queue.progress() == {'done': 2}
+    output = tmp_path / 'merged.jsonl'
+    assert queue.export(str(output)) == 2
+
+
+def merged_keywords(queue):
+    return queue.conn.execute('SELECT keyword, score, seed FROM keywords ORDER BY normalized').fetchall()
+
+
+@pytest.mark.parametrize('order', [['a', 'b', 'c'], ['c', 'b', 'a'], ['b', 'c', 'a']])
+def test_keyword_merge_does_not_depend_on_completion_order(tmp_path, clock, order):
+    results = {
+        'a': [{'keyword': 'Air Fryer', 'score': 70, 'word_count': 2},
+              {'keyword': 'air fryer recipes', 'score': 60, 'word_count': 3}],
+        'b': [{'keyword': 'air fryer', 'score': 80, 'word_count': 2},
+              {'keyword': 'Air Fryer Recipes', 'score': 60, 'word_count': 3}],
+        'c': [{'keyword': 'AIR FRYER', 'score': 80, 'word_count': 2}],
+    }
+    queue = JobQueue(str(tmp_path / 'jobs.db'))
+    queue.add_seeds(order)
+    for _ in order:
+        job_id, seed, _ = queue.lease('w1')
+        queue.complete(job_id, 'w1', seed, results[seed])
+
+    # 分数高的优先；同分时种子词字典序小的优先
+    assert merged_keywords(queue) == [('air fryer', 80, 'b'), ('air fryer recipes', 60, 'a')]
+    queue.close()
+
+
+def test_failed_job_is_requeued_until_max_attempts(queue):
+    queue.add_seeds(['air fryer'])
+    job_id, _, _ = queue.lease('w1')
+    assert queue.fail(job_id, 'w1', RuntimeError('boom'))
+    assert queue.progress() == {'pending': 1}
+
+    job_id, _, _ = queue.lease('w1')
+    assert queue.fail(job_id, 'w1', RuntimeError('boom again'))
+    assert queue.progress() == {'failed': 1}
+    assert queue.lease('w1') is None
+    assert queue.unfinished() == 0
+
+
+def test_expired_lease_is_taken_over(queue, clock):
+    queue.add_seeds(['air fryer'])
+    queue.lease('crashed')
+    assert queue.lease('w2') is None
+
+    clock[0] += 61
+    job_id, seed, _ = queue.lease('w2')
+    assert seed == 'air fryer'
+
+
+def test_renew_keeps_lease(queue, clock):
+    queue.add_seeds(['air fryer'])
+    job_id, _, _ = queue.lease('w1')
+    for _ in range(3):
+        clock[0] += 50
+        assert queue.renew(job_id, 'w1')
+        assert queue.lease('w2') is None
+    assert not queue.renew(job_id, 'w2')
+
+
+def test_results_of_expired_lease_are_dropped(queue, clock):
+    queue.add_seeds(['air fryer'])
+    job_id, _, _ = queue.lease('slow')
+
+    # 处理时间超过租约、又没有续约：任务被 w2 接管
+    clock[0] += 61
+    assert queue.lease('w2')[0] == job_id
+    assert not queue.renew(job_id, 'slow')
+    assert not queue.complete(job_id, 'slow', 'air fryer', [{'keyword': 'stale', 'score': 99, 'word_count': 1}])
+    assert not queue.fail(job_id, 'slow', RuntimeError('late'))
+    assert queue.progress() == {'leased': 1}
+
+    assert queue.complete(job_id, 'w2', 'air fryer', [{'keyword': 'fresh', 'score': 50, 'word_count': 1}])
+    assert merged_keywords(queue) == [('fresh', 50, 'air fryer')]
+    # 任务完成后迟到的提交同样被丢弃
+    assert not queue.complete(job_id, 'w2', 'air fryer', [])
+
+
+def test_heartbeat_renews_while_job_runs(queue, clock):
+    queue.add_seeds(['air fryer'])
+    job_id, _, _ = queue.lease('w1')
+    with queue.heartbeat(job_id, 'w1', interval=0.01):
+        for _ in range(3):
+            clock[0] += 50
+            lease_until = clock[0] + 60
+            deadline = time.monotonic() + 5
+            while queue.conn.execute('SELECT lease_until FROM jobs').fetchone()[0] < lease_until:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            assert queue.lease('w2') is None
+    assert queue.complete(job_id, 'w1', 'air fryer', [])
+
+
+def test_crash_on_last_attempt_marks_job_failed(queue, clock):
+    queue.add_seeds(['air fryer'])
+    queue.lease('crashed-1')
+    clock[0] += 61
+    queue.lease('crashed-2')
+
+    assert queue.unfinished() == 1
+    clock[0] += 61
+    assert queue.unfinished() == 0
+    assert queue.progress() == {'failed': 1}
+
+
+class CrashingProcess:
+    """立即以 exitcode=1 退出的假工作进程"""
+    started = []
+
+    def __init__(self, target, args):
+        self.name = args[1]
+        self.exitcode = None
+
+    def start(self):
+        CrashingProcess.started.append(self.name)
+        self.exitcode = 1
+
+    def join(self, timeout=None):
+        pass
+
+    def is_alive(self):
+        return False
+
+
+def test_run_jobs_caps_restarts_per_worker(tmp_path, monkeypatch):
+    CrashingProcess.started = []
+    monkeypatch.setattr(job_runner.multiprocessing, 'Process', CrashingProcess)
+
+    count = job_runner.run_jobs(['air fryer', 'coffee maker'], workers=2, db_path=str(tmp_path / 'jobs.db'),
+                                output=str(tmp_path / 'merged.csv'), max_restarts=2, restart_backoff=0.01)
+
+    assert count == 0
+    assert sorted(CrashingProcess.started) == ['worker-0'] * 3 + ['worker-1'] * 3
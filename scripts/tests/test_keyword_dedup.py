@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""keyword_dedup：规范形式合并、MinHash/LSH 近似去重"""
+
+import random
+
+import pytest
+
+import keyword_dedup
+from keyword_dedup import canonical_form, collapse_keywords, jaccard, minhash_signatures, shingles
+from tokenizer import singular
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    """numpy 向量化和纯 Python 两种实现都要测"""
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(keyword_dedup, 'np', None)
+    return request.param
+
+
+@pytest.mark.parametrize('word, expected', [
+    ('recipes', 'recipe'), ('fryers', 'fryer'), ('news', 'news'), ('series', 'series'),
+    ('glass', 'glass'), ('virus', 'virus'), ('analysis', 'analysis'), ('bus', 'bus'), ('its', 'its'),
+])
+def test_singular(word, expected):
+    assert singular(word) == expected
+
+
+def test_canonical_form_ignores_order_case_plural_and_punctuation():
+    assert canonical_form('Easy Air-Fryer Recipes!') == canonical_form('air fryer recipe easy')
+    assert canonical_form('air fryer news') != canonical_form('new air fryer')
+    assert canonical_form('?!') == ''
+
+
+def test_exact_variants_collapse_to_first_seen(backend):
+    result = collapse_keywords(['easy air fryer recipes', 'air fryer recipe easy', 'Easy Air Fryer Recipes',
+                                'easy air fryer recipes', 'air fryer news', 'new air fryer'], threshold=1.0)
+    assert result == [
+        {'keyword': 'easy air fryer recipes', 'aliases': ['air fryer recipe easy', 'Easy Air Fryer Recipes']},
+        {'keyword': 'air fryer news', 'aliases': []},
+        {'keyword': 'new air fryer', 'aliases': []},
+    ]
+
+
+def test_keywords_without_words_are_not_merged(backend):
+    result = collapse_keywords(['???', '!!!', 'air fryer', '!!!', '...'])
+    assert result == [{'keyword': '???', 'aliases': []}, {'keyword': '!!!', 'aliases': []},
+                      {'keyword': 'air fryer', 'aliases': []}, {'keyword': '...', 'aliases': []}]
+
+
+def test_near_duplicates_merge_above_threshold(backend):
+    keywords = ['best air fryer recipes for beginners', 'easy vegan dinner ideas',
+                'best air fryer recipe for beginners uk', 'how to clean an air fryer basket',
+                'easy vegan dinner ideas tonight', 'how to clean air fryer basket']
+    result = collapse_keywords(keywords, threshold=0.8)
+    assert result == [
+        {'keyword': 'best air fryer recipes for beginners', 'aliases': ['best air fryer recipe for beginners uk']},
+        {'keyword': 'easy vegan dinner ideas', 'aliases': ['easy vegan dinner ideas tonight']},
+        {'keyword': 'how to clean an air fryer basket', 'aliases': ['how to clean air fryer basket']},
+    ]
+    # 相似度不够时不合并
+    assert len(collapse_keywords(keywords[:2] + ['air fryer'], threshold=0.8)) == 3
+
+
+def test_chinese_keywords_use_character_bigrams(backend):
+    assert shingles('空气炸锅食谱') == frozenset(['空气', '气炸', '炸锅', '锅食', '食谱'])
+    result = collapse_keywords(['空气炸锅食谱大全', '空气炸锅食谱大全集', '蛋糕做法'], threshold=0.7)
+    assert result == [{'keyword': '空气炸锅食谱大全', 'aliases': ['空气炸锅食谱大全集']},
+                      {'keyword': '蛋糕做法', 'aliases': []}]
+
+
+def test_minhash_estimates_jaccard(backend):
+    rng = random.Random(7)
+    vocabulary = [f'w{i}' for i in range(200)]
+    pairs = []
+    for _ in range(50):
+        a = frozenset(rng.sample(vocabulary, 20))
+        b = frozenset(list(a)[:rng.randint(5, 20)] + rng.sample(vocabulary, rng.randint(0, 10)))
+        pairs.append((a, b))
+
+    signatures = minhash_signatures([s for pair in pairs for s in pair], num_perm=256)
+    errors = []
+    for i, (a, b) in enumerate(pairs):
+        sig_a, sig_b = signatures[2 * i], signatures[2 * i + 1]
+        estimate = sum(x == y for x, y in zip(sig_a, sig_b)) / 256
+        errors.append(abs(estimate - jaccard(a, b)))
+    assert sum(errors) / len(errors) < 0.05
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""keyword-digger 命令行：种子词来源、JSONL 输出、逐种子词导出、--expand-to"""
+
+import gzip
+import io
+import json
+
+import pytest
+
+from script_loader import load_script
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.status_code = 200
+        self.text = text
+
+
+class FakeTransport:
+    """Google 建议词接口：每个探测词返回两个建议词"""
+    headers = {}
+    proxies = None
+
+    def __init__(self):
+        self.queries = []
+        self.closed = False
+
+    def get(self, url, params=None, timeout=None):
+        query = params['q']
+        self.queries.append(query)
+        return FakeResponse(json.dumps([query, [f'{query} recipes', f'{query} 2024']]))
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def cli(tmp_path, monkeypatch):
+    """替换 HttpTransport，在临时目录运行（缓存库和导出文件都写在那里）"""
+    module = load_script('keyword-digger.py')
+    transport = FakeTransport()
+    monkeypatch.setattr(module, 'HttpTransport', lambda **kwargs: transport)
+    monkeypatch.chdir(tmp_path)
+
+    def run(*argv):
+        module.run_cli(module.parse_args(['--rate-limit', '1000', *argv]))
+        return transport
+
+    run.module = module
+    return run
+
+
+def test_iter_seeds_reads_arguments_then_file(cli, tmp_path):
+    (tmp_path / 'seeds.txt').write_text('coffee maker\n\nair fryer\n', encoding='utf-8')
+    args = cli.module.parse_args(['--seed', 'tea', '--seed', 'rice cooker', '--seeds-file', 'seeds.txt'])
+    assert [seed.strip() for seed in cli.module.iter_seeds(args)] == ['tea', 'rice cooker', 'coffee maker', '',
+                                                                      'air fryer']
+
+
+def test_iter_seeds_reads_stdin(cli, monkeypatch):
+    monkeypatch.setattr('sys.stdin', io.StringIO('air fryer\ncoffee maker\n'))
+    args = cli.module.parse_args(['--seeds-file', '-'])
+    assert list(cli.module.iter_seeds(args)) == ['air fryer\n', 'coffee maker\n']
+
+
+def test_output_file_gets_one_line_per_seed(cli, tmp_path):
+    (tmp_path / 'seeds.txt').write_text('air fryer\n\n', encoding='utf-8')
+    transport = cli('--seed', 'coffee maker', '--seeds-file', 'seeds.txt', '--output', 'out.jsonl.gz',
+                    '--no-csv')
+
+    with gzip.open(tmp_path / 'out.jsonl.gz', 'rt', encoding='utf-8') as f:
+        results = [json.loads(line) for line in f]
+    assert [result['seed'] for result in results] == ['coffee maker', 'air fryer']
+    keywords = {kw['keyword'] for kw in results[1]['keywords']}
+    assert 'air fryer a recipes' in keywords
+    assert 'how to air fryer 2024' in keywords
+    # 种子词空行跳过；--no-csv 不导出逐种子词文件；结束时关闭连接池
+    assert len(transport.queries) == 2 * 33
+    assert not any('keywords' in path.name for path in tmp_path.iterdir())
+    assert transport.closed
+
+
+def test_stdout_output_keeps_progress_on_stderr(cli, capsys):
+    cli('--seed', 'air fryer', '--output', '-', '--no-csv')
+    captured = capsys.readouterr()
+    lines = captured.out.splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])['seed'] == 'air fryer'
+    assert '完整流程完成' in captured.err
+
+
+def test_per_seed_export_uses_export_ext(cli, tmp_path):
+    cli('--seed', 'air fryer', '--export-ext', '.jsonl', '--dedup-threshold', '1')
+    with open(tmp_path / 'air_fryer_keywords.jsonl', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert len(rows) == 66
+    assert set(rows[0]) == {'keyword', 'score', 'word_count', 'aliases'}
+    assert [row['score'] for row in rows] == sorted((row['score'] for row in rows), reverse=True)
+
+
+def test_expand_to_streams_scored_keywords(cli, tmp_path):
+    transport = cli('--seed', 'air fryer', '--expand-depth', '2', '--expand-to', 'expanded.jsonl')
+    with open(tmp_path / 'expanded.jsonl', encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    # 种子词 33 个探测词各 2 个新词，深度 2 时每个新词再查询一次
+    assert len(transport.queries) == 33 + 66
+    assert len(rows) == 66 * 3
+    assert {row['seed'] for row in rows} == {'air fryer'}
+    assert all(set(row) == {'seed', 'keyword', 'score', 'word_count'} for row in rows)
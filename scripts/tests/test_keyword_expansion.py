@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""keyword-digger 多层扩展：查询预算和前沿队列"""
+
+import pytest
+
+from probe_journal import ProbeJournal
+from script_loader import load_keyword_digger
+
+
+class FakeTransport:
+    headers = {}
+    proxies = None
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def digger(monkeypatch):
+    KeywordDigger = load_keyword_digger()
+    digger = KeywordDigger(transport=FakeTransport(), max_workers=2, rate_limit=1000, cache_path=None,
+                           page_cache_path=None, serp_provider=None)
+    digger.queries = []
+
+    def fetch(query, language='en'):
+        digger.queries.append(query)
+        return [f'{query} {suffix}' for suffix in ('one', 'two', 'three')]
+
+    monkeypatch.setattr(digger, '_fetch_google', fetch)
+    return digger
+
+
+@pytest.fixture
+def closed_journals(monkeypatch):
+    """记录被关闭的断点日志文件"""
+    closed = []
+    close = ProbeJournal.close
+
+    def spy(journal):
+        closed.append(journal.path)
+        close(journal)
+
+    monkeypatch.setattr(ProbeJournal, 'close', spy)
+    return closed
+
+
+def test_expansion_stays_within_query_budget(digger):
+    keywords = digger.expand_keywords('air fryer', max_depth=3, max_queries=50)
+    assert len(digger.queries) == 50
+    assert len(keywords) == len(set(keywords)) == 150
+
+
+def test_budget_cut_keeps_unqueried_nodes_on_frontier(digger, capsys):
+    # 种子词 33 个探测词，剩余 2 次预算：只出队 2 个节点，其余留在前沿队列
+    digger.expand_keywords('air fryer', max_depth=3, max_queries=35)
+    assert len(digger.queries) == 35
+
+    # 99 个一层节点 - 出队 2 个 + 它们各自的 3 个新词
+    last_progress = [line for line in capsys.readouterr().out.splitlines() if '待扩展' in line][-1]
+    assert last_progress.endswith('待扩展 103')
+
+
+def test_single_node_larger_than_budget_is_partially_probed(digger):
+    keywords = digger.expand_keywords('air fryer', max_depth=2, max_queries=10)
+    assert sorted(digger.queries) == [f'air fryer {c}' for c in 'abcdefghij']
+    assert len(keywords) == 30
+
+
+def test_interrupted_expansion_resumes_from_journal(digger, tmp_path, closed_journals):
+    digger.journal_dir = str(tmp_path)
+
+    # 第一批（种子词的 33 个探测词）完成后中断
+    run = digger.iter_expand_keywords('air fryer', max_depth=2)
+    first_batch = [next(run) for _ in range(99)]
+    run.close()
+    first_queries = set(digger.queries)
+    assert len(first_queries) == 33
+    journals = [str(path) for path in tmp_path.iterdir()]
+    assert closed_journals == journals and len(journals) == 1
+
+    # 重新运行：已完成的探测词从断点日志读取，不再请求
+    digger.queries = []
+    keywords = digger.expand_keywords('air fryer', max_depth=2)
+    assert not first_queries & set(digger.queries)
+    assert len(digger.queries) == 99
+    assert keywords[:99] == first_batch
+    assert len(keywords) == 99 * 4
+    # 正常结束后删除日志
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failing_expansion_closes_and_keeps_journal(digger, tmp_path, monkeypatch, closed_journals):
+    digger.journal_dir = str(tmp_path)
+    fetch = digger._fetch_google
+
+    def fetch_then_die(query, language='en'):
+        if len(digger.queries) >= 33:
+            raise KeyboardInterrupt
+        return fetch(query, language)
+
+    monkeypatch.setattr(digger, '_fetch_google', fetch_then_die)
+    with pytest.raises(KeyboardInterrupt):
+        digger.expand_keywords('air fryer', max_depth=2)
+
+    journals = [str(path) for path in tmp_path.iterdir()]
+    assert closed_journals == journals and len(journals) == 1
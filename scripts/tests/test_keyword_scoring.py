@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""keyword_scoring：数字规则与 str.isdigit 一致、批量评分与单条评分一致、top_n 与全量排序一致、规则文件热加载"""
+
+import itertools
+import json
+import os
+import random
+import sys
+
+import pytest
+
+import keyword_scoring
+from keyword_scoring import RuleBook, load_rulebook
+
+
+@pytest.fixture
+def scorer():
+    return load_rulebook().scorer('keyword')
+
+
+def test_digit_rule_matches_str_isdigit():
+    pattern = keyword_scoring._DigitPattern()
+    digits = [c for c in map(chr, range(sys.maxunicode + 1)) if c.isdigit()]
+    assert all(pattern.search(f'x{c}') for c in digits)
+    for text in ['air fryer', 'x½', 'Ⅻ', '二〇二五', 'abc-def']:
+        assert pattern.search(text) == any(c.isdigit() for c in text)
+
+
+@pytest.mark.parametrize('keyword', ['x² calculator', '①号线 时刻表', 'top 10 air fryers', 'iphone ١٥'])
+def test_unicode_digits_score_like_ascii_digits(scorer, keyword):
+    assert scorer.score(keyword) - scorer.score(''.join('x' if c.isdigit() else c for c in keyword)) == 10
+
+
+def test_score_many_matches_score(scorer):
+    keywords = ['x² calculator', 'best air fryer 2024', 'how to clean an air fryer', 'air fryer', '空气炸锅 推荐 ①']
+    assert scorer.score_many(keywords) == [scorer.score(k) for k in keywords]
+
+
+def sorted_top(scores, n):
+    """全量排序取前 n 个：分数从高到低，同分按下标"""
+    return sorted(range(len(scores)), key=lambda i: -scores[i])[:max(n, 0)]
+
+
+@pytest.mark.parametrize('scores', [
+    [50, 80, 80, 20, 80, 50, 90],
+    [10] * 8,
+    [3, 1, 2],
+    [],
+])
+@pytest.mark.parametrize('n', [0, 1, 2, 3, 4, 7, 8, 20])
+def test_top_n_matches_full_sort(scores, n):
+    pytest.importorskip('numpy')
+    assert keyword_scoring.top_n(scores, n).tolist() == sorted_top(scores, n)
+
+
+def test_top_n_matches_full_sort_on_random_scores():
+    pytest.importorskip('numpy')
+    rng = random.Random(3)
+    for _ in range(200):
+        scores = [rng.randint(0, 10) for _ in range(rng.randint(1, 60))]
+        n = rng.randint(0, len(scores) + 5)
+        assert keyword_scoring.top_n(scores, n).tolist() == sorted_top(scores, n)
+
+
+@pytest.mark.parametrize('traffic, value', [
+    ('200,000+', 200000),
+    ('2M+', 2e6),
+    ('50K+', 50000),
+    ('5k views', 5000),
+    ('1.2万热度', 12000),
+    ('3亿', 3e8),
+    ('1234 upvotes', 1234),
+    ('3 months ago', 3),
+    ('10 kids', 10),
+    ('2 million', 2e6),
+    ('1.5 Billion views', 1.5e9),
+    ('4 millionaires', 4),
+    ('7mins', 7),
+    ('N/A', None),
+    ('', None),
+])
+def test_traffic_value(traffic, value):
+    assert keyword_scoring.traffic_value(traffic) == value
+
+
+def test_traffic_words_do_not_inflate_trend_scores():
+    trend = load_rulebook().scorer('trend')
+    assert trend.score('air fryer', traffic='3 months') == trend.score('air fryer', traffic='3')
+    assert trend.score('air fryer', traffic='200K+') - trend.score('air fryer', traffic='3') == 30
+
+
+def rules(words, points=30):
+    return {'keyword': {'min': 0, 'max': 100, 'rules': [
+        {'name': 'length', 'type': 'word_count', 'tiers': [[0, 5]]},
+        {'name': 'intent', 'type': 'contains', 'points': points, 'words': words},
+    ]}}
+
+
+_mtimes = itertools.count(1_000_000_000, 10)
+
+
+def write_rules(path, content, indent=None):
+    """写入规则文件；每次写入都换一个新的修改时间（不依赖文件系统的时间精度）"""
+    text = content if isinstance(content, str) else json.dumps(content, indent=indent)
+    path.write_text(text, encoding='utf-8')
+    mtime = next(_mtimes)
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / 'rules.json'
+    write_rules(path, rules(['buy']))
+    return path
+
+
+def test_rulebook_picks_up_edits(rules_file):
+    book = RuleBook(str(rules_file), check_interval=0)
+    assert book.scorer('keyword').score('buy now') == 35
+
+    write_rules(rules_file, rules(['cheap'], points=20))
+    assert book.scorer('keyword').score('buy now') == 5
+    assert book.scorer('keyword').score('cheap flights') == 25
+
+
+@pytest.mark.parametrize('broken', ['{"keyword": {"rules": [', json.dumps(rules(['buy'])) + '}',
+                                    json.dumps({'keyword': {'rules': [{'name': 'x', 'type': 'regex'}]}}),
+                                    json.dumps({'keyword': {'rules': [{'name': 'x', 'type': 'contains'}]}})])
+def test_invalid_edit_keeps_previous_rules(rules_file, broken, capsys):
+    book = RuleBook(str(rules_file), check_interval=0)
+    scorer = book.scorer('keyword')
+
+    write_rules(rules_file, broken)
+    assert book.scorer('keyword') is scorer
+    assert book.scorer('keyword').score('buy now') == 35
+    assert capsys.readouterr().out.count('继续使用旧规则') == 1
+
+    # 修好后重新加载
+    write_rules(rules_file, rules(['cheap']))
+    assert book.scorer('keyword').score('cheap flights') == 35
+
+
+def test_compile_cache_is_keyed_on_content(rules_file, tmp_path):
+    book = RuleBook(str(rules_file), check_interval=0)
+    scorer = book.scorer('keyword')
+
+    # 另一个文件、只改格式：内容相同，复用已编译的评分器
+    other = tmp_path / 'same.json'
+    write_rules(other, rules(['buy']), indent=2)
+    assert RuleBook(str(other)).scorer('keyword') is scorer
+    write_rules(rules_file, rules(['buy']), indent=4)
+    assert book.scorer('keyword') is scorer
+
+    write_rules(rules_file, rules(['buy'], points=25))
+    assert book.scorer('keyword') is not scorer
+    write_rules(rules_file, rules(['buy']))
+    assert book.scorer('keyword') is scorer
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""page_cache：条件请求、内容哈希命中、分析版本变化时失效"""
+
+import sqlite3
+
+import pytest
+
+from fingerprints import FingerprintDB
+from html_extract import analysis_version
+from page_cache import PageCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode('utf-8')
+        self.headers = headers or {}
+
+
+class FakeTransport:
+    """按顺序返回预设的响应，记录每次请求的请求头"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(headers or {})
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PageCache(str(tmp_path / 'pages.db'))
+    yield cache
+    cache.close()
+
+
+def analyze(response):
+    return {'length': len(response.content)}
+
+
+def test_not_modified_and_unchanged_reuse_analysis(cache):
+    page = FakeResponse(200, b'<html>v1</html>', {'ETag': '"v1"'})
+    transport = FakeTransport(page, FakeResponse(304), FakeResponse(200, b'<html>v1</html>'))
+
+    assert cache.fetch(transport, 'https://a.example/', analyze)[2] == 'miss'
+    assert cache.fetch(transport, 'https://a.example/', analyze)[2] == 'not_modified'
+    assert transport.requests[1] == {'If-None-Match': '"v1"'}
+    analysis, _, status = cache.fetch(transport, 'https://a.example/', analyze)
+    assert (analysis, status) == ({'length': 15}, 'unchanged')
+
+
+def test_version_change_invalidates_cached_analysis(cache):
+    page = FakeResponse(200, b'<html>v1</html>', {'ETag': '"v1"'})
+    transport = FakeTransport(page, page, FakeResponse(304))
+
+    cache.fetch(transport, 'https://a.example/', analyze, version='1:aaaa')
+    calls = []
+    analysis, _, status = cache.fetch(transport, 'https://a.example/', lambda r: calls.append(r) or {'new': True},
+                                      version='1:bbbb')
+
+    # 版本不同：不发条件请求（304 没有内容可分析），内容哈希相同也要重新分析
+    assert transport.requests[1] == {}
+    assert (analysis, status, len(calls)) == ({'new': True}, 'miss', 1)
+    assert cache.fetch(transport, 'https://a.example/', analyze, version='1:bbbb')[2] == 'not_modified'
+
+
+def test_analysis_version_follows_fingerprint_file():
+    a = FingerprintDB({'signatures': [{'name': 'AdSense', 'category': 'monetization', 'html': ['adsbygoogle']}]})
+    b = FingerprintDB({'signatures': [{'name': 'AdSense', 'category': 'monetization', 'html': ['pagead2']}]})
+    assert analysis_version(a) != analysis_version(b)
+    assert analysis_version(a) == analysis_version(FingerprintDB({'signatures': a.signatures}))
+
+
+def test_old_cache_file_is_migrated(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE pages (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, '
+                 'content_hash TEXT NOT NULL, analysis TEXT NOT NULL, fetched_at REAL NOT NULL, '
+                 'checked_at REAL NOT NULL)')
+    conn.execute("INSERT INTO pages VALUES ('https://a.example/', '\"v1\"', NULL, 'x', '{}', 0, 0)")
+    conn.commit()
+    conn.close()
+
+    cache = PageCache(path)
+    assert cache.get('https://a.example/', version='1:aaaa') is None
+    assert cache.get('https://a.example/') is not None
+    cache.close()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""result_sinks：格式/压缩识别、CSV 与 JSONL 输出、追加、定时刷新"""
+
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+import result_sinks
+from result_sinks import detect_format, open_sink
+
+ROWS = [
+    {'keyword': 'air fryer recipes', 'score': 85, 'aliases': ['air fryer recipe', 'recipes air fryer']},
+    {'keyword': '空气炸锅', 'score': 70, 'aliases': []},
+]
+
+
+@pytest.mark.parametrize('path, expected', [
+    ('out.csv', ('csv', None)),
+    ('out.jsonl', ('jsonl', None)),
+    ('out.ndjson', ('jsonl', None)),
+    ('OUT.JSONL.GZ', ('jsonl', 'gzip')),
+    ('out.csv.zst', ('csv', 'zstd')),
+    ('out.txt', ('csv', None)),
+])
+def test_detect_format(path, expected):
+    assert detect_format(path) == expected
+
+
+def read_csv(text):
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def test_csv_sink_writes_selected_fields_and_joins_lists(tmp_path):
+    path = tmp_path / 'keywords.csv'
+    with open_sink(str(path), fields=['keyword', 'aliases']) as sink:
+        assert sink.write_many(ROWS) == 2
+
+    rows = read_csv(path.read_text(encoding='utf-8'))
+    assert rows == [{'keyword': 'air fryer recipes', 'aliases': 'air fryer recipe | recipes air fryer'},
+                    {'keyword': '空气炸锅', 'aliases': ''}]
+
+
+def test_jsonl_gzip_round_trip(tmp_path):
+    path = tmp_path / 'keywords.jsonl.gz'
+    with open_sink(str(path)) as sink:
+        sink.write_many(ROWS)
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == ROWS
+
+
+def test_zstd_round_trip(tmp_path):
+    zstandard = pytest.importorskip('zstandard')
+    path = tmp_path / 'keywords.csv.zst'
+    with open_sink(str(path), fields=['keyword', 'score']) as sink:
+        sink.write_many(ROWS)
+
+    with open(path, 'rb') as f:
+        text = zstandard.ZstdDecompressor().stream_reader(f).read().decode('utf-8')
+    assert read_csv(text) == [{'keyword': 'air fryer recipes', 'score': '85'}, {'keyword': '空气炸锅', 'score': '70'}]
+
+
+def test_zstd_without_package_raises(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_sinks, 'zstandard', None)
+    with pytest.raises(ImportError):
+        open_sink(str(tmp_path / 'keywords.csv.zst'))
+
+
+@pytest.mark.parametrize('name', ['keywords.csv', 'keywords.csv.gz'])
+def test_csv_append_writes_header_once(tmp_path, name):
+    path = str(tmp_path / name)
+    for row in ROWS:
+        with open_sink(path, fields=['keyword', 'score'], append=True) as sink:
+            sink.write(row)
+
+    if name.endswith('.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+            text = f.read()
+    else:
+        with open(path, encoding='utf-8', newline='') as f:
+            text = f.read()
+    assert [row['keyword'] for row in read_csv(text)] == ['air fryer recipes', '空气炸锅']
+
+
+def test_flushed_rows_survive_without_close(tmp_path):
+    path = tmp_path / 'partial.jsonl.gz'
+    sink = open_sink(str(path), flush_every=2, flush_interval=3600)
+    sink.write_many(ROWS * 2 + ROWS[:1])
+
+    # 没有 close（模拟进程中途退出）：已刷新的 4 行可以解压读出
+    with open(path, 'rb') as f:
+        data = f.read()
+    decompressed = gzip.GzipFile(fileobj=io.BytesIO(data))
+    lines = []
+    with pytest.raises(EOFError):
+        for line in decompressed:
+            lines.append(line)
+    assert [json.loads(line)['keyword'] for line in lines] == [row['keyword'] for row in ROWS * 2]
+    sink.close()
+
+
+def test_stdout_sink_is_jsonl_and_not_closed():
+    stream = io.StringIO()
+    with open_sink('-', fields=['keyword'], stdout=stream) as sink:
+        sink.write(ROWS[1])
+    assert not stream.closed
+    assert stream.getvalue() == '{"keyword": "空气炸锅"}\n'
+
+
+def test_result_sink_is_abstract():
+    with pytest.raises(TypeError):
+        result_sinks.ResultSink(io.StringIO())
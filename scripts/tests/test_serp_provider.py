@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""serp_provider：保存的搜索结果页面解析、本地测试服务器上的 HtmlSerpProvider"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from http_session import HttpTransport
+from serp_provider import (HtmlSerpProvider, SavedSerpProvider, SerpProvider, make_serp_provider,
+                           parse_serp_html, pick_competitors)
+from suggestion_cache import SuggestionCache
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+FIXTURE = 'serp_air_fryer_recipes.html'
+
+
+def read_fixture(name=FIXTURE):
+    with open(os.path.join(FIXTURE_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_parse_serp_html_keeps_organic_results_in_order():
+    results = parse_serp_html(read_fixture())
+
+    assert [r['url'] for r in results] == [
+        'https://www.allrecipes.com/air-fryer-recipes/',
+        'https://www.delish.com/cooking/g4442/air-fryer-recipes/',
+        'https://www.youtube.com/watch?v=abc123',
+        'https://airfryerworld.example/recipes/',
+        'https://www.reddit.com/r/airfryer/',
+    ]
+    assert [r['position'] for r in results] == [1, 2, 3, 4, 5]
+    assert results[0] == {'position': 1, 'url': 'https://www.allrecipes.com/air-fryer-recipes/',
+                          'domain': 'www.allrecipes.com', 'title': 'Air Fryer Recipes | Allrecipes'}
+    assert results[3]['title'] == 'Air Fryer World: Recipes'
+
+
+def test_parse_serp_html_respects_num():
+    assert len(parse_serp_html(read_fixture(), num=2)) == 2
+
+
+def test_pick_competitors_skips_platforms():
+    results = parse_serp_html(read_fixture())
+    assert pick_competitors({'air fryer recipes': results}, limit=5) == [
+        'https://www.allrecipes.com/', 'https://www.delish.com/', 'https://airfryerworld.example/']
+
+
+def test_serp_provider_is_abstract():
+    with pytest.raises(TypeError):
+        SerpProvider()
+
+
+def test_saved_provider_reads_directory_and_gets_cache(tmp_path):
+    (tmp_path / SavedSerpProvider.filename('Air Fryer Recipes')).write_text(read_fixture(), encoding='utf-8')
+    cache = SuggestionCache(str(tmp_path / 'cache.db'))
+
+    provider = make_serp_provider(f'saved:{tmp_path}', cache=cache)
+    assert isinstance(provider, SavedSerpProvider)
+    assert provider.cache is cache
+    assert len(provider.search('Air Fryer Recipes')) == 5
+    assert provider.search('no such query') == []
+    cache.close()
+
+
+class _SearchHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        self.server.requests.append(parse_qs(parsed.query))
+        if parsed.path != '/search':
+            self.send_error(404)
+            return
+        body = read_fixture().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def search_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _SearchHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def transport():
+    transport = HttpTransport(use_proxy=False, http2=False)
+    yield transport
+    transport.close()
+
+
+def test_html_provider_against_local_server(search_server, transport, tmp_path):
+    template = f'http://127.0.0.1:{search_server.server_port}/search?q={{query}}&num={{num}}&hl={{language}}'
+    cache = SuggestionCache(str(tmp_path / 'cache.db'))
+    assert isinstance(make_serp_provider(template, transport, cache), HtmlSerpProvider)
+    provider = HtmlSerpProvider(transport, template, use_proxy=False, cache=cache, rate_limit=100.0)
+
+    results = provider.search_many(['air fryer recipes', 'air fryer tips'], language='en', num=3)
+    assert [len(items) for items in results.values()] == [3, 3]
+    assert results['air fryer recipes'][0]['domain'] == 'www.allrecipes.com'
+    assert sorted(r['q'][0] for r in search_server.requests) == ['air fryer recipes', 'air fryer tips']
+    assert search_server.requests[0]['num'] == ['3']
+
+    # 第二次查询走缓存，不再请求服务器
+    assert provider.search('air fryer recipes', num=3) == results['air fryer recipes']
+    assert len(search_server.requests) == 2
+    cache.close()
+
+
+def test_html_provider_returns_empty_on_client_error(search_server, transport):
+    template = f'http://127.0.0.1:{search_server.server_port}/missing?q={{query}}'
+    provider = HtmlSerpProvider(transport, template, use_proxy=False, rate_limit=100.0)
+    assert provider.search('air fryer recipes') == []
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""site_crawler：URL 规范化、robots.txt（Disallow / Crawl-delay）、站内链接和页数上限"""
+
+import pytest
+
+from site_crawler import SiteCrawler, normalize_url
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://Example.com/a/b/#comments', 'https://example.com/a/b'),
+    ('https://example.com:443/a', 'https://example.com/a'),
+    ('http://example.com:80', 'http://example.com/'),
+    ('http://example.com:8080/a/', 'http://example.com:8080/a'),
+    ('https://example.com:80/a', 'https://example.com:80/a'),
+    ('https://example.com/', 'https://example.com/'),
+    ('https://example.com/a/?b=2&a=1&a=0', 'https://example.com/a?a=0&a=1&b=2'),
+    ('https://example.com/a?utm_source=x&ref=y&FBCLID=z&q=air+fryer', 'https://example.com/a?q=air+fryer'),
+    ('https://example.com/a?empty=', 'https://example.com/a?empty='),
+    ('mailto:me@example.com', None),
+    ('javascript:void(0)', None),
+    ('https:///no-host', None),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+
+def test_normalize_relative_url():
+    assert normalize_url('../c/?x=1#top', 'https://example.com/a/b/') == 'https://example.com/a/c?x=1'
+    assert normalize_url('#top', 'https://example.com/a') == 'https://example.com/a'
+
+
+class FakeResponse:
+    def __init__(self, status_code, text='', content_type='text/html; charset=utf-8'):
+        self.status_code = status_code
+        self.text = text
+        self.headers = {'Content-Type': content_type}
+
+
+class FakeSite:
+    """按URL返回预设页面，记录请求过的URL；没有的页面返回 404"""
+    headers = {}
+
+    def __init__(self, pages, robots=None):
+        self.pages = dict(pages)
+        if robots is not None:
+            self.pages['https://example.com/robots.txt'] = robots
+        self.requested = []
+
+    def get(self, url, timeout=None):
+        self.requested.append(url)
+        page = self.pages.get(url)
+        if page is None:
+            return FakeResponse(404)
+        if isinstance(page, FakeResponse):
+            return page
+        return FakeResponse(200, page)
+
+
+def links(*hrefs):
+    return '<html><body>' + ''.join(f'<a href="{href}">x</a>' for href in hrefs) + '</body></html>'
+
+
+def crawler(site, **options):
+    return SiteCrawler(site, default_delay=0.001, **options)
+
+
+def test_robots_disallow_blocks_pages():
+    site = FakeSite({
+        'https://example.com/': links('/blog/a', '/private/x', '/private', '/tools/'),
+        'https://example.com/blog/a': links('/'),
+        'https://example.com/tools': links('/private/y'),
+    }, robots='User-agent: *\nDisallow: /private\n')
+
+    result = crawler(site).crawl('https://example.com/')
+
+    assert sorted(result['pages']) == ['https://example.com/', 'https://example.com/blog/a',
+                                       'https://example.com/tools']
+    assert result['blocked'] == 3
+    assert not any('/private' in url for url in site.requested)
+
+
+def test_missing_robots_allows_everything():
+    site = FakeSite({'https://example.com/': links('/private')})
+    result = crawler(site).crawl('https://example.com/')
+    assert result['blocked'] == 0
+    assert 'https://example.com/private' in site.requested
+
+
+def test_robots_can_be_ignored():
+    site = FakeSite({'https://example.com/': links('/private')}, robots='User-agent: *\nDisallow: /\n')
+    result = crawler(site, respect_robots=False).crawl('https://example.com/')
+    assert result['pages'] == ['https://example.com/']
+    assert 'https://example.com/robots.txt' not in site.requested
+
+
+@pytest.mark.parametrize('robots, rate', [
+    ('User-agent: *\nCrawl-delay: 4\n', 0.25),
+    ('User-agent: *\nDisallow:\n', 2),
+])
+def test_crawl_delay_sets_host_rate(robots, rate):
+    site = FakeSite({}, robots=robots)
+    spider = SiteCrawler(site, max_pages=1, default_delay=0.5)
+    # 首页已下载：不需要再请求，不受限速影响
+    result = spider.crawl('https://example.com/', start_html=links('/a'))
+
+    assert result['pages'] == ['https://example.com/']
+    bucket = spider.fetcher.bucket_for('https://example.com/')
+    assert bucket.rate == pytest.approx(rate)
+    assert bucket.capacity == 1
+    assert site.requested == ['https://example.com/robots.txt']
+
+
+def test_crawl_stays_on_site_and_fetches_each_page_once():
+    site = FakeSite({
+        'https://example.com/blog/a': links('/', '/category/air-fryers/recipes'),
+        'https://example.com/category/air-fryers/recipes': links('/blog/a/'),
+        'https://www.example.com/about': links(),
+    })
+    home = links('/blog/a/', '/blog/a#comments', '/blog/a?utm_source=feed', 'https://www.example.com/about',
+                 'https://other.com/blog/x', 'https://sub.example.com/', '/logo.png', '/feed.xml',
+                 'mailto:me@example.com')
+
+    result = crawler(site, respect_robots=False).crawl('https://example.com/', start_html=home)
+
+    # 锚点、末尾斜杠、跟踪参数规范化后只抓一次；www. 前缀算同一站点；静态资源、子域名和外站不抓
+    assert sorted(site.requested) == ['https://example.com/blog/a',
+                                      'https://example.com/category/air-fryers/recipes',
+                                      'https://www.example.com/about']
+    assert len(result['pages']) == 4
+    assert result['article_urls'] == ['https://example.com/blog/a']
+    assert result['category_tree'] == {'blog': {'count': 1, 'children': {'a': 1}},
+                                       'category': {'count': 1, 'children': {'air-fryers': 1}}}
+
+
+def test_max_pages_limits_fetches():
+    pages = {'https://example.com/': links(*[f'/p{i}' for i in range(20)])}
+    pages.update({f'https://example.com/p{i}': links(f'/p{i}/next') for i in range(20)})
+    site = FakeSite(pages)
+
+    result = crawler(site, max_pages=5, respect_robots=False).crawl('https://example.com/')
+
+    assert len(result['pages']) == 5
+    assert len(site.requested) == 5
+
+
+def test_failed_and_non_html_pages_do_not_count():
+    site = FakeSite({
+        'https://example.com/': links('/missing', '/data', '/ok'),
+        'https://example.com/data': FakeResponse(200, '{}', content_type='application/json'),
+        'https://example.com/ok': links(),
+    })
+    result = crawler(site, max_pages=3, respect_robots=False).crawl('https://example.com/')
+    assert result['pages'] == ['https://example.com/', 'https://example.com/ok']
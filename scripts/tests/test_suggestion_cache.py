@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""suggestion_cache：按数据源的 TTL、LRU 淘汰、多个连接共用一个缓存文件"""
+
+import time
+
+import pytest
+
+import suggestion_cache
+from suggestion_cache import SuggestionCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动拨动的 time.time()"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(suggestion_cache.time, 'time', lambda: now[0])
+    return now
+
+
+def test_round_trip_and_hit_stats(tmp_path):
+    cache = SuggestionCache(str(tmp_path / 'cache.db'))
+    assert cache.get('google', 'air fryer', 'en') is None
+
+    cache.set('google', 'air fryer', 'en', ['air fryer recipes', '空气炸锅'])
+    assert cache.get('google', 'air fryer', 'en') == ['air fryer recipes', '空气炸锅']
+    assert cache.get('google', 'air fryer', 'zh') is None
+
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'hit_rate': 1 / 3, 'size': 1}
+    cache.close()
+
+
+def test_ttl_is_per_endpoint(tmp_path, clock):
+    cache = SuggestionCache(str(tmp_path / 'cache.db'), ttl={'google': 100, 'baidu': 10})
+    cache.set('google', 'q', 'en', ['a'])
+    cache.set('baidu', 'q', 'zh', ['b'])
+
+    clock[0] += 50
+    assert cache.get('google', 'q', 'en') == ['a']
+    assert cache.get('baidu', 'q', 'zh') is None
+
+    clock[0] += 51
+    assert cache.get('google', 'q', 'en') is None
+
+    # 重新写入后重新计时
+    cache.set('google', 'q', 'en', ['c'])
+    assert cache.get('google', 'q', 'en') == ['c']
+    cache.close()
+
+
+def test_lru_evicts_least_recently_accessed(tmp_path, clock):
+    cache = SuggestionCache(str(tmp_path / 'cache.db'), max_entries=10)
+    for i in range(10):
+        clock[0] += 1
+        cache.set('google', f'q{i}', 'en', [i])
+
+    # q0 刚被读过，q1 是最久未访问的
+    clock[0] += 1
+    assert cache.get('google', 'q0', 'en') == [0]
+
+    clock[0] += 1
+    cache.set('google', 'q10', 'en', [10])
+
+    # 超过容量后一次淘汰 1 + 10% 条
+    assert cache.stats()['size'] == 9
+    assert cache.get('google', 'q0', 'en') == [0]
+    assert cache.get('google', 'q1', 'en') is None
+    assert cache.get('google', 'q2', 'en') is None
+    assert cache.get('google', 'q10', 'en') == [10]
+    cache.close()
+
+
+def test_updates_do_not_count_as_new_entries(tmp_path):
+    cache = SuggestionCache(str(tmp_path / 'cache.db'), max_entries=3)
+    for _ in range(5):
+        cache.set('google', 'q', 'en', ['a'])
+    assert cache.stats()['size'] == 1
+    cache.close()
+
+
+def test_size_cap_holds_across_connections(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    caches = [SuggestionCache(path, max_entries=20) for _ in range(3)]
+
+    for i in range(10):
+        for n, cache in enumerate(caches):
+            cache.set('google', f'w{n}-{i}', 'en', [i])
+            time.sleep(0.0001)  # accessed_at 有先后
+
+    for cache in caches:
+        cache.close()
+    reopened = SuggestionCache(path, max_entries=20)
+    assert reopened.stats()['size'] <= 20
+    assert reopened.get('google', 'w2-9', 'en') == [9]
+    reopened.close()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""tokenizer：二元组和 jieba 两种中文分词、词数、分词结果缓存、去复数"""
+
+import pytest
+
+import tokenizer
+from tokenizer import BigramSegmenter, singular, tokenize, word_count, words
+
+
+@pytest.fixture
+def use_segmenter():
+    """替换中文分词器，测试结束后恢复默认"""
+    yield tokenizer.set_segmenter
+    tokenizer.set_segmenter(None)
+
+
+class CountingSegmenter:
+    """记录每段中文被切分的次数（没有 count 方法：词数来自分词结果）"""
+
+    def __init__(self, segmenter):
+        self.segmenter = segmenter
+        self.calls = []
+
+    def segment(self, run):
+        self.calls.append(run)
+        return self.segmenter.segment(run)
+
+
+def test_text_without_chinese_matches_split(use_segmenter):
+    use_segmenter(CountingSegmenter(BigramSegmenter()))
+    text = 'Best  Air-Fryer recipes, 2024!'
+    assert tokenize(text) == text.lower().split()
+    assert word_count(text) == 4
+    assert words(text) == ['best', 'air-fryer', 'recipes', '2024']
+    assert tokenizer.get_segmenter().calls == []
+
+
+def test_bigram_fallback(use_segmenter):
+    use_segmenter(BigramSegmenter())
+    assert tokenize('空气炸锅 Recipes') == ['空气', '气炸', '炸锅', 'recipes']
+    assert tokenize('炸锅') == ['炸锅']
+    # 中英文相连时分开；纯标点的部分不算词
+    assert tokenize('买air fryer空气炸锅！') == ['买', 'air', 'fryer', '空气', '气炸', '炸锅']
+    # 二元组互相重叠：词数按每两个字一个词估算
+    assert word_count('空气炸锅 recipes') == 3
+    assert word_count('空气炸锅食谱 - 2024') == 4
+
+
+def test_default_segmenter_falls_back_to_bigrams(use_segmenter, monkeypatch):
+    def missing_jieba():
+        raise ImportError('No module named jieba')
+
+    monkeypatch.setattr(tokenizer, 'JiebaSegmenter', missing_jieba)
+    use_segmenter(None)
+    assert isinstance(tokenizer.get_segmenter(), BigramSegmenter)
+    assert tokenize('空气炸锅') == ['空气', '气炸', '炸锅']
+
+
+def test_jieba_path(use_segmenter):
+    pytest.importorskip('jieba')
+    use_segmenter(tokenizer.JiebaSegmenter())
+    assert tokenize('空气炸锅食谱 Recipes') == ['空气', '炸锅', '食谱', 'recipes']
+    assert words('《空气炸锅》食谱') == ['空气', '炸锅', '食谱']
+    assert word_count('空气炸锅食谱 recipes') == 4
+
+
+def test_jieba_segments_each_run_once(use_segmenter):
+    pytest.importorskip('jieba')
+    spy = CountingSegmenter(tokenizer.JiebaSegmenter())
+    use_segmenter(spy)
+
+    for _ in range(3):
+        assert word_count('空气炸锅食谱') == len(tokenize('空气炸锅食谱')) == 3
+        tokenize('空气炸锅 推荐')
+    assert sorted(spy.calls) == sorted(['空气炸锅食谱', '空气炸锅', '推荐'])
+
+    # 换分词器时清空缓存
+    use_segmenter(spy)
+    tokenize('空气炸锅食谱')
+    assert spy.calls.count('空气炸锅食谱') == 2
+
+
+@pytest.mark.parametrize('word, expected', [
+    ('recipes', 'recipe'), ('fryers', 'fryer'), ('news', 'news'), ('glass', 'glass'), ('its', 'its'),
+    ('glasses', 'glass'), ('classes', 'class'), ('dishes', 'dish'), ('brushes', 'brush'),
+    ('watches', 'watch'), ('beaches', 'beach'), ('coaches', 'coach'), ('boxes', 'box'), ('taxes', 'tax'),
+    ('caches', 'cache'), ('niches', 'niche'), ('headaches', 'headache'),
+    ('cases', 'case'), ('houses', 'house'), ('prizes', 'prize'),
+])
+def test_singular(word, expected):
+    assert singular(word) == expected
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""topic_clusters：k-means（scikit-learn）和词频分组两条路径、支柱词与排序、"其他"集群、延迟导入"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import topic_clusters
+from topic_clusters import OTHER_LABEL, cluster_keywords
+
+RECIPES = ['air fryer chicken wings recipe', 'air fryer chicken thighs recipe',
+           'crispy chicken wings air fryer recipe', 'air fryer chicken breast recipe']
+CLEANING = ['how to clean air fryer basket', 'clean air fryer basket grease', 'air fryer basket cleaning tips']
+BRANDS = ['ninja air fryer review', 'cosori air fryer review', 'best air fryer review 2024']
+KEYWORDS = RECIPES + CLEANING + BRANDS
+SCORES = list(range(len(KEYWORDS)))
+
+
+def run_script(code, **env):
+    """在新的解释器里运行（sys.modules 和字符串哈希种子都是全新的），返回标准输出"""
+    return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                          cwd=os.path.dirname(topic_clusters.__file__), env=dict(os.environ, **env)).stdout
+
+
+def groups(result):
+    return sorted(sorted([c['pillar']] + c['supporting']) for c in result['clusters'])
+
+
+def check_topics(result):
+    assert result['common_terms'] == ['air', 'fryer']
+    assert groups(result) == sorted(sorted(g) for g in (RECIPES, CLEANING, BRANDS))
+    # 按总分从高到低；支柱词是分数最高的关键词
+    assert [(c['pillar'], c['size'], c['score']) for c in result['clusters']] == [
+        ('best air fryer review 2024', 3, 24),
+        ('air fryer basket cleaning tips', 3, 15),
+        ('air fryer chicken breast recipe', 4, 6)]
+    assert result['clusters'][2]['label'] == 'chicken recipe'
+    assert result['clusters'][2]['supporting'] == ['crispy chicken wings air fryer recipe',
+                                                   'air fryer chicken thighs recipe',
+                                                   'air fryer chicken wings recipe']
+
+
+def test_kmeans_path():
+    pytest.importorskip('sklearn')
+    check_topics(cluster_keywords(KEYWORDS, SCORES, n_clusters=3))
+
+
+def test_fallback_path():
+    check_topics(cluster_keywords(KEYWORDS, SCORES, n_clusters=3, use_sklearn=False))
+
+
+def test_fallback_without_sklearn(monkeypatch):
+    monkeypatch.setattr(topic_clusters, 'load_sklearn', lambda: None)
+    monkeypatch.setattr(topic_clusters, '_kmeans_labels', None)
+    check_topics(cluster_keywords(KEYWORDS, SCORES, n_clusters=3))
+
+
+@pytest.mark.parametrize('use_sklearn', [True, False])
+def test_small_clusters_go_to_other(use_sklearn):
+    if use_sklearn:
+        pytest.importorskip('sklearn')
+    keywords = RECIPES + CLEANING + ['toaster oven comparison']
+    result = cluster_keywords(keywords, [1] * 7 + [9], n_clusters=3, use_sklearn=use_sklearn)
+
+    # 只有一个成员的集群并入"其他"，"其他"即使分数最高也排在最后
+    assert [(c['label'], c['pillar'], c['size']) for c in result['clusters']] == [
+        ('chicken recipe', 'air fryer chicken breast recipe', 4),
+        ('basket clean', 'how to clean air fryer basket', 3),
+        (OTHER_LABEL, 'toaster oven comparison', 1)]
+    result = cluster_keywords(keywords, n_clusters=3, min_size=1, use_sklearn=use_sklearn)
+    assert OTHER_LABEL not in [c['label'] for c in result['clusters']]
+
+
+def test_labels_do_not_depend_on_hash_seed():
+    code = ('from topic_clusters import cluster_keywords\n'
+            f'result = cluster_keywords({KEYWORDS!r}, n_clusters=3, use_sklearn=False)\n'
+            'print(result["common_terms"], [c["label"] for c in result["clusters"]])\n')
+    outputs = {run_script(code, PYTHONHASHSEED=str(seed)) for seed in range(4)}
+    assert outputs == {"['air', 'fryer'] ['chicken recipe', 'basket clean', 'review 2024']\n"}
+
+
+@pytest.mark.parametrize('keywords', [[], iter([])])
+def test_empty_input(keywords):
+    assert cluster_keywords(keywords) == {'common_terms': [], 'clusters': []}
+
+
+def test_single_keyword():
+    result = cluster_keywords(['air fryer'], [5])
+    assert result['clusters'] == [{'label': OTHER_LABEL, 'pillar': 'air fryer', 'supporting': [], 'size': 1,
+                                   'score': 5}]
+
+
+def test_import_does_not_load_sklearn():
+    code = ('import sys\n'
+            'from topic_clusters import cluster_keywords\n'
+            f'cluster_keywords({KEYWORDS!r}, use_sklearn=False)\n'
+            'print(sorted(m for m in sys.modules if m.split(".")[0] == "sklearn"))\n')
+    assert run_script(code) == '[]\n'
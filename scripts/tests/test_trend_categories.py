@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""trend_categories：倒排索引、按第一个词索引的短语、多标签分类；利基市场建议不重复推荐同一个热词"""
+
+import json
+import os
+
+import pytest
+
+from script_loader import load_script
+from trend_categories import Categorizer, load_categories
+
+CONFIG = {
+    'other': '其他',
+    'categories': [
+        {'name': '科技', 'words': ['AI', 'laptops', 'phone', 'artificial intelligence', '手机']},
+        {'name': '厨房', 'words': ['air fryer', 'kitchen', 'air purifier']},
+        {'name': '购物', 'words': ['deals', 'best']},
+    ],
+}
+
+
+@pytest.fixture
+def categorizer():
+    return Categorizer(CONFIG)
+
+
+def test_words_are_indexed_by_singular_term(categorizer):
+    assert dict(categorizer.index) == {'ai': {0}, 'laptop': {0}, 'phone': {0}, '手机': {0}, 'kitchen': {1},
+                                       'deal': {2}, 'best': {2}}
+
+
+def test_phrases_are_keyed_by_first_term(categorizer):
+    assert dict(categorizer.phrases) == {
+        'artificial': [(('artificial', 'intelligence'), 0)],
+        'air': [(('air', 'fryer'), 1), (('air', 'purifier'), 1)],
+    }
+
+
+@pytest.mark.parametrize('text, labels', [
+    ('AI Laptop', ['科技']),
+    ('new phones', ['科技']),
+    ('Air Fryer recipes', ['厨房']),
+    ('Artificial Intelligence news', ['科技']),
+    # 按词匹配："ai" 不匹配 "air"，短语的词要连续
+    ('air quality', []),
+    ('fryer air', []),
+    ('air fresh fryer', []),
+    ('election results', []),
+])
+def test_labels(categorizer, text, labels):
+    assert categorizer.labels(text) == labels
+
+
+def test_multi_label_ordered_by_hits(categorizer):
+    # 厨房命中 air fryer 和 kitchen 两次，科技和购物各一次（同样多时按配置顺序）
+    assert categorizer.labels('best AI air fryer for your kitchen') == ['厨房', '科技', '购物']
+    assert categorizer.labels('best laptop deals') == ['购物', '科技']
+
+
+def test_categorize_puts_item_in_every_label(categorizer):
+    items = [{'keyword': 'AI air fryer'}, {'keyword': 'election results'}, {'keyword': '手机'}]
+    categorized = categorizer.categorize(items)
+    assert list(categorized) == ['科技', '厨房', '购物', '其他']
+    assert categorized['科技'] == [items[0], items[2]]
+    assert categorized['厨房'] == [items[0]]
+    assert categorized['购物'] == []
+    assert categorized['其他'] == [items[1]]
+
+
+def test_load_categories_reloads_changed_file(tmp_path):
+    path = tmp_path / 'categories.json'
+    path.write_text(json.dumps(CONFIG, ensure_ascii=False), encoding='utf-8')
+    first = load_categories(str(path))
+    assert load_categories(str(path)) is first
+
+    config = dict(CONFIG, categories=CONFIG['categories'] + [{'name': '汽车', 'words': ['car']}])
+    path.write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+    os.utime(path, (1, 1))
+    assert load_categories(str(path)).labels('electric car') == ['汽车']
+
+
+class FakeTransport:
+    headers = {}
+    proxies = None
+
+
+def test_niche_ideas_suggest_each_keyword_once(tmp_path):
+    path = tmp_path / 'categories.json'
+    path.write_text(json.dumps(CONFIG, ensure_ascii=False), encoding='utf-8')
+    finder = load_script('trending-finder.py').TrendingKeywordFinder(transport=FakeTransport(),
+                                                                     categories_path=str(path))
+    trends = [
+        {'keyword': 'best ai air fryer 2024', 'source': 'Google Trends (US)', 'traffic': '200K+'},
+        {'keyword': 'Best AI  Air Fryer 2024', 'source': 'Reddit (US)', 'traffic': ''},
+        {'keyword': 'ai laptop deals', 'source': 'Google Trends (US)', 'traffic': '100K+'},
+        {'keyword': 'smart air fryer review', 'source': 'Google Trends (US)', 'traffic': '50K+'},
+    ]
+
+    suggestions = finder.generate_niche_ideas(finder.categorize_trends(trends))
+
+    # 多标签的热词只在第一个分类推荐，其他分类改推荐下一个；不同数据源的同一个词只算一次
+    assert [(s['category'], s['seed_keyword'], s['related_trends']) for s in suggestions] == [
+        ('科技', 'best ai air fryer 2024', ['ai laptop deals']),
+        ('厨房', 'smart air fryer review', ['best ai air fryer 2024']),
+        ('购物', 'ai laptop deals', ['best ai air fryer 2024']),
+    ]
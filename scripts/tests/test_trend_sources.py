@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""热词数据源：注册表按需导入、未知名称报错；失败的来源在 collect_trends 中报告为 error，而不是 ok 0 条"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+import requests
+
+import trend_sources
+from script_loader import SCRIPT_DIR, load_script
+
+RSS = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss xmlns:ht="https://trends.google.com/trending/rss" version="2.0"><channel>
+<item><title>air fryer</title><ht:approx_traffic>200,000+</ht:approx_traffic></item>
+<item><title>super bowl</title><ht:approx_traffic>2M+</ht:approx_traffic></item>
+</channel></rss>'''
+
+
+class FakeResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeTransport:
+    """按 URL 中的关键字返回预设响应；值为异常时抛出"""
+    headers = {}
+    proxies = None
+
+    def __init__(self, routes):
+        self.routes = routes
+
+    def get(self, url, **kwargs):
+        for marker, response in self.routes.items():
+            if marker in url:
+                if isinstance(response, Exception):
+                    raise response
+                return response
+        raise AssertionError(f'unexpected url {url}')
+
+
+@pytest.fixture
+def finder_class():
+    return load_script('trending-finder.py').TrendingKeywordFinder
+
+
+def test_us_sources_do_not_import_cn_module():
+    # 新进程里检查 sys.modules：其他测试可能已经导入过国内数据源模块
+    code = (
+        'import sys\n'
+        'from script_loader import load_script\n'
+        "load_script('trending-finder.py')\n"
+        'import trend_sources\n'
+        "for spec, region in trend_sources.select_sources(['US', 'GB'], ['google_trends', 'reddit', 'youtube']):\n"
+        "    trend_sources.load_source(spec['name'])\n"
+        "print(sorted(m for m in sys.modules if m.startswith('trend_sources')))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', code], cwd=SCRIPT_DIR, capture_output=True, text=True,
+                            check=True).stdout
+    assert output.strip() == "['trend_sources', 'trend_sources_us']"
+
+
+def names(selected):
+    return [(spec['name'], region) for spec, region in selected]
+
+
+def test_select_sources_by_region_and_name():
+    assert names(trend_sources.select_sources(['US'])) == [('google_trends', 'US'), ('reddit', 'US')]
+    assert names(trend_sources.select_sources(['GB', 'CN'])) == [('google_trends', 'GB'), ('baidu', 'CN'),
+                                                                 ('zhihu', 'CN')]
+    # 显式指定名称时可以用 default=False 的来源
+    assert names(trend_sources.select_sources(['US', 'CN'], ['youtube'])) == [('youtube', 'US')]
+
+
+def test_unknown_source_name_is_a_clear_error(finder_class):
+    with pytest.raises(ValueError, match="未知的数据源: 'googel_trends'.*google_trends"):
+        trend_sources.load_source('googel_trends')
+    with pytest.raises(ValueError, match="未知的数据源: 'redit'"):
+        trend_sources.select_sources(['US'], ['google_trends', 'redit'])
+    finder = finder_class(transport=FakeTransport({}))
+    with pytest.raises(ValueError, match='未知的数据源'):
+        finder.fetch_source('nope', 'US')
+
+
+def test_failed_sources_are_reported_as_errors(finder_class):
+    transport = FakeTransport({
+        'trends.google.com': FakeResponse(200, RSS),
+        'reddit.com': FakeResponse(429, 'Too Many Requests'),
+        'zhihu.com': requests.ConnectionError('connection reset'),
+        'baidu.com': FakeResponse(200, '<html><body>nothing here</body></html>'),
+    })
+    finder = finder_class(transport=transport)
+
+    trends, stats = finder.collect_trends(finder.sources_for(['US', 'CN'], ['google_trends', 'reddit',
+                                                                            'baidu', 'zhihu']))
+
+    by_source = {stat['source']: stat for stat in stats}
+    assert by_source['Google Trends (US)']['status'] == 'ok'
+    assert by_source['Google Trends (US)']['count'] == 2
+    assert by_source['Reddit (US)']['status'] == 'error'
+    assert by_source['Reddit (US)']['error'] == 'HTTP 429'
+    assert by_source['知乎热榜 (CN)']['status'] == 'error'
+    # 页面正常但没有热词：真正的空结果
+    assert by_source['百度热搜 (CN)'] == {**by_source['百度热搜 (CN)'], 'status': 'ok', 'count': 0}
+    assert [t['keyword'] for t in trends] == ['air fryer', 'super bowl']
+
+
+def test_get_methods_still_return_empty_list_on_failure(finder_class, capsys):
+    finder = finder_class(transport=FakeTransport({'reddit.com': FakeResponse(503, '')}))
+    assert finder.get_reddit_trending() == []
+    assert finder.get_reddit_trending(subreddit='cooking') == []
+    assert '获取失败: HTTP 503' in capsys.readouterr().out
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""trend_store：相同的轮询不重复保存、上升趋势和动量排序（模拟的轮询数据）"""
+
+import pytest
+
+from trend_store import TrendStore
+
+GOOGLE = 'Google Trends (US)'
+BAIDU = '百度热搜 (CN)'
+T0 = 1_700_000_000.0
+HOUR = 3600
+
+
+def poll(source, *items):
+    """一次轮询的结果：按排名排列的 (热词, 流量)；流量为 None 表示来源不提供流量"""
+    return [{'keyword': keyword, 'source': source, 'traffic': traffic} for keyword, traffic in items]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TrendStore(str(tmp_path / 'trends.db'))
+    yield store
+    store.close()
+
+
+def test_identical_polls_do_not_add_rows(store):
+    trends = poll(GOOGLE, ('air fryer', '200K+'), ('super bowl', '2M+')) + poll(BAIDU, ('空气炸锅', None))
+    assert store.record(trends, T0) == 3
+    assert store.record(trends, T0 + HOUR) == 0
+    assert store.record(trends, T0 + 2 * HOUR) == 0
+    assert store.stats() == {'polls': 6, 'terms': 3, 'observations': 3, 'momentum': 3}
+
+    # 排名或流量变化时才追加
+    changed = poll(GOOGLE, ('super bowl', '2M+'), ('air fryer', '200K+')) + poll(BAIDU, ('空气炸锅', None))
+    assert store.record(changed, T0 + 3 * HOUR) == 2
+    assert store.stats()['observations'] == 5
+
+
+def test_rising_lists_new_terms_first_then_by_growth(store):
+    store.record(poll(GOOGLE, ('air fryer', '1K+'), ('rice cooker', '1K+'), ('toaster', '1K+'),
+                      ('kettle', '5K+')), T0)
+    store.record(poll(GOOGLE, ('rice cooker', '5K+'), ('air fryer', '2K+'), ('toaster', '1K+'),
+                      ('blender', '500+')), T0 + HOUR)
+
+    rising = store.rising(now=T0 + HOUR)
+    # blender 新上榜；rice cooker 增长 4 倍、air fryer 1 倍；toaster 没增长、kettle 已下榜
+    assert [(r['keyword'], r['new'], r['growth']) for r in rising] == [
+        ('blender', True, None), ('rice cooker', False, 4.0), ('air fryer', False, 1.0)]
+    assert rising[1]['traffic'] == '5K+' and rising[1]['rank'] == 1
+    assert [r['keyword'] for r in store.rising(now=T0 + HOUR, limit=2)] == ['blender', 'rice cooker']
+
+
+def test_rising_uses_rank_without_traffic(store):
+    store.record(poll(BAIDU, ('空气炸锅', None), ('电饭煲', None), ('烤箱', None)), T0)
+    store.record(poll(BAIDU, ('烤箱', None), ('空气炸锅', None), ('电饭煲', None)), T0 + HOUR)
+
+    rising = store.rising(source=BAIDU, now=T0 + HOUR)
+    assert [(r['keyword'], r['growth']) for r in rising] == [('烤箱', (3 - 1) / 3)]
+    assert store.rising(source=GOOGLE, now=T0 + HOUR) == []
+
+
+def test_first_poll_terms_are_not_new(store):
+    store.record(poll(GOOGLE, ('air fryer', '1K+')), T0)
+    assert store.rising(now=T0) == []
+
+
+def test_rising_window_uses_value_at_window_start(store):
+    store.record(poll(GOOGLE, ('air fryer', '1K+')), T0)
+    store.record(poll(GOOGLE, ('air fryer', '4K+')), T0 + 10 * HOUR)
+    store.record(poll(GOOGLE, ('air fryer', '8K+')), T0 + 20 * HOUR)
+
+    assert store.rising(now=T0 + 20 * HOUR, window=30 * HOUR)[0]['growth'] == 7.0
+    assert store.rising(now=T0 + 20 * HOUR, window=5 * HOUR)[0]['growth'] == 1.0
+
+
+def test_bursts_are_ordered_by_momentum(store):
+    # 前几次轮询都在 1000 上下小幅波动，最后一次 surge 暴涨、climb 温和上升
+    for i in range(6):
+        base = 1000 + 10 * (i % 2)
+        store.record(poll(GOOGLE, ('steady', str(base)), ('surge', str(base)), ('climb', str(base))), T0 + i * HOUR)
+    store.record(poll(GOOGLE, ('surge', '50000'), ('climb', '3000'), ('steady', '1000'), ('fresh', '90000')),
+                 T0 + 6 * HOUR)
+
+    bursts = store.bursts(since=T0 + 6 * HOUR)
+    # fresh 只有一次观测，没有 z-score
+    assert [b['keyword'] for b in bursts] == ['surge', 'climb', 'steady']
+    assert bursts[0]['zscore'] > bursts[1]['zscore'] > 3 > bursts[2]['zscore']
+    assert [b['keyword'] for b in store.bursts(by='velocity', limit=2)] == ['surge', 'climb']
+    assert store.bursts(source=BAIDU) == []
+
+    with pytest.raises(ValueError):
+        store.bursts(by='value')
+
+
+def test_momentum_for_trends(store):
+    store.record(poll(GOOGLE, ('air fryer', '1000')), T0)
+    store.record(poll(GOOGLE, ('air fryer', '3000')), T0 + 2 * HOUR)
+
+    stats, missing = store.momentum(poll(GOOGLE, ('air fryer', None), ('unknown', None)))
+    assert missing is None
+    assert (stats.count, stats.value, stats.velocity) == (2, 3000, 1000)
+
+
+def test_repeated_polls_do_not_deflate_momentum(store):
+    # 数据源 TTL 内返回缓存结果：同样的热词和流量被记录多次
+    for i, traffic in enumerate(['1000', '1010', '1000', '1010']):
+        store.record(poll(GOOGLE, ('air fryer', traffic)), T0 + i * HOUR)
+    before = store.momentum(poll(GOOGLE, ('air fryer', None)))[0].as_dict()
+    for i in range(4, 10):
+        store.record(poll(GOOGLE, ('air fryer', '1010')), T0 + i * HOUR)
+    assert store.momentum(poll(GOOGLE, ('air fryer', None)))[0].as_dict() == before
+
+    store.record(poll(GOOGLE, ('air fryer', '50000')), T0 + 10 * HOUR)
+    stats = store.momentum(poll(GOOGLE, ('air fryer', None)))[0]
+    assert stats.count == 5
+    assert stats.velocity == pytest.approx((50000 - 1010) / 7)
+    assert [b['keyword'] for b in store.bursts(since=T0 + 10 * HOUR)] == ['air fryer']
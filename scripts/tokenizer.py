@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+分词（中英文混合）
+功能：
+1. 英文等按空白切分（与原来的 str.split() 结果一致），连续的中文交给中文分词器
+2. 中文分词器可替换：安装了 jieba 时使用 jieba，否则用字的二元组（"空气炸锅" -> 空气/气炸/炸锅）
+3. jieba 在第一次遇到中文时才导入并加载词典；词典由 jieba 缓存成 marshal 文件，之后启动只需读缓存
+4. 每段中文的分词结果缓存（LRU），轮询时重复出现的标题不会重复分词；词数也从缓存的分词结果得到
+
+评分（词数）、热词分类和高频词统计都使用这里的 tokenize / word_count
+"""
+
+import logging
+import math
+import os
+import re
+import threading
+from functools import lru_cache
+
+# 中文字符（含扩展A区和兼容汉字）
+_CJK = '㐀-䶿一-鿿豈-﫿'
+_CJK_RUN = re.compile(f'[{_CJK}]+')
+_PART = re.compile(f'[{_CJK}]+|[^\\s{_CJK}]+')
+_WORD = re.compile(r'\w')
+# 词两端要去掉的标点（中英文）
+_PUNCT = '\'"“”‘’.,!?;:()[]{}<>《》【】（），。！？；：、…·-_/|#@*~'
+
+# 以 s 结尾但不是复数的常见词（去复数时保持原样）
+SINGULAR_EXCEPTIONS = frozenset({
+    'news', 'series', 'species', 'means', 'always', 'perhaps', 'whereas', 'towards',
+    'physics', 'mathematics', 'economics', 'politics', 'ethics', 'athletics', 'gymnastics', 'aerobics',
+    'diabetes', 'herpes', 'measles', 'mumps', 'rabies', 'scabies',
+    'canvas', 'chaos', 'atlas', 'alias', 'bias', 'lens', 'pancreas', 'christmas', 'windows', 'macos',
+    'texas', 'kansas', 'arkansas', 'dallas', 'vegas', 'mars', 'paris', 'athens', 'wales',
+})
+# 这些结尾的词不是复数形式：glass, virus, bonus, analysis, tennis
+_SINGULAR_ENDINGS = ('ss', 'us', 'is')
+# 这些结尾的复数去掉 es：glasses, dishes, watches, boxes
+_ES_ENDINGS = ('sses', 'shes', 'ches', 'xes')
+# 以 che 结尾的单数词，复数只去掉 s：caches, niches, headaches
+_CHE_WORDS = frozenset({
+    'ache', 'cache', 'niche', 'quiche', 'cliche', 'headache', 'toothache', 'backache', 'earache', 'heartache',
+    'stomachache', 'moustache', 'mustache', 'avalanche', 'psyche',
+})
+
+# jieba 词典缓存目录（默认系统临时目录）
+JIEBA_CACHE_DIR = os.environ.get('JIEBA_CACHE_DIR')
+
+
+class BigramSegmenter:
+    """没有 jieba 时的中文切分：重叠的二元组，高频词统计时真正的词也会出现"""
+
+    name = 'bigram'
+
+    def segment(self, run):
+        if len(run) <= 2:
+            return [run]
+        return [run[i:i + 2] for i in range(len(run) - 1)]
+
+    def count(self, run):
+        """估算词数（二元组互相重叠，数量不等于词数；中文词平均约两个字）"""
+        return math.ceil(len(run) / 2)
+
+
+class JiebaSegmenter:
+    """jieba 分词（创建时加载词典）"""
+
+    name = 'jieba'
+
+    def __init__(self, cache_dir=JIEBA_CACHE_DIR):
+        import jieba
+
+        jieba.setLogLevel(logging.WARNING)
+        if cache_dir:
+            jieba.dt.tmp_dir = cache_dir
+        jieba.initialize()
+        self._cut = jieba.dt.lcut
+
+    def segment(self, run):
+        return self._cut(run)
+
+
+_segmenter = None
+_segmenter_lock = threading.Lock()
+
+
+def get_segmenter():
+    """当前的中文分词器（第一次调用时创建：有 jieba 用 jieba，否则用二元组）"""
+    global _segmenter
+    if _segmenter is None:
+        with _segmenter_lock:
+            if _segmenter is None:
+                try:
+                    _segmenter = JiebaSegmenter()
+                except ImportError:
+                    _segmenter = BigramSegmenter()
+    return _segmenter
+
+
+def set_segmenter(segmenter):
+    """
+    替换中文分词器，None 表示恢复默认
+    需要 segment(run) 方法；词数不等于切分结果的数量时再提供 count(run)
+    """
+    global _segmenter
+    with _segmenter_lock:
+        _segmenter = segmenter
+    _segment_run.cache_clear()
+
+
+@lru_cache(maxsize=65536)
+def _segment_run(run):
+    return tuple(get_segmenter().segment(run))
+
+
+def _count_run(run):
+    """一段中文的词数：分词器有 count 就用它，否则数缓存的分词结果（同一段文字不会切分两次）"""
+    count = getattr(get_segmenter(), 'count', None)
+    return count(run) if count is not None else len(_segment_run(run))
+
+
+def tokenize(text):
+    """小写后分词：中文交给分词器，其余按空白切分（标点保留在词里，和 str.split() 相同）"""
+    text = text.lower()
+    if not _CJK_RUN.search(text):
+        return text.split()
+
+    tokens = []
+    for part in _PART.findall(text):
+        if _CJK_RUN.match(part):
+            tokens.extend(_segment_run(part))
+        elif _WORD.search(part):
+            tokens.append(part)
+    return tokens
+
+
+def words(text):
+    """tokenize 后去掉两端标点和纯标点的词，用于分类和高频词统计"""
+    return [w for w in (t.strip(_PUNCT) for t in tokenize(text)) if w and _WORD.search(w)]
+
+
+def singular(token):
+    """
+    去掉英文复数：recipes -> recipe, fryers -> fryer, glasses -> glass, boxes -> box
+    短词、ss/us/is 结尾的词和 SINGULAR_EXCEPTIONS 中的词（news, series, ...）不变
+    """
+    if (len(token) <= 3 or not token.endswith('s') or token.endswith(_SINGULAR_ENDINGS)
+            or token in SINGULAR_EXCEPTIONS):
+        return token
+    if token.endswith(_ES_ENDINGS) and token[:-1] not in _CHE_WORDS:
+        return token[:-2]
+    return token[:-1]
+
+
+def word_count(text):
+    """词数（没有中文时等于 len(text.split())，不会加载分词器）"""
+    if not _CJK_RUN.search(text):
+        return len(text.split())
+    return sum(_count_run(part) if _CJK_RUN.match(part) else 1
+               for part in _PART.findall(text) if _CJK_RUN.match(part) or _WORD.search(part))
+
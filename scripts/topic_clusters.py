@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+关键词主题聚类（内容规划用）
+功能：
+1. 把全部关键词分成若干主题集群，每个集群一个支柱词（pillar）和若干支撑词（supporting）
+2. 安装了 scikit-learn 时：哈希 n-gram 向量（稀疏矩阵，没有词表，内存固定）+ TF-IDF + MiniBatchKMeans
+   scikit-learn 在第一次聚类时才导入（导入约需 1 秒，不拖慢不做聚类的命令）
+3. 没有 scikit-learn 时：按每个关键词里最有代表性的词分组（词频统计，线性时间）
+4. 所有关键词都包含的共同词（通常就是种子词）单独返回，作为利基市场名称
+
+返回格式：
+  {'common_terms': [...],
+   'clusters': [{'label', 'pillar', 'supporting': [...], 'size', 'score'}, ...]}  按总分从高到低
+"""
+
+import math
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+import tokenizer
+
+STOPWORDS = {'the', 'a', 'an', 'of', 'to', 'in', 'for', 'and', 'or', 'on', 'with', 'is', 'are', 'at', 'by',
+             'my', 'your', 'me', 'i', 'it', 'do', 'can', 'near', 'from', 'what', 'how', 'why', 'when', 'where'}
+
+# 超过这个比例的关键词都包含的词算共同词，不参与分组
+MAX_DF = 0.5
+
+# 哈希向量的维度：质心是稠密的，100 个集群 x 2^15 维约 26MB
+N_FEATURES = 2 ** 15
+MAX_CLUSTERS = 100
+
+OTHER_LABEL = '其他'
+
+
+def tokenize(keyword):
+    """分词（中文用 tokenizer 的中文分词器），去掉停用词"""
+    return [t for t in tokenizer.words(keyword) if t not in STOPWORDS]
+
+
+def _most_common(counter, n=None):
+    """按次数从高到低，同样次数按词排序（Counter.most_common 同次数时按插入顺序，而集合的顺序每次运行不同）"""
+    return sorted(counter.items(), key=lambda item: (-item[1], item[0]))[:n]
+
+
+def default_cluster_count(n):
+    """集群数：约 sqrt(n/2)，最多 MAX_CLUSTERS 个"""
+    return max(1, min(MAX_CLUSTERS, round(math.sqrt(n / 2))))
+
+
+@lru_cache(maxsize=None)
+def load_sklearn():
+    """导入 k-means 聚类用到的 scikit-learn 类；没有安装时返回 None"""
+    try:
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+    except ImportError:
+        return None
+    return MiniBatchKMeans, HashingVectorizer, TfidfTransformer
+
+
+def _common_terms(token_lists, max_df):
+    df = Counter(t for tokens in token_lists for t in set(tokens))
+    if len(token_lists) < 5:
+        return df, []
+    limit = max_df * len(token_lists)
+    return df, [t for t, c in _most_common(df) if c > limit]
+
+
+def _kmeans_labels(keywords, n_clusters, batch_size, random_state):
+    """哈希 n-gram + TF-IDF + MiniBatchKMeans，返回每个关键词的集群编号"""
+    MiniBatchKMeans, HashingVectorizer, TfidfTransformer = load_sklearn()
+    vectorizer = HashingVectorizer(n_features=N_FEATURES, ngram_range=(1, 2), alternate_sign=False,
+                                   norm=None, tokenizer=tokenize, token_pattern=None, lowercase=False)
+    matrix = TfidfTransformer(sublinear_tf=True).fit_transform(vectorizer.transform(keywords))
+    model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, n_init=3,
+                            random_state=random_state)
+    return model.fit_predict(matrix).tolist()
+
+
+def _head_term_labels(token_lists, df, common, n_clusters, min_size):
+    """
+    没有 scikit-learn 时的分组：每个关键词归到它包含的（非共同词中）最常见的词
+    只保留最大的 n_clusters 个分组，其余关键词改用下一个候选词，都没有时归到"其他"
+    """
+    candidates = [sorted((t for t in set(tokens) if t not in common), key=lambda t: (-df[t], t))
+                  for tokens in token_lists]
+
+    sizes = Counter(c[0] for c in candidates if c)
+    kept = {t for t, size in sizes.most_common(n_clusters) if size >= min_size}
+    return [next((t for t in c if t in kept), None) for c in candidates]
+
+
+def cluster_keywords(keywords, scores=None, n_clusters=None, min_size=2, max_df=MAX_DF, batch_size=4096,
+                     random_state=0, use_sklearn=True):
+    """
+    关键词主题聚类
+    keywords: 关键词列表；scores: 对应的分数（用于选支柱词和集群排序，可选）
+    n_clusters: 集群数，默认按关键词数量估算
+    min_size: 少于这个数量的集群合并到"其他"
+    """
+    keywords = list(keywords)
+    scores = list(scores) if scores is not None else [0] * len(keywords)
+    if not keywords:
+        return {'common_terms': [], 'clusters': []}
+
+    token_lists = [tokenize(kw) for kw in keywords]
+    df, common = _common_terms(token_lists, max_df)
+    common_set = set(common)
+    n_clusters = min(n_clusters or default_cluster_count(len(keywords)), len(keywords))
+
+    if use_sklearn and n_clusters > 1 and load_sklearn() is not None:
+        labels = _kmeans_labels(keywords, n_clusters, batch_size, random_state)
+    else:
+        labels = _head_term_labels(token_lists, df, common_set, n_clusters, min_size)
+
+    members = defaultdict(list)
+    for index, label in enumerate(labels):
+        members[label].append(index)
+
+    clusters = []
+    other = []
+    for label, indexes in members.items():
+        if label is None or len(indexes) < min_size:
+            other.extend(indexes)
+            continue
+        clusters.append(_describe(indexes, keywords, scores, token_lists, common_set))
+    if other:
+        cluster = _describe(other, keywords, scores, token_lists, common_set)
+        cluster['label'] = OTHER_LABEL
+        clusters.append(cluster)
+
+    clusters.sort(key=lambda c: (c['label'] == OTHER_LABEL, -c['score'], -c['size']))
+    return {'common_terms': common, 'clusters': clusters}
+
+
+def _describe(indexes, keywords, scores, token_lists, common):
+    """集群名称（成员中最常见的两个非共同词）、支柱词（分数最高，同分取词数少的）和支撑词"""
+    terms = Counter(t for i in indexes for t in set(token_lists[i]) if t not in common)
+    label = ' '.join(t for t, _ in _most_common(terms, 2))
+
+    ordered = sorted(indexes, key=lambda i: (-scores[i], len(token_lists[i]), keywords[i]))
+    return {
+        'label': label or keywords[ordered[0]],
+        'pillar': keywords[ordered[0]],
+        'supporting': [keywords[i] for i in ordered[1:]],
+        'size': len(indexes),
+        'score': sum(scores[i] for i in indexes)
+    }
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+热词分类（利基市场）
+功能：
+1. 分类词表统一放在 trend_categories.json，新增分类只改配置文件
+2. 词表预编译成倒排索引：词 -> 分类；多词短语按第一个词索引
+3. 每个热词只遍历一遍自己的词（tokenizer 分词），分类再多也不增加每个热词的耗时
+4. 按词匹配（"ai" 不会匹配 "air"），单复数视为同一个词
+5. 多标签：一个热词可以属于多个分类，按命中次数排序
+"""
+
+import json
+import os
+import threading
+from collections import Counter, defaultdict
+
+from tokenizer import singular, words
+
+DEFAULT_CATEGORIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'trend_categories.json')
+
+
+def _terms(text):
+    return [singular(w) for w in words(text)]
+
+
+class Categorizer:
+    """由 trend_categories.json 编译出的分类器"""
+
+    def __init__(self, config):
+        self.names = [category['name'] for category in config['categories']]
+        self.other = config.get('other', '其他')
+        # 单个词 -> 分类下标集合；多词短语：第一个词 -> [(短语的词, 分类下标), ...]
+        self.index = defaultdict(set)
+        self.phrases = defaultdict(list)
+
+        for position, category in enumerate(config['categories']):
+            for word in category['words']:
+                terms = _terms(word)
+                if len(terms) == 1:
+                    self.index[terms[0]].add(position)
+                elif terms:
+                    self.phrases[terms[0]].append((tuple(terms), position))
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_CATEGORIES_PATH):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def labels(self, text):
+        """热词所属的分类（命中次数多的在前，同样多时按配置顺序）；都不匹配时返回空列表"""
+        terms = _terms(text)
+        hits = Counter()
+        for i, term in enumerate(terms):
+            for position in self.index.get(term, ()):
+                hits[position] += 1
+            for phrase, position in self.phrases.get(term, ()):
+                if tuple(terms[i:i + len(phrase)]) == phrase:
+                    hits[position] += 1
+        return [self.names[position] for position in sorted(hits, key=lambda p: (-hits[p], p))]
+
+    def categorize(self, items, key=lambda item: item['keyword']):
+        """
+        分组：{分类: [item, ...]}，包含全部分类和"其他"（按配置顺序）
+        一个 item 可以出现在多个分类里
+        """
+        categorized = {name: [] for name in self.names}
+        categorized[self.other] = []
+        for item in items:
+            for label in self.labels(key(item)) or [self.other]:
+                categorized[label].append(item)
+        return categorized
+
+
+_categorizers = {}
+_lock = threading.Lock()
+
+
+def load_categories(path=None):
+    """按路径共享分类器，文件修改后自动重新编译"""
+    path = os.path.abspath(path or DEFAULT_CATEGORIES_PATH)
+    mtime = os.path.getmtime(path)
+    with _lock:
+        cached = _categorizers.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, Categorizer.from_file(path))
+            _categorizers[path] = cached
+        return cached[1]
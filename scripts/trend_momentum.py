@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+热词动量统计（增量计算）
+功能：
+1. 每个热词保存一份滚动统计：最新值、速度（每小时变化）、加速度、EWMA 均值/方差
+2. 每次轮询只用上一份统计和新的观测值更新，O(1)，不需要回看历史
+3. EWMA z-score：新值偏离近期均值多少个标准差，用来发现突然爆发的热词
+
+观测值：有流量数字时用流量，没有时（百度/知乎等）用排名折算 100 / 排名
+"""
+
+import math
+
+# EWMA 平滑系数：越大越看重最近几次轮询
+DEFAULT_ALPHA = 0.3
+
+# 标准差下限（均值的比例），避免前几次方差为 0 时 z-score 失真
+MIN_STD_RATIO = 0.05
+
+
+def signal_value(rank, value=None):
+    """观测值：流量数值，没有流量时按排名折算"""
+    if value is not None:
+        return float(value)
+    return 100.0 / rank
+
+
+class RollingStats:
+    """单个热词的滚动统计"""
+
+    __slots__ = ('at', 'value', 'velocity', 'acceleration', 'mean', 'var', 'zscore', 'count')
+
+    FIELDS = __slots__
+
+    def __init__(self, at=0.0, value=0.0, velocity=0.0, acceleration=0.0, mean=0.0, var=0.0, zscore=0.0,
+                 count=0):
+        self.at = at
+        self.value = value
+        self.velocity = velocity
+        self.acceleration = acceleration
+        self.mean = mean
+        self.var = var
+        self.zscore = zscore
+        self.count = count
+
+    def update(self, value, at, alpha=DEFAULT_ALPHA):
+        """加入一次新的观测（at 为时间戳，秒），返回自身"""
+        if self.count == 0:
+            self.mean = value
+        elif at > self.at:
+            hours = (at - self.at) / 3600
+            velocity = (value - self.value) / hours
+            self.acceleration = (velocity - self.velocity) / hours if self.count > 1 else 0.0
+            self.velocity = velocity
+
+            # z-score 用更新前的均值和方差，再把新值并入 EWMA
+            std = max(math.sqrt(self.var), MIN_STD_RATIO * abs(self.mean), 1e-9)
+            diff = value - self.mean
+            self.zscore = diff / std
+            self.mean += alpha * diff
+            self.var = (1 - alpha) * (self.var + alpha * diff * diff)
+        else:
+            return self  # 同一时刻（或更早）的重复观测
+
+        self.value = value
+        self.at = at
+        self.count += 1
+        return self
+
+    def as_row(self):
+        return tuple(getattr(self, field) for field in self.FIELDS)
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row) if row else cls()
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
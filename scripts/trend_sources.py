@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+热词数据源注册表
+功能：
+1. 每个数据源声明自己支持的市场（regions）、限速（每秒请求数）、结果有效期（TTL）和超时
+2. 数据源模块按需导入：只跑 US 市场时不会导入国内数据源的模块
+3. 新增数据源只需 register_source(...)，不用改 TrendingKeywordFinder
+
+数据源函数签名：fetch(transport, region, timeout) -> [{'keyword', 'source', 'traffic', 'category', 'timestamp'}, ...]
+请求失败（网络错误、HTTP 错误状态、返回内容无法解析）时直接抛出异常，由 collect_trends 记为该来源 error；
+只有来源确实没有数据时才返回空列表
+"""
+
+import importlib
+
+# 名称 -> 数据源声明（module/function 在第一次使用时才导入）
+TREND_SOURCES = {}
+
+
+def register_source(name, module, function, regions, label=None, rate_limit=1.0, ttl=1800, timeout=10,
+                    default=True):
+    """
+    注册数据源
+    regions: 支持的市场代码列表
+    rate_limit: 每秒最多请求数
+    ttl: 结果有效期（秒），有效期内重复请求直接使用上次结果
+    timeout: 单次请求超时，同时也是并发收集时这个来源的截止时间
+    default: 为 False 时只有显式指定名称才会使用（例如需要API密钥的来源）
+    """
+    TREND_SOURCES[name] = {
+        'name': name,
+        'module': module,
+        'function': function,
+        'regions': list(regions),
+        'label': label or name,
+        'rate_limit': rate_limit,
+        'ttl': ttl,
+        'timeout': timeout,
+        'default': default,
+    }
+
+
+def raise_for_status(response):
+    """HTTP 错误状态码（被拦截、限流、接口下线）时抛出异常，而不是当作没有数据"""
+    if response.status_code >= 400:
+        raise RuntimeError(f'HTTP {response.status_code}')
+
+
+def get_source(name):
+    """取数据源声明；名称未注册时抛出 ValueError（列出可用的名称）"""
+    spec = TREND_SOURCES.get(name)
+    if spec is None:
+        raise ValueError(f"未知的数据源: {name!r}（可用: {', '.join(sorted(TREND_SOURCES))}）")
+    return spec
+
+
+def load_source(name):
+    """导入并返回数据源函数"""
+    spec = get_source(name)
+    return getattr(importlib.import_module(spec['module']), spec['function'])
+
+
+def available_regions():
+    """所有数据源支持的市场"""
+    return sorted({region for spec in TREND_SOURCES.values() for region in spec['regions']})
+
+
+def select_sources(regions, names=None):
+    """
+    按市场选择数据源，返回 [(数据源声明, 市场), ...]
+    names: 只使用这些数据源（可包含 default=False 的来源）；有未注册的名称时抛出 ValueError
+    """
+    for name in names or ():
+        get_source(name)
+
+    selected = []
+    for region in regions:
+        for spec in TREND_SOURCES.values():
+            if region not in spec['regions']:
+                continue
+            if names is not None and spec['name'] not in names:
+                continue
+            if names is None and not spec['default']:
+                continue
+            selected.append((spec, region))
+    return selected
+
+
+# 内置数据源
+register_source('google_trends', 'trend_sources_us', 'google_trends_daily', ['US', 'GB', 'CA', 'AU', 'IN'],
+                label='Google Trends', rate_limit=1.0, ttl=3600, timeout=15)
+register_source('reddit', 'trend_sources_us', 'reddit_hot', ['US'],
+                label='Reddit', rate_limit=0.5, ttl=900, timeout=15)
+register_source('youtube', 'trend_sources_us', 'youtube_trending', ['US'],
+                label='YouTube', rate_limit=1.0, ttl=3600, timeout=10, default=False)
+register_source('baidu', 'trend_sources_cn', 'baidu_hot', ['CN'],
+                label='百度热搜', rate_limit=1.0, ttl=600, timeout=10)
+register_source('zhihu', 'trend_sources_cn', 'zhihu_hot', ['CN'],
+                label='知乎热榜', rate_limit=1.0, ttl=600, timeout=10)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+国内热词数据源：百度热搜、知乎热榜
+（由 trend_sources 注册表按需导入；国内站点直连，不走代理）
+"""
+
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+from trend_sources import raise_for_status
+
+
+def baidu_hot(transport, region='CN', timeout=10):
+    """获取百度热搜榜"""
+    print(f"\n[百度热搜] 正在获取百度热搜榜...")
+
+    url = "https://top.baidu.com/board?tab=realtime"
+    response = transport.get(url, timeout=timeout, use_proxy=False)
+    raise_for_status(response)
+    soup = BeautifulSoup(response.text, 'html.parser')
+
+    trends = []
+    # 百度热搜的HTML结构可能变化，这里提供一个基础版本
+    items = soup.find_all('div', class_='c-single-text-ellipsis')
+
+    for item in items[:20]:
+        keyword = item.text.strip()
+        if keyword and len(keyword) > 2:
+            trends.append({
+                'keyword': keyword,
+                'source': '百度热搜',
+                'traffic': 'N/A',
+                'category': '热搜',
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M')
+            })
+
+    print(f"   ✅ 找到 {len(trends)} 个百度热搜词")
+    return trends
+
+
+def zhihu_hot(transport, region='CN', timeout=10):
+    """获取知乎热榜"""
+    print(f"\n[知乎热榜] 正在获取知乎热榜...")
+
+    # 知乎热榜API（可能需要更新）
+    url = "https://www.zhihu.com/api/v3/feed/topstory/hot-lists/total"
+    response = transport.get(url, timeout=timeout, use_proxy=False)
+    raise_for_status(response)
+    data = response.json()
+
+    trends = []
+    for item in data.get('data', [])[:20]:
+        target = item.get('target', {})
+        title = target.get('title', '')
+
+        if title:
+            trends.append({
+                'keyword': title,
+                'source': '知乎热榜',
+                'traffic': f"{item.get('detail_text', 'N/A')}",
+                'category': '热搜',
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M')
+            })
+
+    print(f"   ✅ 找到 {len(trends)} 个知乎热榜词")
+    return trends
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+海外热词数据源：Google Trends、Reddit、YouTube
+（由 trend_sources 注册表按需导入）
+"""
+
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+from trend_sources import raise_for_status
+
+
+def google_trends_daily(transport, region='US', timeout=15):
+    """
+    获取Google Trends每日热搜
+    region: 国家代码 (US=美国, GB=英国等)
+    """
+    print(f"\n[Google Trends] 正在获取Google每日热搜 ({region})...")
+
+    # Google Trends RSS Feed（免费！）
+    url = f"https://trends.google.com/trends/trendingsearches/daily/rss?geo={region}"
+    response = transport.get(url, timeout=timeout)
+    raise_for_status(response)
+
+    soup = BeautifulSoup(response.content, 'xml')
+    items = soup.find_all('item')
+
+    trends = []
+    for item in items[:20]:  # 取前20个
+        title = item.find('title')
+        traffic = item.find('ht:approx_traffic')
+
+        if title:
+            trend = {
+                'keyword': title.text.strip(),
+                'source': f'Google Trends ({region})',
+                'traffic': traffic.text if traffic else 'N/A',
+                'category': '热搜',
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M')
+            }
+            trends.append(trend)
+
+    print(f"   ✅ 找到 {len(trends)} 个Google热搜词")
+    return trends
+
+
+def reddit_hot(transport, region='US', timeout=15, subreddit='all'):
+    """获取Reddit热门话题"""
+    print(f"\n[Reddit] 正在获取Reddit热门话题...")
+
+    url = f"https://www.reddit.com/r/{subreddit}/hot.json?limit=25"
+    response = transport.get(url, headers={'User-Agent': 'TrendFinder/1.0'}, timeout=timeout)
+    raise_for_status(response)
+    data = response.json()
+
+    trends = []
+    for post in data['data']['children'][:20]:
+        post_data = post['data']
+        title = post_data['title']
+        score = post_data['score']
+
+        trends.append({
+            'keyword': title,
+            'source': f'Reddit r/{subreddit}',
+            'traffic': f'{score} upvotes',
+            'category': post_data.get('subreddit', 'general'),
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M')
+        })
+
+    print(f"   ✅ 找到 {len(trends)} 个Reddit热门话题")
+    return trends
+
+
+def youtube_trending(transport, region='US', timeout=10):
+    """获取YouTube热门视频标题（可提取关键词）"""
+    print(f"\n[YouTube] 正在获取YouTube热门话题...")
+
+    # YouTube RSS Feed
+    url = "https://www.youtube.com/feed/trending"
+    raise_for_status(transport.get(url, timeout=timeout, use_proxy=False))
+
+    # YouTube的数据在JavaScript中，需要解析
+    # 这里提供一个简化版本
+    print(f"   💡 提示: YouTube需要API密钥才能获取更准确数据")
+
+    return []
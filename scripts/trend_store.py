@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+热词时间序列存储（SQLite）
+功能：
+1. 每次轮询按数据源追加快照：排名、流量（原文 + 数值）
+2. 与上一次相同的记录不重复保存，只更新"最后出现时间"，长时间运行也很紧凑
+3. 根据存储的历史计算上升趋势（流量增长、排名上升、新上榜），不需要重新抓取
+4. 每个热词的动量统计（速度、加速度、EWMA z-score）在排名或流量变化时增量更新，见 trend_momentum
+   （重复的结果，例如数据源在 TTL 内返回的缓存结果，不计入统计，否则会拉低 z-score）
+"""
+
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from keyword_scoring import traffic_value
+from trend_momentum import DEFAULT_ALPHA, RollingStats, signal_value
+
+
+class TrendStore:
+    """线程安全的热词时间序列库"""
+
+    def __init__(self, path='trend_history.db', alpha=DEFAULT_ALPHA):
+        self.path = path
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS polls (
+                source TEXT NOT NULL,
+                polled_at REAL NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (source, polled_at)
+            );
+
+            CREATE TABLE IF NOT EXISTS terms (
+                id INTEGER PRIMARY KEY,
+                keyword TEXT NOT NULL,
+                source TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                UNIQUE (source, keyword)
+            );
+            CREATE INDEX IF NOT EXISTS idx_terms_seen ON terms (source, last_seen);
+
+            -- 只在排名或流量变化时追加一行
+            CREATE TABLE IF NOT EXISTS observations (
+                term_id INTEGER NOT NULL,
+                observed_at REAL NOT NULL,
+                rank INTEGER NOT NULL,
+                traffic TEXT,
+                value REAL,
+                PRIMARY KEY (term_id, observed_at)
+            ) WITHOUT ROWID;
+
+            -- 每个热词一行滚动统计，每次轮询原地更新
+            CREATE TABLE IF NOT EXISTS momentum (
+                term_id INTEGER PRIMARY KEY,
+                at REAL NOT NULL,
+                value REAL NOT NULL,
+                velocity REAL NOT NULL,
+                acceleration REAL NOT NULL,
+                mean REAL NOT NULL,
+                var REAL NOT NULL,
+                zscore REAL NOT NULL,
+                count INTEGER NOT NULL
+            );
+        ''')
+        self._conn.commit()
+
+    def record(self, trends, polled_at=None):
+        """
+        保存一次轮询的结果（trends 为各数据源返回的热词列表，按 trend['source'] 分组）
+        返回新增的观测行数（未变化的不计）
+        """
+        polled_at = polled_at or time.time()
+        by_source = defaultdict(list)
+        for trend in trends:
+            by_source[trend['source']].append(trend)
+
+        added = 0
+        with self._lock:
+            for source, items in by_source.items():
+                self._conn.execute('INSERT OR REPLACE INTO polls VALUES (?, ?, ?)', (source, polled_at, len(items)))
+                for rank, trend in enumerate(items, 1):
+                    keyword = trend['keyword']
+                    traffic = trend.get('traffic')
+                    self._conn.execute(
+                        'INSERT INTO terms (keyword, source, first_seen, last_seen) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT (source, keyword) DO UPDATE SET last_seen=excluded.last_seen',
+                        (keyword, source, polled_at, polled_at)
+                    )
+                    term_id = self._conn.execute('SELECT id FROM terms WHERE source=? AND keyword=?',
+                                                 (source, keyword)).fetchone()[0]
+                    last = self._conn.execute(
+                        'SELECT rank, traffic FROM observations WHERE term_id=? ORDER BY observed_at DESC LIMIT 1',
+                        (term_id,)
+                    ).fetchone()
+                    if last == (rank, traffic):
+                        continue  # 没有变化，不重复保存，也不更新动量
+                    value = traffic_value(traffic)
+                    self._conn.execute('INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?, ?)',
+                                       (term_id, polled_at, rank, traffic, value))
+                    self._update_momentum(term_id, signal_value(rank, value), polled_at)
+                    added += 1
+            self._conn.commit()
+        return added
+
+    def _update_momentum(self, term_id, value, at):
+        """读出上一份统计，加入新观测后写回（调用方持有锁）"""
+        row = self._conn.execute(f'SELECT {", ".join(RollingStats.FIELDS)} FROM momentum WHERE term_id=?',
+                                 (term_id,)).fetchone()
+        stats = RollingStats.from_row(row).update(value, at, self.alpha)
+        self._conn.execute('INSERT OR REPLACE INTO momentum VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                           (term_id,) + stats.as_row())
+
+    def momentum(self, trends):
+        """
+        取一批热词的动量统计，返回与 trends 对应的列表：RollingStats 或 None（从未记录过）
+        """
+        keys = {(trend['source'], trend['keyword']) for trend in trends}
+        found = {}
+        with self._lock:
+            for source, keyword in keys:
+                row = self._conn.execute(
+                    f'SELECT {", ".join("m." + f for f in RollingStats.FIELDS)} FROM momentum m '
+                    'JOIN terms t ON t.id = m.term_id WHERE t.source=? AND t.keyword=?',
+                    (source, keyword)
+                ).fetchone()
+                if row:
+                    found[(source, keyword)] = RollingStats.from_row(row)
+        return [found.get((trend['source'], trend['keyword'])) for trend in trends]
+
+    def bursts(self, source=None, limit=20, by='zscore', since=None):
+        """
+        动量最高的热词（by: zscore / velocity / acceleration），只看 since 之后仍在更新的
+        返回 [{'keyword', 'source', 'value', 'velocity', 'acceleration', 'zscore', ...}, ...]
+        """
+        if by not in ('zscore', 'velocity', 'acceleration'):
+            raise ValueError(f'不支持的排序字段: {by}')
+        query = (f'SELECT t.keyword, t.source, {", ".join("m." + f for f in RollingStats.FIELDS)} '
+                 'FROM momentum m JOIN terms t ON t.id = m.term_id WHERE m.count > 1 AND m.at >= ?')
+        params = [since or 0]
+        if source:
+            query += ' AND t.source = ?'
+            params.append(source)
+        query += f' ORDER BY m.{by} DESC LIMIT ?'
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [dict(keyword=row[0], source=row[1], **RollingStats.from_row(row[2:]).as_dict()) for row in rows]
+
+    def rising(self, source=None, window=24 * 3600, limit=20, now=None):
+        """
+        上升趋势：在各数据源最近一次轮询中仍然上榜、且在 window 秒内流量增长或排名上升的词
+        source: 只看这个数据源（trend['source'] 的值）
+        返回 [{'keyword', 'source', 'traffic', 'rank', 'growth', 'new'}, ...]，按增长幅度从高到低
+        """
+        now = now or time.time()
+        start = now - window
+
+        query = '''
+            SELECT t.id, t.keyword, t.source, t.first_seen, p.first_poll FROM terms t
+            JOIN (SELECT source, MIN(polled_at) AS first_poll, MAX(polled_at) AS polled_at
+                  FROM polls GROUP BY source) p
+              ON t.source = p.source AND t.last_seen = p.polled_at
+        '''
+        params = ()
+        if source:
+            query += ' WHERE t.source = ?'
+            params = (source,)
+
+        rising = []
+        with self._lock:
+            for term_id, keyword, term_source, first_seen, first_poll in self._conn.execute(query, params).fetchall():
+                latest = self._conn.execute(
+                    'SELECT rank, traffic, value FROM observations WHERE term_id=? ORDER BY observed_at DESC LIMIT 1',
+                    (term_id,)
+                ).fetchone()
+                # 基准：窗口开始时的值（存储时间不足一个窗口时用最早的记录）
+                before = self._conn.execute(
+                    'SELECT rank, value FROM observations WHERE term_id=? AND observed_at<=? '
+                    'ORDER BY observed_at DESC LIMIT 1',
+                    (term_id, start)
+                ).fetchone() or self._conn.execute(
+                    'SELECT rank, value FROM observations WHERE term_id=? ORDER BY observed_at LIMIT 1',
+                    (term_id,)
+                ).fetchone()
+
+                rank, traffic, value = latest
+                # 数据源第一次轮询时上榜的词不算"新上榜"
+                is_new = first_seen > start and first_seen > first_poll
+                if is_new:
+                    growth = None
+                elif value is not None and before[1]:
+                    growth = (value - before[1]) / before[1]
+                else:
+                    growth = (before[0] - rank) / before[0]  # 没有流量数据时看排名变化
+
+                if is_new or (growth is not None and growth > 0):
+                    rising.append({'keyword': keyword, 'source': term_source, 'traffic': traffic,
+                                   'rank': rank, 'growth': growth, 'new': is_new})
+
+        # 新上榜的排在前面（按排名），其余按增长幅度
+        rising.sort(key=lambda r: (not r['new'], -(r['growth'] or 0), r['rank']))
+        return rising[:limit]
+
+    def stats(self):
+        """各表行数"""
+        with self._lock:
+            return {table: self._conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                    for table in ('polls', 'terms', 'observations', 'momentum')}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,232 +1,235 @@
 """
 热词自动发现工具
 功能：自动从多个来源发现当前热门关键词和趋势话题
-数据源：Google Trends, 百度热搜, Reddit, 知乎热榜等
+数据源：Google Trends, 百度热搜, Reddit, 知乎热榜等（见 trend_sources.py，按需导入）
+
+用法：
+  python trending-finder.py                                   # 交互模式
+  python trending-finder.py --regions US --output ideas.jsonl # 非交互模式
+  python trending-finder.py --regions US --poll 30            # 每30分钟轮询一次，保存到时间序列库
 """
 
 # -*- coding: utf-8 -*-
 import sys
 import io
+import argparse
+import contextlib
 
 # 修复Windows中文编码问题
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
 
-import requests
-from bs4 import BeautifulSoup
-import json
+import threading
 import time
 from datetime import datetime
-import csv
 from collections import Counter
+from itertools import islice
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from fetch_engine import TokenBucket
+from http_session import HttpTransport
+from keyword_scoring import load_rulebook
+from result_sinks import open_sink
+from tokenizer import words
+from trend_categories import load_categories
+from trend_sources import TREND_SOURCES, available_regions, get_source, load_source, select_sources
+from trend_store import TrendStore
+
+# 收集热词的默认总时间预算（秒）
+DEFAULT_BUDGET = 20.0
 
 class TrendingKeywordFinder:
     """热词发现器"""
 
-    def __init__(self, use_proxy=True, proxy_port=7890):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+    def __init__(self, use_proxy=True, proxy_port=7890, transport=None, rules_path=None, store=None,
+                 categories_path=None):
+        # 共享的HTTP传输层（连接池、代理、请求头）；可与 KeywordDigger 共用同一个实例
+        if transport is None:
+            transport = HttpTransport(use_proxy=use_proxy, proxy_port=proxy_port)
+        self.transport = transport
+        self.headers = transport.headers
+        self.proxies = transport.proxies
         self.all_trends = []
 
-        # 设置代理（用于访问Google）
-        if use_proxy:
-            self.proxies = {
-                'http': f'http://127.0.0.1:{proxy_port}',
-                'https': f'http://127.0.0.1:{proxy_port}'
-            }
-            print(f"✅ 已启用代理: 127.0.0.1:{proxy_port}")
-        else:
-            self.proxies = None
-            print("⚠️  未使用代理")
-
-    def get_google_trends_daily(self, geo='US'):
+        # 热词时间序列库（TrendStore）；设置后每次收集的结果都会追加保存，用于计算上升趋势
+        self.store = store
+
+        # 数据源的限速令牌桶和 TTL 内的结果
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._results = {}
+
+        # 评分规则（scoring_rules.json，修改后自动重新加载）
+        self.rules = load_rulebook(rules_path)
+
+        # 热词分类词表（默认 trend_categories.json，修改后自动重新加载）
+        self.categories_path = categories_path
+
+    def get_google_trends_daily(self, geo='US', timeout=15):
         """
         获取Google Trends每日热搜
         geo: 国家代码 (US=美国, CN=中国, GB=英国等)
         """
-        print(f"\n[1/6] 正在获取Google每日热搜 ({geo})...")
-
-        try:
-            # Google Trends RSS Feed（免费！）
-            url = f"https://trends.google.com/trends/trendingsearches/daily/rss?geo={geo}"
-            response = requests.get(url, headers=self.headers, proxies=self.proxies, timeout=15)
-
-            soup = BeautifulSoup(response.content, 'xml')
-            items = soup.find_all('item')
-
-            trends = []
-            for item in items[:20]:  # 取前20个
-                title = item.find('title')
-                traffic = item.find('ht:approx_traffic')
-
-                if title:
-                    trend = {
-                        'keyword': title.text.strip(),
-                        'source': f'Google Trends ({geo})',
-                        'traffic': traffic.text if traffic else 'N/A',
-                        'category': '热搜',
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M')
-                    }
-                    trends.append(trend)
-
-            print(f"   ✅ 找到 {len(trends)} 个Google热搜词")
-            return trends
+        return self._fetch_or_empty('google_trends', geo, timeout)
 
-        except Exception as e:
-            print(f"   ⚠️  获取失败: {e}")
-            return []
-
-    def get_baidu_hot(self):
+    def get_baidu_hot(self, timeout=10):
         """获取百度热搜榜"""
-        print(f"\n[2/6] 正在获取百度热搜榜...")
-
-        try:
-            url = "https://top.baidu.com/board?tab=realtime"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            trends = []
-            # 百度热搜的HTML结构可能变化，这里提供一个基础版本
-            items = soup.find_all('div', class_='c-single-text-ellipsis')
-
-            for item in items[:20]:
-                keyword = item.text.strip()
-                if keyword and len(keyword) > 2:
-                    trends.append({
-                        'keyword': keyword,
-                        'source': '百度热搜',
-                        'traffic': 'N/A',
-                        'category': '热搜',
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M')
-                    })
-
-            print(f"   ✅ 找到 {len(trends)} 个百度热搜词")
-            return trends
-
-        except Exception as e:
-            print(f"   ⚠️  获取失败: {e}")
-            return []
+        return self._fetch_or_empty('baidu', 'CN', timeout)
 
-    def get_reddit_trending(self, subreddit='all'):
+    def get_reddit_trending(self, subreddit='all', timeout=15):
         """获取Reddit热门话题"""
-        print(f"\n[3/6] 正在获取Reddit热门话题...")
+        if subreddit != 'all':
+            return self._fetch_or_empty('reddit', 'US', timeout, subreddit=subreddit)
+        return self._fetch_or_empty('reddit', 'US', timeout)
 
-        try:
-            url = f"https://www.reddit.com/r/{subreddit}/hot.json?limit=25"
-            response = requests.get(url, headers={**self.headers, 'User-Agent': 'TrendFinder/1.0'}, proxies=self.proxies, timeout=15)
-            data = response.json()
-
-            trends = []
-            for post in data['data']['children'][:20]:
-                post_data = post['data']
-                title = post_data['title']
-                score = post_data['score']
-
-                trends.append({
-                    'keyword': title,
-                    'source': f'Reddit r/{subreddit}',
-                    'traffic': f'{score} upvotes',
-                    'category': post_data.get('subreddit', 'general'),
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M')
-                })
-
-            print(f"   ✅ 找到 {len(trends)} 个Reddit热门话题")
-            return trends
-
-        except Exception as e:
-            print(f"   ⚠️  获取失败: {e}")
-            return []
-
-    def get_zhihu_hot(self):
+    def get_zhihu_hot(self, timeout=10):
         """获取知乎热榜"""
-        print(f"\n[4/6] 正在获取知乎热榜...")
-
-        try:
-            # 知乎热榜API（可能需要更新）
-            url = "https://www.zhihu.com/api/v3/feed/topstory/hot-lists/total"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            data = response.json()
-
-            trends = []
-            for item in data.get('data', [])[:20]:
-                target = item.get('target', {})
-                title = target.get('title', '')
-
-                if title:
-                    trends.append({
-                        'keyword': title,
-                        'source': '知乎热榜',
-                        'traffic': f"{item.get('detail_text', 'N/A')}",
-                        'category': '热搜',
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M')
-                    })
-
-            print(f"   ✅ 找到 {len(trends)} 个知乎热榜词")
-            return trends
-
-        except Exception as e:
-            print(f"   ⚠️  获取失败: {e}")
-            return []
+        return self._fetch_or_empty('zhihu', 'CN', timeout)
 
-    def get_google_trends_rising(self, geo='US', category=''):
+    def get_google_trends_rising(self, geo='US', category='', window_hours=24, limit=20):
         """
         获取Google Trends上升趋势词
-        category: 分类 (e.g., 'business', 'technology', 'health')
+        根据轮询模式（--poll）保存的历史计算：新上榜、流量增长或排名上升的词，不重新抓取
+        category: 分类 (e.g., 'business', 'technology', 'health')；RSS没有分类信息，暂时只能全部返回
+        window_hours: 和多少小时前比较
         """
-        print(f"\n[5/6] 正在获取Google上升趋势词...")
+        print(f"\n[Google Trends] 正在计算Google上升趋势词 ({geo})...")
 
-        try:
-            # 使用pytrends库会更好，但这里提供一个简化版本
-            # 实际使用时建议安装: pip install pytrends
-
-            # 这里提供一个基于RSS的替代方案
-            trends = []
-            print(f"   💡 提示: 安装pytrends库可获取更多数据")
-            print(f"      命令: pip install pytrends")
+        if self.store is None:
+            print(f"   💡 提示: 上升趋势需要历史数据，请先用 --poll 持续轮询（或设置 --store）")
+            return []
 
+        try:
+            rising = self.store.rising(source=f'Google Trends ({geo})', window=window_hours * 3600, limit=limit)
+            trends = [{
+                'keyword': item['keyword'],
+                'source': f'Google Trends 上升 ({geo})',
+                'traffic': item['traffic'] or 'N/A',
+                'category': '新上榜' if item['new'] else f"上升 {item['growth']:.0%}",
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M')
+            } for item in rising]
+
+            print(f"   ✅ 找到 {len(trends)} 个上升趋势词")
             return trends
 
         except Exception as e:
             print(f"   ⚠️  获取失败: {e}")
             return []
 
-    def get_youtube_trending(self, region='US'):
+    def get_youtube_trending(self, region='US', timeout=10):
         """获取YouTube热门视频标题（可提取关键词）"""
-        print(f"\n[6/6] 正在获取YouTube热门话题...")
+        return self._fetch_or_empty('youtube', region, timeout)
 
+    def _fetch_or_empty(self, name, region, timeout, **kwargs):
+        """单独请求一个来源（get_* 方法）：失败时打印原因并返回空列表"""
         try:
-            # YouTube RSS Feed
-            url = "https://www.youtube.com/feed/trending"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            trends = []
-            # 提取视频标题作为热门话题
-            scripts = soup.find_all('script')
-
-            # YouTube的数据在JavaScript中，需要解析
-            # 这里提供一个简化版本
-            print(f"   💡 提示: YouTube需要API密钥才能获取更准确数据")
-
-            return trends
-
+            if kwargs:
+                return load_source(name)(self.transport, region, timeout, **kwargs)
+            return self.fetch_source(name, region, timeout)
         except Exception as e:
             print(f"   ⚠️  获取失败: {e}")
             return []
 
+    def fetch_source(self, name, region, timeout=None):
+        """
+        请求一个已注册的数据源（第一次使用时才导入它的模块）
+        按数据源的 rate_limit 限速；TTL 内重复请求直接返回上次的结果
+        请求失败时抛出异常（collect_trends 记为 error）
+        """
+        spec = get_source(name)
+        key = (name, region)
+        cached = self._results.get(key)
+        if cached and time.monotonic() - cached[0] < spec['ttl']:
+            return list(cached[1])
+
+        with self._lock:
+            bucket = self._buckets.get(name)
+            if bucket is None:
+                bucket = self._buckets[name] = TokenBucket(spec['rate_limit'], capacity=1)
+        bucket.acquire()
+
+        trends = load_source(name)(self.transport, region, timeout or spec['timeout'])
+        if trends:
+            # 失败会抛出异常；空结果也不缓存，下一轮重新请求
+            self._results[key] = (time.monotonic(), trends)
+        return list(trends)
+
+    def sources_for(self, regions, names=None):
+        """
+        各市场的数据来源: [(名称, 方法, 参数, 单个来源的截止时间), ...]
+        names: 只使用这些数据源（见 trend_sources.TREND_SOURCES）
+        """
+        return [
+            (f"{spec['label']} ({region})", self.fetch_source, {'name': spec['name'], 'region': region},
+             spec['timeout'])
+            for spec, region in select_sources(regions, names)
+        ]
+
+    def collect_trends(self, sources, budget=DEFAULT_BUDGET):
+        """
+        并发请求所有来源
+        每个来源超过自己的截止时间、或者总耗时超过 budget 时不再等待，只返回已完成来源的结果
+        返回 (热词列表（按来源顺序）, 各来源状态 [{'source', 'status', 'latency', 'count'}, ...])
+        """
+        start = time.monotonic()
+        results = {}
+        stats = {}
+
+        pool = ThreadPoolExecutor(max_workers=max(1, len(sources)))
+        futures = {}
+        for index, (name, method, kwargs, deadline) in enumerate(sources):
+            # 请求超时不超过截止时间和总预算
+            kwargs = {**kwargs, 'timeout': min(deadline, budget)}
+            futures[pool.submit(method, **kwargs)] = (index, name, min(deadline, budget))
+
+        pending = set(futures)
+        while pending:
+            now = time.monotonic() - start
+            # 到达截止时间仍未返回的来源直接放弃
+            for future in list(pending):
+                index, name, deadline = futures[future]
+                if now >= deadline:
+                    pending.discard(future)
+                    stats[index] = {'source': name, 'status': 'timeout', 'latency': round(now, 2), 'count': 0}
+            if not pending:
+                break
+
+            next_deadline = min(futures[f][2] for f in pending)
+            done, pending = wait(pending, timeout=max(0, next_deadline - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                index, name, _ = futures[future]
+                latency = round(time.monotonic() - start, 2)
+                try:
+                    results[index] = future.result()
+                    stats[index] = {'source': name, 'status': 'ok', 'latency': latency,
+                                    'count': len(results[index])}
+                except Exception as e:
+                    stats[index] = {'source': name, 'status': 'error', 'latency': latency, 'count': 0,
+                                    'error': str(e)}
+
+        # 不等待超时的来源（它们在后台线程里自己结束）
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        all_trends = [trend for index in sorted(results) for trend in results[index]]
+        source_stats = [stats[index] for index in sorted(stats)]
+
+        print(f"\n⏱️  数据源耗时（总计 {time.monotonic() - start:.1f}s，预算 {budget:.0f}s）:")
+        for stat in source_stats:
+            mark = {'ok': '✅', 'timeout': '⏰', 'error': '❌'}[stat['status']]
+            detail = f" ({stat['error']})" if stat['status'] == 'error' else ''
+            print(f"   {mark} {stat['source']}: {stat['latency']:.1f}s, {stat['count']} 条{detail}")
+
+        return all_trends, source_stats
+
     def extract_keywords_from_trends(self, trends):
         """从热门话题中提取关键词"""
         print(f"\n📊 从 {len(trends)} 个话题中提取关键词...")
 
         all_words = []
         for trend in trends:
-            # 移除标点和分词
-            text = trend['keyword'].lower()
-            # 简单分词（英文按空格，中文需要jieba）
-            words = text.split()
-            all_words.extend([w for w in words if len(w) > 3])
+            # 去掉标点后分词（中文用 tokenizer 的中文分词器）；英文短词和单字没有意义
+            all_words.extend([w for w in words(trend['keyword']) if len(w) > 3 or (len(w) > 1 and not w.isascii())])
 
         # 统计高频词
         word_freq = Counter(all_words)
@@ -236,36 +239,11 @@ class TrendingKeywordFinder:
         return top_keywords
 
     def categorize_trends(self, trends):
-        """将趋势词分类到不同利基市场"""
+        """将趋势词分类到不同利基市场（词表见 trend_categories.json）"""
         print(f"\n🏷️  对热词进行分类...")
 
-        categories = {
-            '科技数码': ['tech', 'phone', 'laptop', 'software', 'ai', 'app', 'game', 'iphone', 'android'],
-            '健康健身': ['health', 'fitness', 'diet', 'workout', 'weight', 'yoga', 'nutrition'],
-            '金融理财': ['stock', 'crypto', 'bitcoin', 'investment', 'money', 'finance', 'trading'],
-            '生活家居': ['home', 'kitchen', 'furniture', 'decor', 'garden', 'cleaning'],
-            '时尚美妆': ['fashion', 'beauty', 'makeup', 'skincare', 'clothing', 'style'],
-            '旅游': ['travel', 'hotel', 'flight', 'vacation', 'trip', 'destination'],
-            '美食': ['food', 'recipe', 'cooking', 'restaurant', 'coffee', 'wine'],
-            '教育': ['course', 'learn', 'tutorial', 'education', 'study', 'training'],
-            '娱乐': ['movie', 'music', 'celebrity', 'tv', 'show', 'entertainment']
-        }
-
-        categorized = {cat: [] for cat in categories.keys()}
-        categorized['其他'] = []
-
-        for trend in trends:
-            keyword_lower = trend['keyword'].lower()
-            matched = False
-
-            for category, keywords in categories.items():
-                if any(kw in keyword_lower for kw in keywords):
-                    categorized[category].append(trend)
-                    matched = True
-                    break
-
-            if not matched:
-                categorized['其他'].append(trend)
+        # 按词表的倒排索引分类，一个热词可以属于多个分类
+        categorized = load_categories(self.categories_path).categorize(trends)
 
         # 打印分类结果
         for category, items in categorized.items():
@@ -274,75 +252,60 @@ class TrendingKeywordFinder:
 
         return categorized
 
-    def score_trend_opportunity(self, trend):
-        """评估热词的商业机会分数"""
-        score = 0
-        keyword = trend['keyword'].lower()
-
-        # 1. 商业意图词
-        commercial_keywords = ['best', 'buy', 'review', 'vs', 'how to', 'top', 'cheap', 'price']
-        for ck in commercial_keywords:
-            if ck in keyword:
-                score += 20
-                break
+    def _bursts(self, trends):
+        """每个热词的 EWMA z-score（来自时间序列库的动量统计）；没有库时返回 None"""
+        if self.store is None:
+            return None
+        return [stats.zscore if stats and stats.count > 1 else None for stats in self.store.momentum(trends)]
 
-        # 2. 长度适中
-        word_count = len(keyword.split())
-        if 2 <= word_count <= 5:
-            score += 15
-
-        # 3. 包含数字
-        if any(char.isdigit() for char in keyword):
-            score += 10
-
-        # 4. 流量指标
-        traffic = trend.get('traffic', '')
-        if traffic != 'N/A' and traffic:
-            # 提取数字
-            import re
-            numbers = re.findall(r'\d+', str(traffic))
-            if numbers:
-                traffic_num = int(numbers[0])
-                if traffic_num > 100000:
-                    score += 30
-                elif traffic_num > 50000:
-                    score += 20
-                elif traffic_num > 10000:
-                    score += 10
-
-        # 5. 时效性（新闻类热词分数低）
-        news_keywords = ['死', '去世', '事故', '新闻', '快讯']
-        if any(nk in keyword for nk in news_keywords):
-            score -= 20
-
-        return max(0, min(100, score))
+    def score_trend_opportunity(self, trend):
+        """
+        评估热词的商业机会分数
+        商业意图词 + 长度适中 + 数字 + 流量指标 + 爆发程度 - 新闻类热词，规则见 scoring_rules.json 的 trend 配置
+        """
+        bursts = self._bursts([trend])
+        return self.rules.scorer('trend').score(trend['keyword'], trend.get('traffic', ''),
+                                                bursts[0] if bursts else None)
 
     def generate_niche_ideas(self, categorized_trends):
         """根据热词生成利基市场建议"""
         print(f"\n💡 生成利基市场建议...")
 
         suggestions = []
+        other = load_categories(self.categories_path).other
+        # 已经推荐过的核心词：多标签的热词只推荐一次
+        seeds = set()
 
         for category, trends in categorized_trends.items():
-            if not trends or category == '其他':
+            if not trends or category == other:
                 continue
 
-            # 找出该分类下最高分的趋势
-            scored_trends = []
-            for trend in trends:
-                score = self.score_trend_opportunity(trend)
-                scored_trends.append((trend, score))
+            # 找出该分类下最高分的趋势（同分时爆发程度高的优先）
+            bursts = self._bursts(trends) or [None] * len(trends)
+            scores = self.rules.scorer('trend').score_many([t['keyword'] for t in trends],
+                                                           [t.get('traffic', '') for t in trends], bursts)
+            scored_trends = list(zip(trends, scores, bursts))
+
+            scored_trends.sort(key=lambda x: (x[1], x[2] or 0), reverse=True)
 
-            scored_trends.sort(key=lambda x: x[1], reverse=True)
+            # 同一个热词可能来自多个数据源：每个词只保留分数最高的一条
+            unique = {}
+            for entry in scored_trends:
+                unique.setdefault(' '.join(entry[0]['keyword'].lower().split()), entry)
+            # 最高分的热词已经是其他分类的核心词时，推荐该分类的下一个
+            candidates = [key for key in unique if key not in seeds]
 
-            if scored_trends and scored_trends[0][1] > 30:  # 只推荐高分的
-                top_trend, top_score = scored_trends[0]
+            if candidates and unique[candidates[0]][1] > 30:  # 只推荐高分的
+                seed = candidates[0]
+                seeds.add(seed)
+                top_trend, top_score, top_burst = unique[seed]
 
                 suggestion = {
                     'category': category,
                     'seed_keyword': top_trend['keyword'],
                     'opportunity_score': top_score,
-                    'related_trends': [t[0]['keyword'] for t in scored_trends[1:4]],
+                    'burst': top_burst,
+                    'related_trends': [entry[0]['keyword'] for key, entry in unique.items() if key != seed][:3],
                     'suggested_domain': self._generate_domain_idea(top_trend['keyword']),
                     'content_ideas': self._generate_content_ideas(top_trend['keyword'])
                 }
@@ -373,21 +336,33 @@ class TrendingKeywordFinder:
             f"{keyword} buying guide"
         ]
 
-    def export_results(self, trends, categorized, suggestions, filename='trending_keywords'):
-        """导出结果到多个文件"""
+    def _scored_rows(self, trends, chunk_size=1000):
+        """逐批评分，产出带 opportunity_score 的新字典（不修改原来的热词）"""
+        scorer = self.rules.scorer('trend')
+        trends = iter(trends)
+        while True:
+            chunk = list(islice(trends, chunk_size))
+            if not chunk:
+                return
+            scores = scorer.score_many([t['keyword'] for t in chunk], [t.get('traffic', '') for t in chunk],
+                                       self._bursts(chunk))
+            for trend, score in zip(chunk, scores):
+                yield {**trend, 'opportunity_score': score}
+
+    def export_results(self, trends, categorized, suggestions, filename='trending_keywords', export_ext='.csv'):
+        """
+        导出结果到多个文件
+        热词逐行写出（trends 可以是生成器）；export_ext 决定格式和压缩：.csv / .jsonl，可再加 .gz / .zst
+        """
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
         # 1. 导出所有热词
-        with open(f'{filename}_{timestamp}.csv', 'w', newline='', encoding='utf-8-sig') as f:
-            fieldnames = ['keyword', 'source', 'traffic', 'category', 'opportunity_score', 'timestamp']
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for trend in trends:
-                trend['opportunity_score'] = self.score_trend_opportunity(trend)
-                writer.writerow(trend)
+        path = f'{filename}_{timestamp}{export_ext}'
+        fieldnames = ['keyword', 'source', 'traffic', 'category', 'opportunity_score', 'timestamp']
+        with open_sink(path, fields=fieldnames, encoding='utf-8-sig') as sink:
+            sink.write_many(self._scored_rows(trends))
 
-        print(f"\n💾 已导出到: {filename}_{timestamp}.csv")
+        print(f"\n💾 已导出到: {path}")
 
         # 2. 导出利基市场建议
         with open(f'{filename}_suggestions_{timestamp}.txt', 'w', encoding='utf-8') as f:
@@ -413,29 +388,20 @@ class TrendingKeywordFinder:
 
         print(f"💾 已导出到: {filename}_suggestions_{timestamp}.txt")
 
-    def run(self, regions=['US', 'CN']):
-        """运行完整流程"""
+    def run(self, regions=['US', 'CN'], budget=DEFAULT_BUDGET, sources=None):
+        """
+        运行完整流程
+        budget: 收集热词的总时间预算（秒），到时间后只用已经返回的来源
+        sources: 只使用这些数据源（默认使用所选市场的全部默认来源）
+        """
         print("=" * 60)
         print("🔥 热词自动发现工具")
         print("=" * 60)
 
-        all_trends = []
-
-        # 收集各个来源的热词
-        for region in regions:
-            if region == 'US':
-                trends = self.get_google_trends_daily('US')
-                all_trends.extend(trends)
-
-                reddit_trends = self.get_reddit_trending('all')
-                all_trends.extend(reddit_trends)
-
-            elif region == 'CN':
-                baidu_trends = self.get_baidu_hot()
-                all_trends.extend(baidu_trends)
-
-                zhihu_trends = self.get_zhihu_hot()
-                all_trends.extend(zhihu_trends)
+        # 并发收集各个来源的热词（总耗时约等于最慢的来源，而不是所有来源之和）
+        all_trends, source_stats = self.collect_trends(self.sources_for(regions, sources), budget=budget)
+        if self.store is not None:
+            self.store.record(all_trends)
 
         # 分类
         categorized = self.categorize_trends(all_trends)
@@ -453,6 +419,8 @@ class TrendingKeywordFinder:
         for i, sug in enumerate(suggestions[:5], 1):
             print(f"\n【推荐 #{i}】{sug['category']} - 评分: {sug['opportunity_score']}/100")
             print(f"   核心词: {sug['seed_keyword']}")
+            if sug['burst'] is not None:
+                print(f"   爆发程度: z={sug['burst']:.1f}")
             print(f"   域名建议: {sug['suggested_domain'][0]}")
             print(f"   相关热词: {', '.join(sug['related_trends'][:3])}")
 
@@ -466,11 +434,92 @@ class TrendingKeywordFinder:
         return {
             'trends': all_trends,
             'categorized': categorized,
-            'suggestions': suggestions
+            'suggestions': suggestions,
+            'sources': source_stats
         }
 
-
-if __name__ == '__main__':
+    def poll(self, regions=['US', 'CN'], interval=30, budget=DEFAULT_BUDGET, sources=None, rounds=None):
+        """
+        轮询模式：每 interval 分钟收集一次所有数据源，追加到时间序列库（未变化的记录不重复保存）
+        每轮结束后输出上升趋势；rounds 为 None 时一直运行
+        间隔短于数据源的 TTL 时会复用上次的结果（不会多请求，也不会多保存）
+        """
+        if self.store is None:
+            raise ValueError('轮询模式需要设置 store（TrendStore）')
+
+        done = 0
+        while rounds is None or done < rounds:
+            started = time.monotonic()
+            polled_at = time.time()
+            print(f"\n🔄 [{datetime.now().strftime('%Y-%m-%d %H:%M')}] 第 {done + 1} 轮轮询")
+
+            trends, _ = self.collect_trends(self.sources_for(regions, sources), budget=budget)
+            added = self.store.record(trends, polled_at)
+            print(f"   💾 {len(trends)} 条热词，新增/变化 {added} 条，库中 {self.store.stats()}")
+
+            rising = self.store.rising(limit=10)
+            if rising:
+                print("   📈 上升趋势:")
+                for item in rising:
+                    change = '新上榜' if item['new'] else f"+{item['growth']:.0%}"
+                    print(f"      [{change}] {item['keyword']} ({item['source']})")
+
+            bursts = [b for b in self.store.bursts(limit=5, since=polled_at) if b['zscore'] > 1]
+            if bursts:
+                print("   🚀 突然爆发:")
+                for item in bursts:
+                    print(f"      [z={item['zscore']:.1f}, {item['velocity']:+.0f}/小时] {item['keyword']} ({item['source']})")
+
+            done += 1
+            if rounds is None or done < rounds:
+                time.sleep(max(0, interval * 60 - (time.monotonic() - started)))
+
+
+def parse_args(argv=None):
+    """命令行参数（不带参数运行时进入交互模式）"""
+    parser = argparse.ArgumentParser(description='热词自动发现工具')
+    parser.add_argument('--regions', nargs='+', default=['US', 'CN'], choices=available_regions(),
+                        help='市场，默认 US CN')
+    parser.add_argument('--sources', nargs='+', choices=sorted(TREND_SOURCES),
+                        help='只使用这些数据源（默认使用所选市场的全部默认来源）')
+    parser.add_argument('--no-proxy', action='store_true', help='不使用代理')
+    parser.add_argument('--proxy-port', type=int, default=7890, help='代理端口，默认 7890')
+    parser.add_argument('--output', help='利基市场建议输出为JSONL文件，"-" 表示标准输出')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET,
+                        help=f'收集热词的总时间预算（秒），默认 {DEFAULT_BUDGET:.0f}')
+    parser.add_argument('--poll', type=float, metavar='MINUTES',
+                        help='轮询模式：每隔多少分钟收集一次，保存到时间序列库（不导出CSV）')
+    parser.add_argument('--store', help='热词时间序列库路径（轮询模式默认 trend_history.db）')
+    return parser.parse_args(argv)
+
+
+def run_cli(args):
+    """非交互模式：适合 cron / 批量任务"""
+    out = sys.stdout
+    log = sys.stderr if args.output == '-' else sys.stdout
+
+    store_path = args.store or ('trend_history.db' if args.poll else None)
+    store = TrendStore(store_path) if store_path else None
+
+    with contextlib.redirect_stdout(log):
+        finder = TrendingKeywordFinder(use_proxy=not args.no_proxy, proxy_port=args.proxy_port, store=store)
+        try:
+            if args.poll:
+                finder.poll(regions=args.regions, interval=args.poll, budget=args.budget, sources=args.sources)
+                return
+            results = finder.run(regions=args.regions, budget=args.budget, sources=args.sources)
+        finally:
+            finder.transport.close()
+            if store:
+                store.close()
+
+    if args.output:
+        with open_sink(args.output, format='jsonl', append=True, stdout=out) as sink:
+            sink.write_many(results['suggestions'])
+
+
+def run_interactive():
+    """交互模式（原有使用方式）"""
     print("\n是否使用代理访问Google? (推荐: 是)")
     use_proxy_input = input("使用代理 (y/n) [默认: y]: ").strip().lower() or 'y'
     use_proxy = use_proxy_input == 'y'
@@ -504,3 +553,10 @@ if __name__ == '__main__':
     print("   1. 查看生成的CSV文件，找到感兴趣的热词")
     print("   2. 使用 keyword-digger.py 深入挖掘该热词")
     print("   3. 分析竞争对手，制定建站计划")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run_cli(parse_args())
+    else:
+        run_interactive()